@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Browser engine and launch profile used for every scan."""
+
+ENGINES = ('chromium', 'firefox', 'webkit')
+
+# Chromium switches trading rendering features for a smaller footprint on small runners
+CHROMIUM_LOW_MEMORY_ARGS = [
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-renderer-backgrounding',
+    '--renderer-process-limit=1',
+    '--js-flags=--max-old-space-size=256',
+]
+
+# Chromium runs the browser, renderer and GPU code in one process
+CHROMIUM_SHARED_PROCESS_ARGS = ['--single-process', '--no-zygote']
+
+FIREFOX_LOW_MEMORY_PREFS = {
+    'browser.cache.memory.capacity': 16384,
+    'browser.sessionhistory.max_entries': 2,
+    'dom.ipc.processCount': 1,
+    'fission.autostart': False,
+}
+
+
+def parse_viewport(value: str):
+    """Parse ``WIDTHxHEIGHT``, returning None for an empty value."""
+    if not value:
+        return None
+    width, _, height = value.lower().partition('x')
+    return {'width': int(width), 'height': int(height)}
+
+
+class LaunchProfile:
+    """Which engine to launch and how."""
+
+    def __init__(self, engine: str = 'chromium', slow_mo: int = 0, viewport: dict = None,
+                 low_memory: bool = False, shared_process: bool = False):
+        """Initialize the profile.
+
+        Args:
+            engine (str): ``chromium``, ``firefox`` or ``webkit``
+            slow_mo (int): Delay in milliseconds added to every browser action
+            viewport (dict): ``{'width': ..., 'height': ...}``, or None for the engine default
+            low_memory (bool): Apply the engine's low-memory flags
+            shared_process (bool): Run Chromium in a single process
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown browser engine {engine!r}, expected one of {', '.join(ENGINES)}")
+        self.engine = engine
+        self.slow_mo = slow_mo
+        self.viewport = viewport
+        self.low_memory = low_memory
+        self.shared_process = shared_process
+
+    def __repr__(self):
+        return (f"LaunchProfile(engine={self.engine!r}, slow_mo={self.slow_mo}, viewport={self.viewport}, "
+                f"low_memory={self.low_memory}, shared_process={self.shared_process})")
+
+    def launch_options(self, headless: bool) -> dict:
+        """Keyword arguments for ``BrowserType.launch``."""
+        options = {'headless': headless, 'slow_mo': self.slow_mo}
+        if self.engine == 'chromium':
+            args = []
+            if self.low_memory:
+                args += CHROMIUM_LOW_MEMORY_ARGS
+            if self.shared_process:
+                args += CHROMIUM_SHARED_PROCESS_ARGS
+            if args:
+                options['args'] = args
+        elif self.engine == 'firefox' and self.low_memory:
+            options['firefox_user_prefs'] = FIREFOX_LOW_MEMORY_PREFS
+        return options
+
+    def context_options(self) -> dict:
+        """Keyword arguments for ``Browser.new_context``."""
+        options = {
+            'locale': 'en-US',
+            'timezone_id': 'America/New_York',  # This sets the browser timezone to Eastern Time
+        }
+        if self.viewport:
+            options['viewport'] = self.viewport
+        return options
+
+
+def profile_from_settings(settings, slow_mo: int = None) -> LaunchProfile:
+    """Build the launch profile from settings, with ``slow_mo`` overriding the configured delay."""
+    return LaunchProfile(
+        engine=settings.browser_engine,
+        slow_mo=settings.browser_slow_mo if slow_mo is None else slow_mo,
+        viewport=parse_viewport(settings.browser_viewport),
+        low_memory=settings.browser_low_memory,
+        shared_process=settings.browser_shared_process,
+    )
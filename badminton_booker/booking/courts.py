@@ -2,15 +2,39 @@
 """Badminton court booking and availability checking module."""
 
 import json
+import logging
 import os
+import time
 from datetime import datetime, timedelta
 from playwright.async_api import async_playwright
 from dotenv import load_dotenv
+from badminton_booker.booking.browser import profile_from_settings
+from badminton_booker.booking.flight_recorder import FlightRecorder
 from badminton_booker.booking.handle_time import generate_time_object
+from badminton_booker.booking.governor import crawl_governor_from_settings, host_of
+from badminton_booker.booking.harvester import harvest_panels, snapshot_panels
+from badminton_booker.booking.panel_filter import panel_matches_filter, parse_panel_filter
+from badminton_booker.booking.reserve import AutoReserver, parse_reserve_rules
+from badminton_booker.booking.stages import CheckpointedNavigator, StageFailed, parse_stage_policies
+from badminton_booker.config.settings import get_settings
+from badminton_booker.datastore.facilities import FacilityIndex, enrich_panels
+from badminton_booker.metrics.event_log import log_event, log_phase
+from badminton_booker.metrics.registry import REGISTRY
 
 # Load environment variables from .env file if it exists
 load_dotenv()
 
+TIME_TO_WAIT_FOR_SEARCH_RESULTS = 12000  # 12 seconds
+
+logger = logging.getLogger(__name__)
+
+SCAN_DURATION = REGISTRY.histogram(
+    'badminton_scan_duration_seconds', 'Wall time of a court availability scan.', ['outcome'])
+SCANS = REGISTRY.counter('badminton_scans', 'Court availability scans by outcome.', ['outcome'])
+STAGE_FAILURES = REGISTRY.counter(
+    'badminton_stage_failures', 'Navigation stages that failed after all their retries.', ['stage'])
+SLOTS_SEEN = REGISTRY.counter('badminton_slots_seen', 'Reservation slots read from the search results.', ['bookable'])
+
 def generate_selected_date() -> list[str]:
     """Selected date will be the next 4 days from today as a list of strings using a two digit format."""
     today = datetime.now()
@@ -20,182 +44,424 @@ def generate_selected_date() -> list[str]:
         selected_dates.append(date.strftime("%d"))
     return selected_dates
 
-async def select_time_on_page(page): 
+async def select_time_on_page(page, start='18:00', end='22:00'):
     """Select time for booking."""
+    start_hour, start_minute = start.split(':')
+    end_hour, end_minute = end.split(':')
+
     # Start time
     await page.locator('#u6510_edFacilityReservationSearchStartTime').get_by_role('textbox', name='HH').click()
-    await page.locator('#u6510_edFacilityReservationSearchStartTime').get_by_role('textbox', name='HH').fill('18')
+    await page.locator('#u6510_edFacilityReservationSearchStartTime').get_by_role('textbox', name='HH').fill(start_hour)
     await page.locator('#u6510_edFacilityReservationSearchStartTime').get_by_role('textbox', name='MM').click()
-    await page.locator('#u6510_edFacilityReservationSearchStartTime').get_by_role('textbox', name='MM').fill('00')
+    await page.locator('#u6510_edFacilityReservationSearchStartTime').get_by_role('textbox', name='MM').fill(start_minute)
     
     # Finish Time
     await page.locator('#u6510_edFacilityReservationSearchEndTime').get_by_role('textbox', name='HH').click()
-    await page.locator('#u6510_edFacilityReservationSearchEndTime').get_by_role('textbox', name='HH').fill('22')
+    await page.locator('#u6510_edFacilityReservationSearchEndTime').get_by_role('textbox', name='HH').fill(end_hour)
+    if end_minute != '00':
+        await page.locator('#u6510_edFacilityReservationSearchEndTime').get_by_role('textbox', name='MM').fill(end_minute)
     await page.locator('#u6510_edFacilityReservationSearchEndTime').get_by_role('textbox', name='HH').press('Enter')
 
-async def generate_available_booking_list(reservation_elements):
-    """Generate a list of available bookings from reservation elements."""
-    reservations = []
-    print(f'Found {len(reservation_elements)} reservation elements')
+async def extract_panel(element):
+    """Read the raw text fields of a single reservation panel."""
+    # Extract name
+    name_element = await element.query_selector('.panel-heading .fake-link')
+    name = await name_element.text_content() if name_element else ""
+    name = name.strip() if name else ""
     
-    for element in reservation_elements:
-        # Extract name
-        name_element = await element.query_selector('.panel-heading .fake-link')
-        name = await name_element.text_content() if name_element else ""
-        name = name.strip() if name else ""
-        
-        # Extract date and time information
-        date_elements = await element.query_selector_all('.panel-body .when')
-        
-        date = ""
-        start_time = ""
-        end_time = ""
-        
-        if date_elements and len(date_elements) > 0:
-            date_text = await date_elements[0].text_content()
-            date_parts = date_text.split(',')
-            
-            if len(date_parts) > 1:
-                date = date_parts[1].strip()
-            
-            if len(date_parts) > 2:
-                start_time = date_parts[2].strip()
-        
-        if date_elements and len(date_elements) > 1:
-            end_time_text = await date_elements[1].text_content()
-            end_time = end_time_text.strip()
-        
-        # Extract price
-        price = ""
-        price_elements = await element.query_selector_all(".panel-body .ng-binding")
+    # Extract date and time information
+    date_elements = await element.query_selector_all('.panel-body .when')
+    
+    date = ""
+    start_time = ""
+    end_time = ""
+    
+    if date_elements and len(date_elements) > 0:
+        date_text = await date_elements[0].text_content()
+        date_parts = date_text.split(',')
         
-        for price_el in price_elements:
-            price_text = await price_el.text_content()
-            if "$" in price_text:
-                price = price_text.replace("$", "").strip()
+        if len(date_parts) > 1:
+            date = date_parts[1].strip()
         
-        # Check if the facility can be reserved
-        reserve_button = await element.query_selector('button[ng-click*="vm.onReserve"]')
-        can_reserve = False
-        button_id = None
+        if len(date_parts) > 2:
+            start_time = date_parts[2].strip()
+    
+    if date_elements and len(date_elements) > 1:
+        end_time_text = await date_elements[1].text_content()
+        end_time = end_time_text.strip()
+    
+    # Extract price
+    price = ""
+    price_elements = await element.query_selector_all(".panel-body .ng-binding")
+    
+    for price_el in price_elements:
+        price_text = await price_el.text_content()
+        if "$" in price_text:
+            price = price_text.replace("$", "").strip()
+    
+    # Check if the facility can be reserved
+    reserve_button = await element.query_selector('button[ng-click*="vm.onReserve"]')
+    can_reserve = False
+    button_id = None
+    
+    if reserve_button:
+        # Check if button has 'disabled' class
+        button_classes = await reserve_button.get_attribute('class')
+        can_reserve = 'disabled' not in button_classes if button_classes else False
         
-        if reserve_button:
-            # Check if button has 'disabled' class
-            button_classes = await reserve_button.get_attribute('class')
-            can_reserve = 'disabled' not in button_classes if button_classes else False
+        # Get button ID if available
+        button_id = await reserve_button.get_attribute('id')
+    
+    return {
+        'name': name,
+        'date': date,
+        'startTime': start_time,
+        'endTime': end_time,
+        'price': price,
+        'canReserve': can_reserve,
+        'buttonId': button_id
+    }
+
+def parse_panel(panel):
+    """Turn the raw fields of a panel into a reservation with datetime start and end times."""
+    date = panel['date']
+    return {
+        **panel,
+        'startTime': generate_time_object(date, panel['startTime']) if panel['startTime'] else None,
+        'endTime': generate_time_object(date, panel['endTime']) if panel['endTime'] else None,
+    }
+
+async def stream_available_bookings(reservation_elements, panel_filter=None):
+    """Yield the raw fields of each reservation panel matching the filter as soon as it has been read."""
+    log_event(logger, 'panels_found', f'Found {len(reservation_elements)} reservation elements',
+              panels=len(reservation_elements))
+    returned = 0
+    for element in reservation_elements:
+        panel = await extract_panel(element)
+        log_event(logger, 'panel_read', f"Read panel {panel['name']}", logging.DEBUG,
+                  name=panel['name'], canReserve=panel['canReserve'])
+        if panel_matches_filter(panel, panel_filter):
+            returned += 1
+            yield panel
+    if panel_filter:
+        log_event(logger, 'panels_filtered',
+                  f'Returned {returned} of {len(reservation_elements)} reservation elements after filtering',
+                  panels=len(reservation_elements), returned=returned)
+
+async def generate_available_booking_list(reservation_elements):
+    """Generate a list of available bookings from reservation elements."""
+    return [parse_panel(panel) async for panel in stream_available_bookings(reservation_elements)]
+
+async def launch_browser(p, is_headless, slow_mo_value=None, profile=None):
+    """Launch the browser and open a page configured for the booking site.
+
+    The engine and launch options come from ``profile``, by default the
+    configured one, with ``slow_mo_value`` overriding its delay when given.
+    """
+    profile = profile or profile_from_settings(get_settings(), slow_mo_value)
+    browser = await getattr(p, profile.engine).launch(**profile.launch_options(is_headless))
+
+    context = await browser.new_context(**profile.context_options())
+
+    page = await context.new_page()
+    return browser, page
+
+async def is_date_selected(button) -> bool:
+    """Check whether a calendar date button is already selected."""
+    classes = (await button.get_attribute('class') or '').split()
+    return 'active' in classes or await button.get_attribute('aria-pressed') == 'true'
+
+async def select_date_on_page(page, date):
+    """Select a date from the calendar, clicking all matching buttons that are not selected yet.
+
+    Clicking a selected date deselects it, so a retried date stage must leave
+    the buttons it already selected alone.
+
+    Raises:
+        LookupError: If the calendar shows no button for the date, e.g. a day of the
+            next month, so the date is reported missing instead of scanned.
+    """
+    calendar_button = page.locator('#u6510_btnFacilityReservationSearchReserveDateCalendar').nth(0)
+    date_buttons = page.locator(f'button:has(span:has-text("{date}"))')
+    await calendar_button.click()  # Open the calendar
+    calendar_open = True
+    count = await date_buttons.count()
+    if count == 0:
+        await calendar_button.click()
+        raise LookupError(f"no calendar button for day {date}")
+    for i in range(count):
+        if not calendar_open:  # Clicking a date closes the calendar
+            await calendar_button.click()
+            calendar_open = True
+        button = date_buttons.nth(i)
+        if await is_date_selected(button):
+            continue
+        await button.click()
+        calendar_open = False
+    if calendar_open:
+        await calendar_button.click()  # Close the calendar when every date was already selected
+
+async def open_filtered_search(page, url, neighborhoods, dates=None, select_time=True, navigator=None, time_window=None):
+    """Navigate from the landing page to the filtered badminton search results.
+
+    ``time_window`` is a ``(start, end)`` pair of ``HH:MM`` strings, 18:00 to 22:00
+    by default. Every step runs as a retryable stage. Neighborhood and date selections are
+    optional stages, so a failure there narrows the search instead of aborting it.
+
+    Returns:
+        dict: Coverage of the search space reached by the completed stages.
+
+    Raises:
+        StageFailed: If a required navigation stage fails after all retries.
+    """
+    if dates is None:
+        dates = generate_selected_date()
+    if navigator is None:
+        navigator = CheckpointedNavigator(page, parse_stage_policies(get_settings().stage_policies))
+
+    await navigator.run('open_booking_site', lambda: page.goto(url))
+    
+    # Click on 'Reserve a space' link
+    await navigator.run('reserve_link', lambda: page.get_by_role('link', name='Reserve a space').click())
+    
+    # Accept cookies, the banner is not shown when they were already accepted
+    await navigator.run('accept_cookies', lambda: page.get_by_role('button', name='Accepter tout').click(), required=False)
+    
+    # Click on Badminton
+    await navigator.run('badminton', lambda: page.locator('a:has-text("Badminton")').click())
+    
+    # Select Neighborhood based on environment variable
+    await navigator.run('open_neighborhoods', lambda: page.get_by_text('Arrondissement Tous').click())
+    
+    # Check each neighborhood in the list
+    for neighborhood in neighborhoods:
+        log_event(logger, 'neighborhood_selecting', f"Selecting neighborhood: {neighborhood}", neighborhood=neighborhood)
+        if not await navigator.run(
+            f'neighborhood:{neighborhood}',
+            lambda n=neighborhood: page.get_by_role('checkbox', name=n).check(),
+            required=False,
+        ):
+            log_event(logger, 'neighborhood_missing', f"Could not find neighborhood: {neighborhood}",
+                      logging.WARNING, neighborhood=neighborhood)
             
-            # Get button ID if available
-            button_id = await reserve_button.get_attribute('id')
+    await navigator.run('confirm_neighborhoods', lambda: page.get_by_role('button', name='Confirmer').click())
+    
+    if select_time:
+        start, end = time_window or ('18:00', '22:00')
+        await navigator.run('select_time', lambda: select_time_on_page(page, start, end))
         
-        # Add the extracted data to the result array
-        reservations.append({
-            'name': name,
-            'date': date,
-            'startTime': generate_time_object(date, start_time) if start_time else None,
-            'endTime': generate_time_object(date, end_time) if end_time else None,
-            'price': price,
-            'canReserve': can_reserve,
-            'buttonId': button_id
-        })
-
-    return reservations
-
-async def check_available_courts(args):
-    """Check available badminton courts and return results."""
+    # Select each date from the calendar
+    for date in dates:
+        await navigator.run(f'date:{date}', lambda d=date: select_date_on_page(page, d), required=False)
+
+    return navigator.coverage(neighborhoods, dates)
+
+async def wait_for_search_results(page, timeout=TIME_TO_WAIT_FOR_SEARCH_RESULTS):
+    """Wait for the search results and return the reservation panel elements."""
+    await wait_for_first_panel(page, timeout)
+    return await page.query_selector_all('.panel.panel-default.panel-facilityReservation')
+
+async def wait_for_first_panel(page, timeout=TIME_TO_WAIT_FOR_SEARCH_RESULTS):
+    """Wait until the first reservation panel is rendered, or give up after the timeout."""
+    try:
+        await page.wait_for_selector('.panel.panel-default.panel-facilityReservation', timeout=timeout)
+    except Exception as e:
+        log_event(logger, 'results_wait_timeout', 'Finished waiting for the calendar.', timeoutMs=timeout)
+
+async def read_search_results(page, timeout=TIME_TO_WAIT_FOR_SEARCH_RESULTS):
+    """Wait for the search results and extract the reservations shown on the page."""
+    reservation_elements = await wait_for_search_results(page, timeout)
+    return await generate_available_booking_list(reservation_elements)
+
+def build_result_data(reservations, url):
+    """Wrap extracted reservations with the metadata sent to notifications."""
+    return {
+        'reservations': reservations,
+        'url': url,
+        'timestamp': datetime.now().isoformat(),
+        'timezone': datetime.now().astimezone().tzname()
+    }
+
+def save_test_results(result_data):
+    """Dump results to disk when running in test mode."""
+    with open('docs/badminton_results.json', 'w') as f:
+        json.dump(result_data, f, indent=2, default=str)
+    log_event(logger, 'test_results_saved', 'Results saved to docs/badminton_results.json',
+              path='docs/badminton_results.json', reservations=len(result_data['reservations']))
+
+def get_neighborhoods():
+    """Get neighborhoods from environment variables."""
+    neighborhoods_str = os.environ.get('NEIGHBORHOODS', '')
+    return [n.strip() for n in neighborhoods_str.split(',')]
+
+async def reserve_as_read(panels, reserver):
+    """Pass panels on, offering each one to the auto-reserver the moment it is read."""
+    async for panel in panels:
+        detected_at = time.perf_counter()
+        with log_phase('reserve'):
+            await reserver.offer(parse_panel(panel), detected_at)
+        yield panel
+    with log_phase('reserve'):
+        await reserver.finish()
+
+def update_facility_index(facilities, reservations, coverage, seen_names=()):
+    """Add the court names of a scan to the facility index and enrich the ones it just learned.
+
+    ``seen_names`` holds the names of every panel read, including those
+    ``PANEL_FILTER`` left out of ``reservations``.
+    """
+    names = {res.get('name', '') for res in reservations} | set(seen_names)
+    unseen = facilities.unseen(names)
+    # Names can only be attributed to a borough when the search was really limited to it
+    covered = coverage['neighborhoods']['covered'] if not coverage['neighborhoods']['missing'] else []
+    if facilities.learn(names, covered):
+        for res in reservations:
+            facilities.enrich(res)
+        unresolved = len(facilities.unresolved())
+        log_event(logger, 'facility_index_updated',
+                  f"Facility index: {len(unseen)} new names, {unresolved} without a known borough",
+                  newNames=len(unseen), unresolved=unresolved)
+    facilities.save()
+
+async def check_available_courts(args, url=None, neighborhoods=None, dates=None, on_panels=None, time_window=None):
+    """Check available badminton courts and return results.
+
+    The booking URL, neighborhoods, dates and ``(start, end)`` time window
+    default to the configured search and can be overridden to scan a single
+    shard of the search space. When
+    ``on_panels`` is given, it is awaited with the stream of raw panels and the
+    results URL while the browser is still reading them, and must return the
+    parsed reservations.
+    """
     is_headless = args.headless
     slow_mo_value = args.slow
     test_mode = args.test
+    auto_reserve_enabled = args.auto_reserve
 
-    # Get neighborhoods from environment variables
-    neighborhoods_str = os.environ.get('NEIGHBORHOODS', '')
-    neighborhoods = [n.strip() for n in neighborhoods_str.split(',')]
+    if neighborhoods is None:
+        neighborhoods = get_neighborhoods()
+    
+    # Get the booking URL from the .env file
+    url = url or os.getenv('BOOKING_URL', '')
+    if not url:
+        log_event(logger, 'config_missing', "Please set the BOOKING_URL environment variable.", logging.ERROR,
+                  setting='BOOKING_URL')
+        return None
+    
+    if dates is None:
+        dates = generate_selected_date()
     
-    select_time = True
-    TIME_TO_WAIT_FOR_SEARCH_RESULTS = 12000  # 12 seconds
+    settings = get_settings()
+    recorder = FlightRecorder(
+        settings.flight_recorder_max_events,
+        settings.flight_recorder_max_bytes,
+        settings.flight_recorder_screenshots,
+    )
+    # Every process on this machine scanning the site draws from the same per-host budget
+    governor = crawl_governor_from_settings(settings)
+    throttle = lambda: governor.acquire(url)
+    facilities = FacilityIndex(settings.facility_index_path, settings.facility_seed_path or None)
     
     async with async_playwright() as p:
-        # Browser Launch options
-        browser = await p.chromium.launch(
-            headless=is_headless,
-            slow_mo=slow_mo_value
-        )
-
-        context = await browser.new_context(
-            locale='en-US',
-            timezone_id='America/New_York',  # This sets the browser timezone to Eastern Time
-        )
-        
-        page = await context.new_page()
-        
-        # Get the booking URL from the .env file
-        url = os.getenv('BOOKING_URL', '')
-        if not url:
-            print("Please set the BOOKING_URL environment variable.")
-            return None
-        
-        await page.goto(url)
-        
-        # Click on 'Reserve a space' link
-        await page.get_by_role('link', name='Reserve a space').click()
+        browser, page = await launch_browser(p, is_headless, slow_mo_value)
+        recorder.attach(page)
+        governor.attach(page, [host_of(url)])
         
-        # Accept cookies
-        await page.get_by_role('button', name='Accepter tout').click()
-        
-        # Click on Badminton
-        await page.locator('a:has-text("Badminton")').click()
-        
-        # Select Neighborhood based on environment variable
-        await page.get_by_text('Arrondissement Tous').click()
-        
-        # Check each neighborhood in the list
-        for neighborhood in neighborhoods:
-            try:
-                print(f"Selecting neighborhood: {neighborhood}")
-                await page.get_by_role('checkbox', name=neighborhood).check()
-            except Exception as e:
-                print(f"Could not find neighborhood: {neighborhood}. Error: {e}")
-                
-        await page.get_by_role('button', name='Confirmer').click()
-        
-        if select_time:
-            await select_time_on_page(page)
-            
-        # Select the date from the calendar for the next 4 days, clicking all matching buttons for each date
-        calendar_button = page.locator('#u6510_btnFacilityReservationSearchReserveDateCalendar').nth(0)
-        for date in generate_selected_date():
-            await calendar_button.click()  # Open the calendar
-            date_buttons = await page.locator(f'button:has(span:has-text("{date}"))').all()
-            for i, button in enumerate(date_buttons):
-                await button.click()
-                if i < len(date_buttons) - 1:  # Reopen the calendar if not the last button
-                    await calendar_button.click()
-        
-        # Wait for search results to load
         try:
-            # Wait for reservation panels to appear
-            await page.wait_for_selector('.panel.panel-default.panel-facilityReservation', timeout=TIME_TO_WAIT_FOR_SEARCH_RESULTS)
+            navigator = CheckpointedNavigator(
+                page, parse_stage_policies(settings.stage_policies), recorder, throttle=throttle
+            )
+            reserver = None
+            # Facility names of every panel read, including the ones the panel filter rejects
+            seen_names = set()
+            try:
+                with log_phase('navigate'):
+                    await open_filtered_search(
+                        page, url, neighborhoods, dates, navigator=navigator, time_window=time_window
+                    )
+                # Capture the results URL before any reservation leaves the page
+                current_url = page.url
+                # Extract reservation data
+                with log_phase('extract'):
+                    panel_filter = parse_panel_filter(settings.panel_filter)
+                    await wait_for_first_panel(page)
+                    if settings.harvest_mode == 'incremental':
+                        panels = harvest_panels(
+                            page, panel_filter=panel_filter, throttle=throttle, names=seen_names
+                        )
+                    else:
+                        panels = snapshot_panels(page, panel_filter, names=seen_names)
+                    panels = enrich_panels(panels, facilities)
+                    if auto_reserve_enabled:
+                        # Reserve while the results page is open, before any bookkeeping of the scan
+                        reserver = AutoReserver(
+                            page,
+                            parse_reserve_rules(settings.auto_reserve_rules),
+                            settings.auto_reserve_max_per_day,
+                            settings.data_dir / 'auto_reservations.json',
+                        )
+                        panels = reserve_as_read(panels, reserver)
+                    if on_panels is None:
+                        reservations = [parse_panel(panel) async for panel in panels]
+                    else:
+                        reservations = await on_panels(panels, current_url)
+            except StageFailed as e:
+                # Keep the run alive and report how far the search got
+                log_event(logger, 'search_aborted', f"Search aborted: {e}", logging.WARNING, error=str(e))
+                current_url = page.url
+                reservations = []
+            coverage = navigator.coverage(neighborhoods, dates)
+            if not coverage['complete']:
+                log_event(
+                    logger, 'partial_results',
+                    f"Partial results: missing neighborhoods {coverage['neighborhoods']['missing']}, "
+                    f"missing dates {coverage['dates']['missing']}, failed stages {coverage['failedStages']}",
+                    logging.WARNING,
+                    missingNeighborhoods=coverage['neighborhoods']['missing'],
+                    missingDates=coverage['dates']['missing'],
+                    failedStages=coverage['failedStages'],
+                )
+            update_facility_index(facilities, reservations, coverage, seen_names)
+            recorder.record('results', count=len(reservations))
         except Exception as e:
-            print('Finished waiting for the calendar.')
+            recorder.dump(settings.flight_recorder_dir, f"run failed: {e}")
+            SCANS.inc(outcome='failed')
+            SCAN_DURATION.observe(time.perf_counter() - recorder.started, outcome='failed')
+            log_event(logger, 'scan_failed', f"Scan failed: {e}", logging.ERROR, exc_info=True,
+                      durationSeconds=round(time.perf_counter() - recorder.started, 3))
+            raise
+        finally:
+            await browser.close()
         
-        # Extract reservation data
-        reservation_elements = await page.query_selector_all('.panel.panel-default.panel-facilityReservation')
-        reservations = await generate_available_booking_list(reservation_elements)
-        
-        # Capture current URL before closing the browser
-        current_url = page.url
+        # Keep the recording only for runs worth investigating
+        run_seconds = time.perf_counter() - recorder.started
+        outcome = 'complete' if coverage['complete'] else 'partial'
+        SCANS.inc(outcome=outcome)
+        SCAN_DURATION.observe(run_seconds, outcome=outcome)
+        for stage in coverage['failedStages']:
+            # 'neighborhood:Ahuntsic' counts as a 'neighborhood' failure
+            STAGE_FAILURES.inc(stage=stage.split(':')[0])
+        bookable = sum(1 for res in reservations if res.get('canReserve', False))
+        SLOTS_SEEN.inc(bookable, bookable='true')
+        SLOTS_SEEN.inc(len(reservations) - bookable, bookable='false')
+        log_event(
+            logger, 'scan_finished',
+            f"Scan {outcome}: {len(reservations)} slots, {bookable} bookable in {run_seconds:.1f}s",
+            outcome=outcome, slots=len(reservations), bookable=bookable,
+            durationSeconds=round(run_seconds, 3), neighborhoods=len(neighborhoods), dates=len(dates),
+        )
+        if not coverage['complete']:
+            recorder.dump(settings.flight_recorder_dir, "partial results")
+        elif run_seconds > settings.flight_recorder_latency_threshold_seconds:
+            recorder.dump(settings.flight_recorder_dir, f"slow run: {run_seconds:.1f}s")
         
         # Prepare results data
-        result_data = {
-            'reservations': reservations,
-            'url': current_url,
-            'timestamp': datetime.now().isoformat(),
-            'timezone': datetime.now().astimezone().tzname()
-        }
+        result_data = build_result_data(reservations, current_url)
+        result_data['coverage'] = coverage
+        if reserver and reserver.attempts:
+            result_data['autoReserve'] = reserver.attempts
         
         if test_mode:
-            with open('docs/badminton_results.json', 'w') as f:
-                json.dump(result_data, f, indent=2, default=str)
-            print('Results saved to data/badminton_results.json')
+            save_test_results(result_data)
         
-        await browser.close()
-        return result_data
\ No newline at end of file
+        return result_data
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Bounded in-memory recording of page events, dumped only for failed or slow runs."""
+
+import base64
+import json
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from badminton_booker.metrics.event_log import log_event
+
+MAX_TEXT_LENGTH = 300
+
+logger = logging.getLogger(__name__)
+
+
+def _truncate(text) -> str:
+    """Keep long URLs and console messages from dominating the buffer."""
+    text = str(text)
+    return text if len(text) <= MAX_TEXT_LENGTH else text[:MAX_TEXT_LENGTH] + '...'
+
+
+class FlightRecorder:
+    """Ring buffer of recent page events with a hard memory cap.
+
+    Events are kept in memory only. Once either the event count or the
+    approximate byte size exceeds its limit, the oldest events are dropped.
+    Nothing touches the disk unless ``dump`` is called.
+    """
+
+    def __init__(self, max_events: int = 1000, max_bytes: int = 5_000_000, screenshots: bool = False):
+        """Initialize an empty recorder."""
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.screenshots = screenshots
+        self.events = deque()
+        self.size = 0
+        self.dropped = 0
+        self.started = time.perf_counter()
+
+    def record(self, kind: str, **fields) -> None:
+        """Add an event, evicting the oldest ones to stay within the caps."""
+        event = {'t': round((time.perf_counter() - self.started) * 1000, 1), 'kind': kind, **fields}
+        event_size = len(json.dumps(event, default=str))
+        if event_size > self.max_bytes:
+            self.dropped += 1
+            return
+
+        self.events.append((event, event_size))
+        self.size += event_size
+        while len(self.events) > self.max_events or self.size > self.max_bytes:
+            _, evicted_size = self.events.popleft()
+            self.size -= evicted_size
+            self.dropped += 1
+
+    def attach(self, page) -> None:
+        """Record navigations, requests, responses, console messages and page errors of a page."""
+        page.on('framenavigated', lambda frame: self.record('navigation', url=_truncate(frame.url))
+                if frame == page.main_frame else None)
+        page.on('request', lambda request: self.record('request', method=request.method, url=_truncate(request.url)))
+        page.on('response', lambda response: self.record('response', status=response.status, url=_truncate(response.url)))
+        page.on('requestfailed', lambda request: self.record('requestfailed', url=_truncate(request.url)))
+        page.on('console', lambda message: self.record('console', type=message.type, text=_truncate(message.text)))
+        page.on('pageerror', lambda error: self.record('pageerror', error=_truncate(error)))
+
+    def record_step(self, stage: str, status: str, duration_ms: float, error=None) -> None:
+        """Record the outcome and duration of a navigation stage."""
+        fields = {'stage': stage, 'status': status, 'durationMs': round(duration_ms, 1)}
+        if error is not None:
+            fields['error'] = _truncate(error)
+        self.record('step', **fields)
+
+    async def capture_screenshot(self, page, stage: str) -> None:
+        """Store a low resolution JPEG of the page at a step boundary, if enabled."""
+        if not self.screenshots:
+            return
+        try:
+            image = await page.screenshot(type='jpeg', quality=20, scale='css', timeout=2000)
+            self.record('screenshot', stage=stage, jpegBase64=base64.b64encode(image).decode('ascii'))
+        except Exception as e:
+            self.record('screenshot', stage=stage, error=_truncate(e))
+
+    def snapshot(self) -> list:
+        """Return the buffered events, oldest first."""
+        return [event for event, _ in self.events]
+
+    def dump(self, directory: Path, reason: str) -> Path:
+        """Write the buffered events to a JSON file and return its path."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"flight_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.json"
+        with open(path, 'w') as f:
+            json.dump({
+                'reason': reason,
+                'durationMs': round((time.perf_counter() - self.started) * 1000, 1),
+                'droppedEvents': self.dropped,
+                'events': self.snapshot(),
+            }, f, default=str)
+        log_event(logger, 'flight_recorder_saved', f"Flight recorder saved to {path} ({reason})",
+                  path=str(path), reason=reason, droppedEvents=self.dropped)
+        return path
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""Per-host token bucket shared by every scan on the machine, with backoff when the site pushes back."""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlparse
+from badminton_booker.metrics.event_log import log_event
+from badminton_booker.metrics.registry import REGISTRY
+
+try:
+    import fcntl
+except ImportError:  # Windows: the state is then only shared within one process
+    fcntl = None
+
+# Responses of these types count as navigations and searches against the site
+GOVERNED_RESOURCE_TYPES = ('document', 'xhr', 'fetch')
+
+# URL fragments of the challenge pages served instead of the booking site
+CAPTCHA_MARKERS = ('captcha', 'challenge', 'cf_chl', 'are-you-human')
+
+WAIT_SECONDS = REGISTRY.histogram(
+    'crawl_governor_wait_seconds', 'Time spent waiting for the crawl governor before a request.',
+    buckets=(0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300))
+BACKOFFS = REGISTRY.counter('crawl_governor_backoffs', 'Backoffs started because the site pushed back.', ['reason'])
+
+logger = logging.getLogger(__name__)
+
+
+def host_of(url: str) -> str:
+    """Return the host a URL points to, accepting a bare host name as well."""
+    if '//' not in url:
+        return url
+    return urlparse(url).hostname or url
+
+
+def parse_crawl_rates(spec: str) -> dict:
+    """Parse ``CRAWL_RATES`` such as ``loisirs.montreal.ca=1:5,example.com=0.2``.
+
+    Returns:
+        dict: Host to ``(requests per second, burst)``; the burst defaults to 1.
+
+    Raises:
+        ValueError: If a rate is not a positive number or a burst is below 1.
+    """
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        host, _, value = item.partition('=')
+        rate, _, burst = value.partition(':')
+        rate, burst = float(rate), int(burst) if burst else 1
+        if rate <= 0:
+            raise ValueError(f"Rate of {host.strip()} must be positive, got {rate}")
+        if burst < 1:
+            raise ValueError(f"Burst of {host.strip()} must be at least 1, got {burst}")
+        rates[host.strip()] = (rate, burst)
+    return rates
+
+
+def looks_like_captcha(url: str, headers: dict = None) -> bool:
+    """Check a response for the signs of a CAPTCHA or bot challenge page."""
+    headers = headers or {}
+    if headers.get('cf-mitigated', '').lower() == 'challenge':
+        return True
+    return any(marker in url.lower() for marker in CAPTCHA_MARKERS)
+
+
+class CrawlGovernor:
+    """Token bucket per host, persisted in a JSON file guarded by a file lock.
+
+    Every process on the machine reading the same state file draws from the
+    same buckets, so parallel workers together stay within the configured
+    rate. A 429, a 5xx or a CAPTCHA page blocks the host for an exponentially
+    growing period that decays again as requests succeed.
+    """
+
+    def __init__(self, state_path, rates: dict = None, default_rate: float = 2.0, default_burst: int = 10,
+                 base_backoff_seconds: float = 5.0, max_backoff_seconds: float = 300.0):
+        """Initialize the governor.
+
+        Args:
+            state_path: JSON file holding the buckets, shared by every process using it
+            rates (dict): Host to ``(requests per second, burst)``
+            default_rate (float): Requests per second for hosts without their own rate
+            default_burst (int): Requests allowed back to back for hosts without their own rate
+            base_backoff_seconds (float): First backoff after the site pushes back
+            max_backoff_seconds (float): Longest backoff
+        """
+        self.state_path = Path(state_path)
+        self.rates = rates or {}
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._backed_off = set()
+        # Reports running in threads, referenced until they finish
+        self._reports = set()
+
+    def rate_for(self, host: str) -> tuple:
+        """Return ``(requests per second, burst)`` of a host."""
+        return self.rates.get(host, (self.default_rate, self.default_burst))
+
+    @contextmanager
+    def _state(self):
+        """Lock the state file and yield its contents, writing them back on exit."""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_path.with_name(self.state_path.name + '.lock'), 'w') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.state_path) as f:
+                        state = json.load(f)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    state = {}
+                yield state
+                temp_path = self.state_path.with_name(self.state_path.name + f'.{os.getpid()}.tmp')
+                with open(temp_path, 'w') as f:
+                    json.dump(state, f)
+                os.replace(temp_path, self.state_path)
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _bucket(self, state: dict, host: str, now: float) -> dict:
+        """Return the bucket of a host with its tokens refilled up to ``now``."""
+        rate, burst = self.rate_for(host)
+        bucket = state.setdefault(host, {'tokens': burst, 'updated': now, 'blockedUntil': 0, 'backoff': 0})
+        bucket['tokens'] = min(burst, bucket['tokens'] + max(0, now - bucket['updated']) * rate)
+        bucket['updated'] = now
+        return bucket
+
+    def try_acquire(self, url: str, now: float = None) -> float:
+        """Take a token for the host if one is available.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds to wait before trying again.
+        """
+        host = host_of(url)
+        now = time.time() if now is None else now
+        with self._state() as state:
+            bucket = self._bucket(state, host, now)
+            if bucket['blockedUntil'] > now:
+                return bucket['blockedUntil'] - now
+            if bucket['tokens'] >= 1:
+                bucket['tokens'] -= 1
+                return 0.0
+            rate, _ = self.rate_for(host)
+            return (1 - bucket['tokens']) / rate
+
+    async def acquire(self, url: str) -> float:
+        """Wait until a request to the host of ``url`` is allowed.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            wait = await asyncio.to_thread(self.try_acquire, url)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+            waited += wait
+        WAIT_SECONDS.observe(waited)
+        return waited
+
+    @staticmethod
+    def _pushback_reason(status: int, captcha: bool):
+        """Return why a response counts as the site pushing back, or None."""
+        if captcha:
+            return 'captcha'
+        if status == 429:
+            return 'throttled'
+        if status >= 500:
+            return 'server_error'
+        return None
+
+    def needs_report(self, url: str, status: int, captcha: bool = False) -> bool:
+        """Check whether a response changes anything, without touching the state file.
+
+        Successes only matter while this process has a backoff to decay.
+        """
+        return self._pushback_reason(status, captcha) is not None or host_of(url) in self._backed_off
+
+    def report(self, url: str, status: int, captcha: bool = False, retry_after: float = None, now: float = None):
+        """Feed a response back into the governor.
+
+        Throttling, server errors and CAPTCHA pages double the backoff of the
+        host and block it for that long, or for ``Retry-After`` when longer.
+        Other responses halve the backoff. This locks and writes the state
+        file, so call it from a thread when on the event loop.
+        """
+        host = host_of(url)
+        now = time.time() if now is None else now
+        reason = self._pushback_reason(status, captcha)
+        if not self.needs_report(host, status, captcha):
+            return
+
+        with self._state() as state:
+            bucket = self._bucket(state, host, now)
+            if reason is None:
+                bucket['backoff'] = bucket['backoff'] / 2 if bucket['backoff'] > self.base_backoff_seconds else 0
+                if not bucket['backoff']:
+                    self._backed_off.discard(host)
+                return
+            if bucket['blockedUntil'] > now:
+                # Responses to requests already in flight when the backoff started
+                return
+            backoff = min(self.max_backoff_seconds, max(self.base_backoff_seconds, bucket['backoff'] * 2))
+            bucket['backoff'] = backoff
+            bucket['blockedUntil'] = now + max(backoff, retry_after or 0)
+            bucket['tokens'] = 0
+        self._backed_off.add(host)
+        BACKOFFS.inc(reason=reason)
+        log_event(logger, 'crawl_backoff',
+                  f"Backing off {host} for {max(backoff, retry_after or 0):.0f}s ({reason}, status {status})",
+                  logging.WARNING, host=host, seconds=max(backoff, retry_after or 0), reason=reason, status=status)
+
+    def attach(self, page, hosts: list) -> None:
+        """Report the document and XHR responses of a page coming from the governed hosts.
+
+        The reports run in threads, so the file lock never blocks the event loop.
+        """
+        def on_response(response):
+            if response.request.resource_type not in GOVERNED_RESOURCE_TYPES:
+                return
+            headers = response.headers
+            captcha = looks_like_captcha(response.url, headers)
+            host = host_of(response.url)
+            # A challenge served from a third party host still counts against the site
+            if host not in hosts:
+                if not captcha:
+                    return
+                host = hosts[0]
+            if not self.needs_report(host, response.status, captcha):
+                return
+            retry_after = headers.get('retry-after', '')
+            task = asyncio.get_running_loop().create_task(asyncio.to_thread(
+                self.report,
+                host,
+                response.status,
+                captcha=captcha,
+                retry_after=float(retry_after) if retry_after.isdigit() else None,
+            ))
+            self._reports.add(task)
+            task.add_done_callback(self._reports.discard)
+
+        page.on('response', on_response)
+
+
+def crawl_governor_from_settings(settings) -> CrawlGovernor:
+    """Build the governor shared by every scan on the machine from the settings."""
+    return CrawlGovernor(
+        settings.crawl_state_path,
+        parse_crawl_rates(settings.crawl_rates),
+        settings.crawl_default_rate,
+        settings.crawl_default_burst,
+        max_backoff_seconds=settings.crawl_max_backoff_seconds,
+    )
@@ -56,3 +56,14 @@ def convert_to_proper_timezone(time: datetime) -> datetime:
     """Convert time to the proper timezone."""
     return time.astimezone(ZoneInfo("America/New_York"))
 
+def restore_reservation_times(reservation: dict) -> dict:
+    """Convert serialized startTime/endTime strings of a reservation back into datetime objects."""
+    restored = dict(reservation)
+    for key in ('startTime', 'endTime'):
+        value = restored.get(key)
+        if isinstance(value, str) and value:
+            try:
+                restored[key] = datetime.fromisoformat(value)
+            except ValueError:
+                pass
+    return restored
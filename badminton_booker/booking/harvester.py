@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""Incremental harvesting of reservation panels as the results page renders them."""
+
+import asyncio
+import logging
+import time
+from badminton_booker.booking.panel_filter import PANEL_FILTER_JS
+from badminton_booker.metrics.event_log import log_event
+
+PANEL_SELECTOR = '.panel.panel-default.panel-facilityReservation'
+
+# Candidate controls that reveal more results, tried in order
+NEXT_PAGE_SELECTORS = [
+    'button:has-text("Afficher plus")',
+    'button:has-text("Voir plus")',
+    'button:has-text("Show more")',
+    '.pagination li:not(.disabled) a[aria-label="Next"]',
+    '.pagination li.next:not(.disabled) a',
+]
+ACTIVE_PAGE_SELECTOR = '.pagination li.active'
+
+# Reads the raw fields of one panel element, the in-page twin of courts.extract_panel
+EXTRACT_PANEL_JS = """
+(el) => {
+    const text = (node) => (node && node.textContent ? node.textContent.trim() : '');
+    const whens = el.querySelectorAll('.panel-body .when');
+    const dateParts = whens.length > 0 ? (whens[0].textContent || '').split(',') : [];
+    let price = '';
+    el.querySelectorAll('.panel-body .ng-binding').forEach((priceEl) => {
+        const priceText = priceEl.textContent || '';
+        if (priceText.includes('$')) {
+            price = priceText.replace('$', '').trim();
+        }
+    });
+    const button = el.querySelector('button[ng-click*="vm.onReserve"]');
+    const classes = button ? button.getAttribute('class') : null;
+    return {
+        name: text(el.querySelector('.panel-heading .fake-link')),
+        date: dateParts.length > 1 ? dateParts[1].trim() : '',
+        startTime: dateParts.length > 2 ? dateParts[2].trim() : '',
+        endTime: whens.length > 1 ? text(whens[1]) : '',
+        price: price,
+        canReserve: classes ? !classes.includes('disabled') : false,
+        buttonId: button ? button.getAttribute('id') : null,
+    };
+}
+"""
+
+# Extracts and filters every panel already on the page in one call, for snapshot mode.
+# The names of every panel come back as well, filtered out or not, for the facility index.
+SNAPSHOT_PANELS_JS = """
+(elements, filter) => {
+    const matches = filter ? (__PANEL_FILTER__)(filter) : () => true;
+    const extract = __EXTRACT_PANEL__;
+    const panels = elements.map(extract);
+    const names = [...new Set(panels.map((panel) => panel.name))];
+    return { panels: panels.filter(matches), total: elements.length, names: names };
+}
+""".replace('__PANEL_FILTER__', PANEL_FILTER_JS.strip()).replace('__EXTRACT_PANEL__', EXTRACT_PANEL_JS.strip())
+
+# Installs a MutationObserver that extracts every new panel once, in the page.
+# Each mutation batch only extracts the panels it added or changed: elements
+# already extracted are remembered in a WeakSet, so the work per batch does not
+# grow with the number of panels on the page. Panels are still keyed by their
+# content, so nodes recycled by a virtualized list are picked up again when
+# their content changes, while panels seen before are never queued again. Only
+# the panels passing the filter are queued for Python, along with the name of
+# every new panel.
+INSTALL_HARVESTER_JS = """
+([panelSelector, filter]) => {
+    if (window.__badmintonHarvester) {
+        return window.__badmintonHarvester.total;
+    }
+    const matches = filter ? (__PANEL_FILTER__)(filter) : () => true;
+    const extract = __EXTRACT_PANEL__;
+    const state = { queue: [], names: [], seen: new Set(), total: 0, returned: 0 };
+    const processed = new WeakSet();
+    const pending = new Set();
+    const read = (el) => {
+        processed.add(el);
+        const panel = extract(el);
+        const key = [panel.name, panel.date, panel.startTime, panel.endTime].join('|');
+        if (!state.seen.has(key)) {
+            state.seen.add(key);
+            state.total += 1;
+            state.names.push(panel.name);
+            if (matches(panel)) {
+                state.returned += 1;
+                state.queue.push(panel);
+            }
+        }
+    };
+    // A node changed in place: read the panel around it again, it may have been recycled
+    const changed = (node) => {
+        const el = node.nodeType === 1 ? node : node.parentElement;
+        const panel = el ? el.closest(panelSelector) : null;
+        if (panel) {
+            pending.add(panel);
+        }
+    };
+    // A node was inserted: read the panels it brings that were never read
+    const added = (node) => {
+        changed(node);
+        if (node.nodeType === 1) {
+            node.querySelectorAll(panelSelector).forEach((el) => {
+                if (!processed.has(el)) {
+                    pending.add(el);
+                }
+            });
+        }
+    };
+    const flush = () => {
+        pending.forEach(read);
+        pending.clear();
+    };
+    let scheduled = false;
+    const observer = new MutationObserver((records) => {
+        records.forEach((record) => {
+            changed(record.target);
+            record.addedNodes.forEach(added);
+        });
+        if (!scheduled) {
+            scheduled = true;
+            queueMicrotask(() => { scheduled = false; flush(); });
+        }
+    });
+    observer.observe(document.body, { childList: true, subtree: true, characterData: true });
+    state.observer = observer;
+    window.__badmintonHarvester = state;
+    document.querySelectorAll(panelSelector).forEach(read);
+    return state.total;
+}
+""".replace('__PANEL_FILTER__', PANEL_FILTER_JS.strip()).replace('__EXTRACT_PANEL__', EXTRACT_PANEL_JS.strip())
+
+DRAIN_HARVESTER_JS = """
+() => {
+    const state = window.__badmintonHarvester;
+    return state ? { panels: state.queue.splice(0), seen: state.total, names: state.names.splice(0) } : null;
+}
+"""
+
+logger = logging.getLogger(__name__)
+
+
+async def _drain(page):
+    """Take the panels extracted since the last drain.
+
+    Returns:
+        tuple: The panels that passed the filter, the number of distinct panels seen so far and
+        the names of the panels seen since the last drain, or None when the page was reloaded
+        and lost the harvester.
+    """
+    drained = await page.evaluate(DRAIN_HARVESTER_JS)
+    return (drained['panels'], drained['seen'], drained['names']) if drained else None
+
+
+def _panel_key(panel: dict) -> str:
+    """Identify a panel by its content, as the in-page harvester does."""
+    return '|'.join(str(panel.get(field, '')) for field in ('name', 'date', 'startTime', 'endTime'))
+
+
+async def _page_marker(page):
+    """Identify the current result page, or None when the list is not paginated."""
+    active = page.locator(ACTIVE_PAGE_SELECTOR)
+    if await active.count() == 0:
+        return None
+    return (await active.first.text_content() or '').strip()
+
+
+async def _advance(page):
+    """Reveal more results through pagination, a 'show more' control or scrolling.
+
+    Returns:
+        bool: True if an action was taken that may reveal unseen panels.
+    """
+    for selector in NEXT_PAGE_SELECTORS:
+        control = page.locator(selector)
+        if await control.count() == 0 or not await control.first.is_visible():
+            continue
+        await control.first.click()
+        return True
+
+    # Lazily rendered lists load more when scrolled to the bottom
+    return await page.evaluate(
+        "() => { const before = window.scrollY; window.scrollTo(0, document.body.scrollHeight); return window.scrollY > before; }"
+    )
+
+
+async def snapshot_panels(page, panel_filter=None, names=None):
+    """Yield the raw fields of the panels on the page, extracted and filtered in a single call.
+
+    Panels the filter rejects never leave the page, and the whole result list
+    costs one round trip instead of several per panel. The facility names of
+    every panel, including rejected ones, are added to the ``names`` set when given.
+    """
+    snapshot = await page.eval_on_selector_all(PANEL_SELECTOR, SNAPSHOT_PANELS_JS, panel_filter)
+    if names is not None:
+        names.update(snapshot['names'])
+    log_event(logger, 'panels_harvested',
+              f"Read {snapshot['total']} reservation panels, {len(snapshot['panels'])} returned after in-page filtering",
+              panels=snapshot['total'], returned=len(snapshot['panels']))
+    for panel in snapshot['panels']:
+        yield panel
+
+
+async def harvest_panels(page, idle_ms=1000, poll_ms=100, max_advances=50, panel_filter=None, throttle=None,
+                         names=None):
+    """Yield the raw fields of every panel exactly once as the page renders them.
+
+    Panels are extracted in the page by a mutation observer. Once no new panel
+    has appeared for ``idle_ms``, the harvester moves to the next page, clicks
+    'show more' or scrolls, and stops when that reveals nothing new or leads
+    back to a result page it has already read. With a ``panel_filter`` spec
+    (see ``panel_filter.build_panel_filter``), panels it rejects never leave the page,
+    but their facility names are still added to the ``names`` set when given.
+    ``throttle`` is awaited before every advance that may load more results.
+    If the page is reloaded meanwhile, e.g. by an auto-reserve attempt, the
+    harvester is installed again and panels already yielded are skipped.
+    """
+    await page.evaluate(INSTALL_HARVESTER_JS, [PANEL_SELECTOR, panel_filter])
+    seen_pages = set()
+    yielded = set()
+    total = 0
+    returned = 0
+    # Panels counted by harvesters lost to a reload
+    seen_before = 0
+
+    for _ in range(max_advances + 1):
+        marker = await _page_marker(page)
+        if marker is not None:
+            if marker in seen_pages:
+                break
+            seen_pages.add(marker)
+
+        # Drain until the page has been quiet for the idle period
+        found_on_step = 0
+        last_new = time.perf_counter()
+        while (time.perf_counter() - last_new) * 1000 < idle_ms:
+            drained = await _drain(page)
+            if drained is None:
+                seen_before = total + found_on_step
+                await page.evaluate(INSTALL_HARVESTER_JS, [PANEL_SELECTOR, panel_filter])
+                continue
+            panels, seen, seen_names = drained
+            if names is not None:
+                names.update(seen_names)
+            seen += seen_before
+            if seen > total + found_on_step:
+                last_new = time.perf_counter()
+                found_on_step = seen - total
+            panels = [panel for panel in panels if _panel_key(panel) not in yielded]
+            returned += len(panels)
+            for panel in panels:
+                yielded.add(_panel_key(panel))
+                yield panel
+            if not panels:
+                await asyncio.sleep(poll_ms / 1000)
+        total += found_on_step
+
+        # Stop when the previous advance revealed nothing or there is nowhere left to go
+        if found_on_step == 0 and total > 0 and marker is None:
+            break
+        if throttle:
+            await throttle()
+        if not await _advance(page):
+            break
+
+    log_event(logger, 'panels_harvested',
+              f'Harvested {total} reservation panels, {returned} returned after in-page filtering',
+              panels=total, returned=returned)
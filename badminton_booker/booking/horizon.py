@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Tiered look-ahead horizon: near dates are scanned often, far dates rarely, the rest come from cache."""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from badminton_booker.booking.courts import build_result_data, check_available_courts
+from badminton_booker.booking.handle_time import restore_reservation_times
+from badminton_booker.metrics.event_log import log_event
+
+logger = logging.getLogger(__name__)
+
+
+class HorizonTier:
+    """A range of days ahead of today that is rescanned once its refresh interval has passed."""
+
+    def __init__(self, first_day: int, last_day: int, refresh_seconds: int):
+        """Initialize the tier covering ``first_day`` to ``last_day`` days from today, inclusive."""
+        if first_day < 0 or last_day < first_day:
+            raise ValueError(f"Invalid horizon tier days: {first_day}-{last_day}")
+        self.first_day = first_day
+        self.last_day = last_day
+        self.refresh_seconds = refresh_seconds
+
+    @property
+    def key(self) -> str:
+        """Name of the tier in logs."""
+        return f'{self.first_day}-{self.last_day}'
+
+    def __repr__(self):
+        return f"HorizonTier({self.key}, refresh_seconds={self.refresh_seconds})"
+
+    def days(self, today: datetime) -> list:
+        """Return the dates of the tier."""
+        return [(today + timedelta(days=i)).date() for i in range(self.first_day, self.last_day + 1)]
+
+
+def parse_horizon_tiers(spec: str) -> list[HorizonTier]:
+    """Parse ``HORIZON_TIERS`` such as ``0-1=300,2-4=1800,5-13=21600`` (days ahead = refresh seconds).
+
+    A single day may be written without a range, e.g. ``0=120``.
+    """
+    tiers = []
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        days, _, refresh = item.partition('=')
+        first, _, last = days.partition('-')
+        tiers.append(HorizonTier(int(first), int(last or first), int(refresh)))
+    tiers.sort(key=lambda tier: tier.first_day)
+    for previous, tier in zip(tiers, tiers[1:]):
+        if tier.first_day <= previous.last_day:
+            raise ValueError(f"Horizon tiers {previous.key} and {tier.key} overlap")
+    return tiers
+
+
+def load_horizon_state(path) -> dict:
+    """Load the cached reservations per date with when each date was last scanned."""
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'dates': {}}
+    state.setdefault('dates', {})
+    return state
+
+
+def save_horizon_state(path, state: dict) -> None:
+    """Write the horizon state, replacing the file atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + f'.{os.getpid()}.tmp')
+    with open(temp_path, 'w') as f:
+        json.dump(state, f, default=str)
+    os.replace(temp_path, path)
+
+
+def due_tiers(tiers: list[HorizonTier], state: dict, today: datetime, now: float = None) -> list[HorizonTier]:
+    """Return the tiers with a date that was never scanned or not within the tier's refresh interval.
+
+    Freshness is tracked per date, so a date moving into a tier after midnight,
+    or one a partial scan missed, makes its tier due right away.
+    """
+    now = time.time() if now is None else now
+    return [
+        tier for tier in tiers
+        if any(
+            day.isoformat() not in state['dates']
+            or now - state['dates'][day.isoformat()]['scannedAt'] >= tier.refresh_seconds
+            for day in tier.days(today)
+        )
+    ]
+
+
+def _reservation_date(reservation: dict):
+    """Return the ISO date of a reservation, or None when its start time is unknown."""
+    start_time = reservation.get('startTime')
+    return start_time.date().isoformat() if isinstance(start_time, datetime) else None
+
+
+def merge_scan(state: dict, tiers: list[HorizonTier], scanned: list[HorizonTier], reservations: list[dict],
+               covered_days: list[str], today: datetime, now: float = None) -> dict:
+    """Update the cache with a scan and return the reservations of the whole horizon.
+
+    Dates the scan covered replace their cached reservations, including dates
+    where nothing was found. Dates the scan missed keep their older entry, or
+    none, so their tier is due again on the next run. Cached reservations carry
+    their ``cacheAgeSeconds`` so notifications can tell they were not just seen.
+
+    Args:
+        state: Horizon state, updated in place
+        tiers: Every tier of the horizon
+        scanned: Tiers included in this scan
+        reservations: Reservations returned by the scan
+        covered_days: Two digit days the scan managed to select
+        today: Start of the horizon
+        now: Scan timestamp
+
+    Returns:
+        dict: ``reservations`` for the whole horizon and the ``scanned`` and ``cached``
+        dates, with the age in seconds of each cached date.
+    """
+    now = time.time() if now is None else now
+    horizon = [day for tier in tiers for day in tier.days(today)]
+    horizon_dates = {day.isoformat() for day in horizon}
+    covered = {day.isoformat() for tier in scanned for day in tier.days(today) if day.strftime('%d') in covered_days}
+
+    by_date = {date: [] for date in covered}
+    undated = []
+    for res in reservations:
+        date = _reservation_date(res)
+        if date in by_date:
+            by_date[date].append(res)
+        else:
+            undated.append(res)
+    for date, date_reservations in by_date.items():
+        state['dates'][date] = {'scannedAt': now, 'reservations': date_reservations}
+
+    # Dates that fell out of the horizon are never shown again
+    state['dates'] = {date: entry for date, entry in state['dates'].items() if date in horizon_dates}
+
+    merged = list(undated)
+    cached = {}
+    for day in horizon:
+        date = day.isoformat()
+        entry = state['dates'].get(date)
+        if entry is None:
+            continue
+        if date in covered:
+            merged += entry['reservations']
+        else:
+            cached[date] = round(now - entry['scannedAt'])
+            merged += [
+                {**restore_reservation_times(res), 'cacheAgeSeconds': cached[date]} for res in entry['reservations']
+            ]
+    return {'reservations': merged, 'scanned': sorted(covered), 'cached': cached}
+
+
+async def run_horizon_scan(args, tiers: list[HorizonTier], state_path, today: datetime = None):
+    """Scan the due tiers of the horizon and merge them with the cached dates.
+
+    Returns:
+        dict: Result data for the whole horizon, with a ``horizon`` section telling
+        which dates were scanned and how old the cached ones are.
+    """
+    today = today or datetime.now()
+    state = load_horizon_state(state_path)
+    scanned = due_tiers(tiers, state, today)
+    days = [day.strftime('%d') for tier in scanned for day in tier.days(today)]
+
+    url = os.getenv('BOOKING_URL', '')
+    result_data = None
+    covered_days = []
+    reservations = []
+    if days:
+        log_event(logger, 'horizon_scan_started',
+                  f"Scanning horizon tiers {', '.join(tier.key for tier in scanned)} ({len(days)} dates)",
+                  tiers=[tier.key for tier in scanned], dates=len(days))
+        result_data = await check_available_courts(args, dates=days)
+        if result_data is None:
+            return None
+        reservations = result_data['reservations']
+        covered_days = result_data['coverage']['dates']['covered']
+        url = result_data['url']
+    else:
+        log_event(logger, 'horizon_cached_only', "No horizon tier is due, answering from cached results")
+
+    horizon = merge_scan(state, tiers, scanned, reservations, covered_days, today)
+    save_horizon_state(state_path, state)
+
+    merged = build_result_data(horizon['reservations'], url)
+    if result_data:
+        merged = {**result_data, 'reservations': horizon['reservations']}
+    merged['horizon'] = {'scanned': horizon['scanned'], 'cached': horizon['cached']}
+    log_event(logger, 'horizon_merged',
+              f"Horizon: {len(horizon['scanned'])} dates scanned, {len(horizon['cached'])} from cache",
+              scanned=len(horizon['scanned']), cached=len(horizon['cached']))
+    return merged
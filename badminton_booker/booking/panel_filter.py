@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Panel filter spec applied inside the results page before panels cross into Python."""
+
+import re
+
+# Same predicate as panel_matches_filter, evaluated in the page by the harvester
+PANEL_FILTER_JS = """
+(filter) => {
+    const namePatterns = (filter.namePatterns || []).map((pattern) => new RegExp(pattern, 'i'));
+    const hasTimeRange = filter.startMinutes !== null || filter.endMinutes !== null;
+    return (panel) => {
+        if (filter.bookableOnly && !panel.canReserve) {
+            return false;
+        }
+        if (namePatterns.length > 0 && !namePatterns.some((re) => re.test(panel.name))) {
+            return false;
+        }
+        if (filter.maxPrice !== null) {
+            const price = parseFloat((panel.price || '').replace(',', '.'));
+            if (!isNaN(price) && price > filter.maxPrice) {
+                return false;
+            }
+        }
+        if (hasTimeRange) {
+            const match = /(\\d{1,2})\\s*[:h]\\s*(\\d{2})/.exec(panel.startTime || '');
+            if (!match) {
+                return false;
+            }
+            const minutes = parseInt(match[1], 10) * 60 + parseInt(match[2], 10);
+            if (filter.startMinutes !== null && minutes < filter.startMinutes) {
+                return false;
+            }
+            if (filter.endMinutes !== null && minutes >= filter.endMinutes) {
+                return false;
+            }
+        }
+        return true;
+    };
+}
+"""
+
+_TIME_PATTERN = re.compile(r'(\d{1,2})\s*[:h]\s*(\d{2})')
+
+
+def _minutes(hhmm: str):
+    """Convert an ``HH:MM`` time to minutes after midnight, or None if it cannot be read."""
+    match = _TIME_PATTERN.search(hhmm or '')
+    return int(match.group(1)) * 60 + int(match.group(2)) if match else None
+
+
+def build_panel_filter(bookable_only=False, name_patterns=None, max_price=None, start=None, end=None) -> dict:
+    """Build a filter spec that can be sent to the page as JSON.
+
+    Args:
+        bookable_only (bool): Keep only panels whose reserve button is enabled
+        name_patterns (list): Case-insensitive regular expressions, one of which the court name must match
+        max_price (float): Highest accepted price
+        start (str): Earliest accepted start time, ``HH:MM``
+        end (str): Start times must be before this ``HH:MM`` time
+
+    Returns:
+        dict: The filter spec, or None when it would keep every panel.
+    """
+    name_patterns = list(name_patterns or [])
+    for pattern in name_patterns:
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid court name pattern {pattern!r}: {e}")
+    start_minutes = _minutes(start) if start else None
+    end_minutes = _minutes(end) if end else None
+    if (start and start_minutes is None) or (end and end_minutes is None):
+        raise ValueError(f"Invalid filter time range: {start}-{end}")
+    if not (bookable_only or name_patterns or max_price is not None or start or end):
+        return None
+    return {
+        'bookableOnly': bookable_only,
+        'namePatterns': name_patterns,
+        'maxPrice': max_price,
+        'startMinutes': start_minutes,
+        'endMinutes': end_minutes,
+    }
+
+
+def parse_panel_filter(spec: str):
+    """Parse ``PANEL_FILTER`` such as ``bookable;court=Jarry|Ahuntsic;max_price=20;time=18:00-21:00``.
+
+    Returns:
+        dict: The filter spec, or None for an empty spec.
+    """
+    options = {}
+    for item in filter(None, (part.strip() for part in spec.split(';'))):
+        key, _, value = item.partition('=')
+        key = key.strip()
+        if key == 'bookable':
+            options['bookable_only'] = True
+        elif key == 'court':
+            options['name_patterns'] = [pattern.strip() for pattern in value.split('|') if pattern.strip()]
+        elif key == 'max_price':
+            options['max_price'] = float(value)
+        elif key == 'time':
+            options['start'], _, options['end'] = value.partition('-')
+        else:
+            raise ValueError(f"Unknown panel filter option: {key}")
+    return build_panel_filter(**options)
+
+
+def panel_matches_filter(panel: dict, panel_filter) -> bool:
+    """Apply a filter spec to raw panel fields in Python, for panels not read by the harvester."""
+    if not panel_filter:
+        return True
+    if panel_filter['bookableOnly'] and not panel.get('canReserve', False):
+        return False
+    patterns = panel_filter['namePatterns']
+    if patterns and not any(re.search(pattern, panel.get('name', ''), re.IGNORECASE) for pattern in patterns):
+        return False
+    if panel_filter['maxPrice'] is not None:
+        try:
+            if float(str(panel.get('price', '')).replace(',', '.')) > panel_filter['maxPrice']:
+                return False
+        except ValueError:
+            pass
+    if panel_filter['startMinutes'] is not None or panel_filter['endMinutes'] is not None:
+        minutes = _minutes(panel.get('startTime', ''))
+        if minutes is None:
+            return False
+        if panel_filter['startMinutes'] is not None and minutes < panel_filter['startMinutes']:
+            return False
+        if panel_filter['endMinutes'] is not None and minutes >= panel_filter['endMinutes']:
+            return False
+    return True
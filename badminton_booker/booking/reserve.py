@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""Automatic reservation of detected badminton slots."""
+
+import json
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from badminton_booker.metrics.event_log import log_event
+
+PANEL_SELECTOR = '.panel.panel-default.panel-facilityReservation'
+RESERVE_BUTTON_SELECTOR = 'button[ng-click*="vm.onReserve"]'
+TIME_TO_WAIT_FOR_RESULTS_PAGE = 10000  # 10 seconds
+TIME_TO_WAIT_FOR_CONFIRMATION = 10000  # 10 seconds
+
+logger = logging.getLogger(__name__)
+
+
+def parse_reserve_rules(rules_str: str) -> list[dict]:
+    """Parse a priority ordered list of auto-reserve rules.
+
+    Rules are separated by ``;`` and have the form ``court@HH:MM-HH:MM``.
+    The court part is a case-insensitive substring of the court name (``*``
+    matches any court) and the time part is optional.
+
+    Args:
+        rules_str (str): Rules string, e.g. ``"Saint-Laurent@18:00-20:00;*@19:00-22:00"``
+
+    Returns:
+        list[dict]: Rules in priority order with ``court``, ``start`` and ``end`` keys.
+    """
+    rules = []
+    for raw_rule in rules_str.split(';'):
+        raw_rule = raw_rule.strip()
+        if not raw_rule:
+            continue
+
+        court, _, window = raw_rule.partition('@')
+        start, end = None, None
+        if window:
+            start_str, _, end_str = window.partition('-')
+            start = datetime.strptime(start_str.strip(), "%H:%M").time()
+            end = datetime.strptime(end_str.strip(), "%H:%M").time() if end_str else None
+
+        rules.append({'court': court.strip() or '*', 'start': start, 'end': end})
+    return rules
+
+
+def reservation_matches_rule(reservation: dict, rule: dict) -> bool:
+    """Check whether a reservation satisfies a single auto-reserve rule."""
+    court = rule['court'].lower()
+    if court != '*' and court not in reservation.get('name', '').lower():
+        return False
+
+    start_time = reservation.get('startTime')
+    if rule['start'] is not None or rule['end'] is not None:
+        if not isinstance(start_time, datetime):
+            return False
+        if rule['start'] is not None and start_time.time() < rule['start']:
+            return False
+        if rule['end'] is not None and start_time.time() >= rule['end']:
+            return False
+    return True
+
+
+def select_reservation_candidates(reservations: list[dict], rules: list[dict]) -> list[tuple[int, dict]]:
+    """Order bookable reservations by the first rule they match.
+
+    Returns:
+        list[tuple[int, dict]]: ``(panel index, reservation)`` pairs in priority order.
+    """
+    candidates = []
+    seen = set()
+    for rule in rules:
+        matching = [
+            (index, res) for index, res in enumerate(reservations)
+            if index not in seen and res.get('canReserve', False) and reservation_matches_rule(res, rule)
+        ]
+        matching.sort(key=lambda item: str(item[1].get('startTime')))
+        for index, res in matching:
+            seen.add(index)
+            candidates.append((index, res))
+    return candidates
+
+
+def _reservation_day(reservation: dict) -> str:
+    """Return the day key used for the per-day reservation cap."""
+    start_time = reservation.get('startTime')
+    if isinstance(start_time, datetime):
+        return start_time.strftime('%Y-%m-%d')
+    return reservation.get('date', '') or 'unknown'
+
+
+def load_reserve_history(history_path: Path) -> dict:
+    """Load the number of reservations already made per day."""
+    try:
+        with open(history_path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_reserve_history(history_path: Path, history: dict) -> None:
+    """Persist the number of reservations made per day."""
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(history_path, 'w') as f:
+        json.dump(history, f, indent=2)
+
+
+async def locate_reserve_button(page, reservation: dict):
+    """Find the reserve button of a reservation on the results page.
+
+    The button is found by its ID, or else inside the single panel showing
+    the same court, date and start time. The position of the reservation is
+    never used, since filtered or harvested reservations do not follow the
+    order of the panels on the page.
+
+    Returns:
+        Locator of the button, or None when no single button matches.
+    """
+    button_id = reservation.get('buttonId')
+    if button_id:
+        button = page.locator(f'[id="{button_id}"]')
+        return button if await button.count() == 1 else None
+
+    start_time = reservation.get('startTime')
+    if not reservation.get('name') or not isinstance(start_time, datetime):
+        return None
+    panels = page.locator(PANEL_SELECTOR).filter(has_text=reservation['name'])
+    if reservation.get('date'):
+        panels = panels.filter(has_text=reservation['date'])
+    panels = panels.filter(has_text=start_time.strftime('%H:%M'))
+    if await panels.count() != 1:
+        return None
+    return panels.locator(RESERVE_BUTTON_SELECTOR)
+
+
+class AutoReserver:
+    """Reserve matching slots on the open results page as soon as their panel is read.
+
+    Slots matching the first rule are reserved the moment they are offered,
+    since no later panel can outrank them. Slots matching only lower priority
+    rules are held until every panel was read and then tried in priority order,
+    within the per-day cap.
+    """
+
+    def __init__(self, page, rules, max_per_day, history_path):
+        """Initialize the reserver on the page showing the search results.
+
+        Args:
+            page: Playwright page showing the search results
+            rules (list[dict]): Priority ordered rules from ``parse_reserve_rules``
+            max_per_day (int): Maximum number of reservations to submit per slot day
+            history_path (Path): File tracking reservations already made per day
+        """
+        self.page = page
+        self.rules = rules
+        self.max_per_day = max_per_day
+        self.history_path = history_path
+        self.history = load_reserve_history(history_path)
+        self.results_url = page.url
+        self.attempts = []
+        self.deferred = []
+
+    def _rank(self, reservation: dict):
+        """Index of the first rule a bookable reservation matches, or None."""
+        if not reservation.get('canReserve', False):
+            return None
+        return next((i for i, rule in enumerate(self.rules) if reservation_matches_rule(reservation, rule)), None)
+
+    async def offer(self, reservation: dict, detected_at: float) -> None:
+        """Consider a reservation right after its panel was read.
+
+        Args:
+            reservation (dict): Parsed reservation
+            detected_at (float): ``time.perf_counter()`` value when its panel was read
+        """
+        rank = self._rank(reservation)
+        if rank == 0:
+            await self.reserve(reservation, detected_at)
+        elif rank is not None:
+            self.deferred.append((rank, detected_at, reservation))
+
+    async def finish(self) -> list[dict]:
+        """Try the slots held back for lower priority rules and return every attempt."""
+        self.deferred.sort(key=lambda item: (item[0], str(item[2].get('startTime'))))
+        for _, detected_at, reservation in self.deferred:
+            await self.reserve(reservation, detected_at)
+        self.deferred = []
+        return self.attempts
+
+    async def reserve(self, res: dict, detected_at: float):
+        """Click the reserve button of a slot unless its day already reached the cap.
+
+        Returns:
+            dict: The attempt with the detection to submission latency, or None when skipped.
+        """
+        day = _reservation_day(res)
+        if self.history.get(day, 0) >= self.max_per_day:
+            return None
+
+        attempt = {
+            'name': res.get('name', ''),
+            'startTime': res.get('startTime'),
+            'success': False,
+            'latencyMs': None,
+            'error': None,
+        }
+        page = self.page
+
+        try:
+            button = await locate_reserve_button(page, res)
+            if button is None:
+                raise LookupError('slot not found on the results page')
+
+            await button.click()
+            attempt['latencyMs'] = round((time.perf_counter() - detected_at) * 1000, 1)
+            # The reservation only went through if the site moved on to the reservation form
+            await page.wait_for_url(lambda url: url != self.results_url, timeout=TIME_TO_WAIT_FOR_CONFIRMATION)
+
+            attempt['success'] = True
+            self.history[day] = self.history.get(day, 0) + 1
+            save_reserve_history(self.history_path, self.history)
+        except Exception as e:
+            attempt['error'] = str(e)
+
+        log_event(logger, 'reserve_attempt', format_reserve_attempt(attempt),
+                  logging.INFO if attempt['success'] else logging.WARNING,
+                  name=attempt['name'], startTime=attempt['startTime'], success=attempt['success'],
+                  latencyMs=attempt['latencyMs'], error=attempt['error'])
+        self.attempts.append(attempt)
+
+        try:
+            # Go back to the results so the next slot can be reserved and the remaining panels read
+            if page.url != self.results_url:
+                await page.goto(self.results_url)
+                await page.wait_for_selector(PANEL_SELECTOR, timeout=TIME_TO_WAIT_FOR_RESULTS_PAGE)
+        except Exception as e:
+            log_event(logger, 'results_page_lost', f"Could not return to the results page: {e}", logging.WARNING,
+                      error=str(e))
+        return attempt
+
+
+async def auto_reserve(page, reservations, rules, max_per_day, detected_at, history_path):
+    """Click the reserve button of matching slots from a list already read off the open results page.
+
+    Args:
+        page: Playwright page showing the search results the reservations were read from
+        reservations (list[dict]): Reservations read from the page
+        rules (list[dict]): Priority ordered rules from ``parse_reserve_rules``
+        max_per_day (int): Maximum number of reservations to submit per slot day
+        detected_at (float): ``time.perf_counter()`` value when the slots were detected
+        history_path (Path): File tracking reservations already made per day
+
+    Returns:
+        list[dict]: One entry per attempt with the detection to submission latency.
+    """
+    reserver = AutoReserver(page, rules, max_per_day, history_path)
+    for _, res in select_reservation_candidates(reservations, rules):
+        await reserver.reserve(res, detected_at)
+    return reserver.attempts
+
+
+def format_reserve_attempt(attempt: dict) -> str:
+    """Format a single auto-reserve attempt for the run output."""
+    status = 'submitted' if attempt['success'] else f"failed ({attempt['error']})"
+    latency = f"{attempt['latencyMs']} ms" if attempt['latencyMs'] is not None else 'n/a'
+    return f"Auto-reserve {attempt['name']} at {attempt['startTime']}: {status}, detection to submit {latency}"
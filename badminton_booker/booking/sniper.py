@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Pre-warmed polling of the search results around a known slot release time."""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from playwright.async_api import async_playwright
+from badminton_booker.booking.courts import (
+    build_result_data,
+    get_neighborhoods,
+    launch_browser,
+    open_filtered_search,
+    read_search_results,
+    save_test_results,
+)
+from badminton_booker.booking.governor import crawl_governor_from_settings, host_of
+from badminton_booker.booking.stages import CheckpointedNavigator, parse_stage_policies
+from badminton_booker.config.settings import get_settings
+from badminton_booker.metrics.event_log import log_event
+
+MIN_REFRESH_INTERVAL_MS = 250
+
+logger = logging.getLogger(__name__)
+
+
+def next_release_instant(release_time: str, now: datetime = None) -> datetime:
+    """Return the next occurrence of an ``HH:MM[:SS]`` release time in Eastern Time."""
+    tz = ZoneInfo("America/New_York")
+    now = now.astimezone(tz) if now else datetime.now(tz)
+    fmt = "%H:%M:%S" if release_time.count(':') == 2 else "%H:%M"
+    release = datetime.strptime(release_time, fmt).time()
+    release_at = now.replace(hour=release.hour, minute=release.minute, second=release.second, microsecond=0)
+    if release_at < now - timedelta(minutes=5):
+        release_at += timedelta(days=1)
+    return release_at
+
+
+def slot_key(reservation: dict) -> tuple:
+    """Identify a slot across refreshes of the results page."""
+    return (reservation.get('name'), str(reservation.get('startTime')), str(reservation.get('endTime')))
+
+
+async def poll_results(page, release_at, window_seconds, refresh_interval_ms, seen_slots, throttle=None):
+    """Refresh the results at a bounded rate through the release window.
+
+    Args:
+        page: Playwright page already showing the filtered search results
+        release_at (datetime): Timezone-aware release instant
+        window_seconds (float): How long to keep refreshing after the release instant
+        refresh_interval_ms (int): Minimum time between two refreshes
+        seen_slots (set): Keys of bookable slots visible before polling started
+        throttle: Coroutine function awaited before every refresh, e.g. the crawl governor
+
+    Returns:
+        tuple[list[dict], list[dict], int]: Latest reservations, newly detected
+        bookable slots with their detection latency, and the number of refreshes.
+    """
+    interval = max(refresh_interval_ms, MIN_REFRESH_INTERVAL_MS) / 1000
+    # Translate the wall-clock release instant into the monotonic clock used for latencies
+    release_mono = time.perf_counter() + (release_at - datetime.now(release_at.tzinfo)).total_seconds()
+    end_mono = release_mono + window_seconds
+
+    # Hold the warm page until one refresh interval before the release instant
+    await asyncio.sleep(max(0, release_mono - interval - time.perf_counter()))
+
+    reservations = []
+    detections = []
+    refreshes = 0
+    previous_poll_start = time.perf_counter()
+
+    while time.perf_counter() < end_mono:
+        if throttle:
+            await throttle()
+        poll_start = time.perf_counter()
+        await page.reload()
+        reservations = await read_search_results(page, timeout=int(max(interval * 1000, 2000)))
+        detected = time.perf_counter()
+        refreshes += 1
+
+        for res in reservations:
+            key = slot_key(res)
+            if not res.get('canReserve', False) or key in seen_slots:
+                continue
+            seen_slots.add(key)
+            detections.append({
+                'name': res.get('name', ''),
+                'startTime': res.get('startTime'),
+                'detectedAfterReleaseMs': round((detected - release_mono) * 1000, 1),
+                # The slot was not visible at the previous refresh, so it appeared
+                # at most this long before we detected it
+                'visibleToDetectedMaxMs': round((detected - previous_poll_start) * 1000, 1),
+            })
+            log_event(logger, 'sniper_detected',
+                      f"Detected {res.get('name', '')} at {res.get('startTime')} "
+                      f"{detections[-1]['detectedAfterReleaseMs']} ms after release "
+                      f"(visible to detected <= {detections[-1]['visibleToDetectedMaxMs']} ms)",
+                      **detections[-1])
+
+        previous_poll_start = poll_start
+        await asyncio.sleep(max(0, interval - (time.perf_counter() - poll_start)))
+
+    return reservations, detections, refreshes
+
+
+async def run_sniper(args):
+    """Launch ahead of the release time, hold the page warm and poll through the release window."""
+    settings = get_settings()
+    url = os.getenv('BOOKING_URL', '')
+    if not url:
+        log_event(logger, 'config_missing', "Please set the BOOKING_URL environment variable.", logging.ERROR,
+                  setting='BOOKING_URL')
+        return None
+
+    release_at = next_release_instant(settings.sniper_release_time)
+    launch_at = release_at - timedelta(seconds=settings.sniper_warmup_seconds)
+    wait_seconds = (launch_at - datetime.now(release_at.tzinfo)).total_seconds()
+    if wait_seconds > 0:
+        log_event(logger, 'sniper_waiting',
+                  f"Sniper mode: waiting {wait_seconds:.0f}s before warming up for release at {release_at}",
+                  waitSeconds=round(wait_seconds), releaseAt=release_at.isoformat())
+        await asyncio.sleep(wait_seconds)
+
+    # The refreshes draw from the same per-host budget as every other scan on this machine
+    governor = crawl_governor_from_settings(settings)
+    throttle = lambda: governor.acquire(url)
+
+    async with async_playwright() as p:
+        browser, page = await launch_browser(p, args.headless, args.slow)
+        governor.attach(page, [host_of(url)])
+        navigator = CheckpointedNavigator(page, parse_stage_policies(settings.stage_policies), throttle=throttle)
+        await open_filtered_search(page, url, get_neighborhoods(), navigator=navigator)
+
+        # Remember what was already bookable so only released slots are reported
+        initial = await read_search_results(page)
+        seen_slots = {slot_key(res) for res in initial if res.get('canReserve', False)}
+        log_event(logger, 'sniper_warm',
+                  f"Sniper mode: page warm with {len(seen_slots)} bookable slots, release at {release_at}",
+                  bookable=len(seen_slots), releaseAt=release_at.isoformat())
+
+        reservations, detections, refreshes = await poll_results(
+            page,
+            release_at,
+            settings.sniper_window_seconds,
+            settings.sniper_refresh_interval_ms,
+            seen_slots,
+            throttle,
+        )
+        log_event(logger, 'sniper_finished',
+                  f"Sniper mode: {refreshes} refreshes, {len(detections)} new bookable slots detected",
+                  refreshes=refreshes, detections=len(detections))
+
+        result_data = build_result_data(reservations or initial, page.url)
+        result_data['sniper'] = {
+            'releaseAt': release_at.isoformat(),
+            'refreshes': refreshes,
+            'detections': detections,
+        }
+
+        if args.test:
+            save_test_results(result_data)
+
+        await browser.close()
+        return result_data
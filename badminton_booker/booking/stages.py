@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Retryable navigation stages with page checkpoints."""
+
+import asyncio
+import logging
+import time
+from badminton_booker.metrics.event_log import log_event
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy:
+    """How often and how long a navigation stage may be attempted."""
+
+    def __init__(self, attempts: int = 2, timeout_ms: int = 15000, backoff_ms: int = 500):
+        """Initialize the policy."""
+        self.attempts = max(attempts, 1)
+        self.timeout_ms = timeout_ms
+        self.backoff_ms = backoff_ms
+
+    def __repr__(self):
+        return f"RetryPolicy(attempts={self.attempts}, timeout_ms={self.timeout_ms}, backoff_ms={self.backoff_ms})"
+
+
+# Default policies per stage; neighborhood and date stages share the policy of their prefix
+DEFAULT_STAGE_POLICIES = {
+    'open_booking_site': RetryPolicy(attempts=3, timeout_ms=30000, backoff_ms=2000),
+    'reserve_link': RetryPolicy(attempts=3, timeout_ms=15000),
+    'accept_cookies': RetryPolicy(attempts=1, timeout_ms=5000),
+    'badminton': RetryPolicy(attempts=3, timeout_ms=15000),
+    'open_neighborhoods': RetryPolicy(attempts=3, timeout_ms=10000),
+    'neighborhood': RetryPolicy(attempts=2, timeout_ms=5000),
+    'confirm_neighborhoods': RetryPolicy(attempts=3, timeout_ms=10000),
+    'select_time': RetryPolicy(attempts=2, timeout_ms=10000),
+    'date': RetryPolicy(attempts=2, timeout_ms=10000),
+}
+
+# Stages that load a page or results from the booking site; the others only click
+# checkboxes, dates and time fields on the loaded page and are never throttled
+REQUEST_STAGES = ('open_booking_site', 'reserve_link', 'badminton', 'confirm_neighborhoods')
+
+
+def parse_stage_policies(policies_str: str) -> dict:
+    """Parse stage policy overrides of the form ``stage=attempts:timeout_ms[:backoff_ms],...``."""
+    policies = dict(DEFAULT_STAGE_POLICIES)
+    for item in policies_str.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, values = item.partition('=')
+        parts = [int(v) for v in values.split(':') if v]
+        policies[name.strip()] = RetryPolicy(*parts)
+    return policies
+
+
+class StageFailed(Exception):
+    """Raised when a required stage fails after all of its attempts."""
+
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class CheckpointedNavigator:
+    """Run navigation stages on a page, retrying failures from the last good checkpoint.
+
+    After each successful stage the page URL is recorded as a checkpoint.
+    A failed attempt returns the page to that URL if it moved away, then
+    retries the stage on the same page instead of relaunching the browser.
+    """
+
+    def __init__(self, page, policies: dict = None, recorder=None, throttle=None):
+        """Initialize the navigator for an open page.
+
+        Args:
+            page: Playwright page to drive
+            policies (dict): Stage name or prefix to ``RetryPolicy``
+            recorder: Optional flight recorder fed with every step
+            throttle: Optional zero argument coroutine function awaited before every attempt of a
+                stage in ``REQUEST_STAGES`` and before navigating back to a checkpoint
+        """
+        self.page = page
+        self.policies = policies or DEFAULT_STAGE_POLICIES
+        self.recorder = recorder
+        self.throttle = throttle
+        self.checkpoint_url = None
+        self.completed = []
+        self.failed = []
+        self.required_failed = False
+
+    def policy_for(self, stage: str) -> RetryPolicy:
+        """Find the policy of a stage, falling back to its ``prefix:`` then the default."""
+        if stage in self.policies:
+            return self.policies[stage]
+        return self.policies.get(stage.split(':', 1)[0], RetryPolicy())
+
+    async def _restore_checkpoint(self):
+        """Return to the last checkpoint if a failed attempt navigated away from it."""
+        if self.checkpoint_url and self.page.url != self.checkpoint_url:
+            if self.throttle:
+                await self.throttle()
+            await self.page.goto(self.checkpoint_url)
+
+    async def run(self, stage: str, action, required: bool = True) -> bool:
+        """Run a stage with its retry policy.
+
+        Args:
+            stage (str): Stage name, e.g. ``badminton`` or ``neighborhood:Saint-Laurent``
+            action: Zero argument coroutine function performing the stage
+            required (bool): Raise ``StageFailed`` when every attempt fails instead of recording it
+
+        Returns:
+            bool: True if the stage succeeded, False if an optional stage failed.
+        """
+        policy = self.policy_for(stage)
+        last_error = None
+        sends_request = stage.split(':', 1)[0] in REQUEST_STAGES
+
+        for attempt in range(1, policy.attempts + 1):
+            if self.throttle and sends_request:
+                await self.throttle()
+            if attempt > 1:
+                try:
+                    await self._restore_checkpoint()
+                except Exception as restore_error:
+                    log_event(logger, 'checkpoint_restore_failed',
+                              f"Could not restore checkpoint before retrying {stage}: {restore_error}",
+                              logging.WARNING, stage=stage, error=str(restore_error))
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(action(), timeout=policy.timeout_ms / 1000)
+                self.completed.append(stage)
+                self.checkpoint_url = self.page.url
+                if self.recorder:
+                    self.recorder.record_step(stage, 'ok', (time.perf_counter() - started) * 1000)
+                    await self.recorder.capture_screenshot(self.page, stage)
+                return True
+            except Exception as e:
+                last_error = e
+                if self.recorder:
+                    self.recorder.record_step(stage, 'failed', (time.perf_counter() - started) * 1000, e)
+                log_event(logger, 'stage_attempt_failed', f"Stage {stage} attempt {attempt}/{policy.attempts} failed: {e}",
+                          logging.WARNING, stage=stage, attempt=attempt, attempts=policy.attempts, error=str(e))
+                if attempt < policy.attempts:
+                    await asyncio.sleep(policy.backoff_ms / 1000)
+
+        self.failed.append(stage)
+        if required:
+            self.required_failed = True
+            raise StageFailed(stage, last_error)
+        return False
+
+    def coverage(self, neighborhoods: list, dates: list) -> dict:
+        """Describe which parts of the search space the completed stages covered."""
+        def split(prefix, values):
+            covered = [v for v in values if f'{prefix}:{v}' in self.completed]
+            return {'covered': covered, 'missing': [v for v in values if v not in covered]}
+
+        neighborhood_coverage = split('neighborhood', neighborhoods)
+        date_coverage = split('date', dates)
+        return {
+            'complete': not (self.required_failed or neighborhood_coverage['missing'] or date_coverage['missing']),
+            'completedStages': list(self.completed),
+            'failedStages': list(self.failed),
+            'neighborhoods': neighborhood_coverage,
+            'dates': date_coverage,
+        }
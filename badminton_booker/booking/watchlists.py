@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Named watchlists and the planner merging them into as few site searches as possible."""
+
+import json
+from datetime import datetime, timedelta
+
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+
+def load_watchlists(path) -> list[dict]:
+    """Load watchlists from a JSON file.
+
+    Each watchlist has a ``name`` and optionally ``boroughs`` (neighborhood
+    names), ``days`` (``mon`` to ``sun``, every day when empty), ``start`` and
+    ``end`` (``HH:MM``, 18:00 to 22:00 by default), ``max_price`` and
+    ``chat_ids`` (recipients, every subscriber when omitted).
+    """
+    with open(path) as f:
+        watchlists = json.load(f)
+
+    for watchlist in watchlists:
+        watchlist.setdefault('boroughs', [])
+        watchlist['days'] = [day.lower()[:3] for day in watchlist.get('days', [])]
+        watchlist.setdefault('start', '18:00')
+        watchlist.setdefault('end', '22:00')
+        unknown_days = set(watchlist['days']) - set(WEEKDAYS)
+        if unknown_days:
+            raise ValueError(f"Watchlist {watchlist['name']} has unknown days: {', '.join(sorted(unknown_days))}")
+    return watchlists
+
+
+def resolve_dates(watchlist: dict, horizon: list[datetime]) -> list[str]:
+    """Return the two digit days within the horizon that the watchlist is interested in."""
+    return [
+        day.strftime('%d') for day in horizon
+        if not watchlist['days'] or WEEKDAYS[day.weekday()] in watchlist['days']
+    ]
+
+
+def _minutes(hhmm: str) -> int:
+    """Convert ``HH:MM`` to minutes after midnight."""
+    hours, minutes = hhmm.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def plan_searches(watchlists: list[dict], horizon_days: int = 4, today: datetime = None) -> list[dict]:
+    """Merge watchlists into the fewest site searches covering their union.
+
+    The site search takes one time window, so watchlists searching the same
+    boroughs whose windows overlap or touch are merged into a single search
+    spanning their combined window, with the union of their dates. Results
+    do not always tell which borough a court is in, so watchlists with
+    different boroughs, including unrestricted ones, are never merged.
+    Watchlists without any date in the horizon get no search.
+
+    Returns:
+        list[dict]: Searches with ``neighborhoods``, ``dates``, ``start``, ``end``
+        and the names of the ``watchlists`` they serve.
+    """
+    today = today or datetime.now()
+    horizon = [today + timedelta(days=i) for i in range(horizon_days)]
+
+    searches = []
+    # Latest search of each set of boroughs, the only one a later watchlist can merge into
+    current_by_boroughs = {}
+    for watchlist in sorted(watchlists, key=lambda w: _minutes(w['start'])):
+        dates = resolve_dates(watchlist, horizon)
+        if not dates:
+            continue
+
+        boroughs = frozenset(watchlist['boroughs'])
+        current = current_by_boroughs.get(boroughs)
+        if current and _minutes(watchlist['start']) <= _minutes(current['end']):
+            if _minutes(watchlist['end']) > _minutes(current['end']):
+                current['end'] = watchlist['end']
+            current['dates'] += [d for d in dates if d not in current['dates']]
+            current['watchlists'].append(watchlist['name'])
+        else:
+            current_by_boroughs[boroughs] = {
+                'neighborhoods': list(watchlist['boroughs']),
+                'dates': dates,
+                'start': watchlist['start'],
+                'end': watchlist['end'],
+                'watchlists': [watchlist['name']],
+            }
+            searches.append(current_by_boroughs[boroughs])
+
+    # Keep the calendar clicks in chronological order
+    order = {day.strftime('%d'): i for i, day in enumerate(horizon)}
+    for search in searches:
+        search['dates'].sort(key=order.get)
+    return searches
+
+
+def _price(value) -> float:
+    """Parse a scraped price, treating unknown prices as free."""
+    try:
+        return float(str(value).replace(',', '.'))
+    except ValueError:
+        return 0.0
+
+
+def reservation_matches_watchlist(reservation: dict, watchlist: dict) -> bool:
+    """Check a reservation against the days, time window, price and boroughs of a watchlist."""
+    start_time = reservation.get('startTime')
+    if isinstance(start_time, datetime):
+        if watchlist['days'] and WEEKDAYS[start_time.weekday()] not in watchlist['days']:
+            return False
+        start_minutes = start_time.hour * 60 + start_time.minute
+        if not _minutes(watchlist['start']) <= start_minutes < _minutes(watchlist['end']):
+            return False
+    if watchlist.get('max_price') is not None and _price(reservation.get('price', '')) > watchlist['max_price']:
+        return False
+    # Borough is only known when the reservation was enriched with facility metadata
+    borough = reservation.get('borough')
+    if borough and watchlist['boroughs'] and borough not in watchlist['boroughs']:
+        return False
+    return True
+
+
+def split_results(search_results: list[tuple[dict, list[dict]]], watchlists: list[dict]) -> dict:
+    """Split the reservations of each search back out to the watchlists it served.
+
+    Args:
+        search_results: ``(search, reservations)`` pairs
+        watchlists: Watchlists the searches were planned from
+
+    Returns:
+        dict: Watchlist name to its matching reservations.
+    """
+    by_name = {watchlist['name']: watchlist for watchlist in watchlists}
+    split = {watchlist['name']: [] for watchlist in watchlists}
+    for search, reservations in search_results:
+        for name in search['watchlists']:
+            split[name] += [res for res in reservations if reservation_matches_watchlist(res, by_name[name])]
+    return split
@@ -8,7 +8,18 @@ def parse_args():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description="Badminton court booking automation")
     parser.add_argument("--headless", action="store_true", help="Run in headless mode")
-    parser.add_argument("-slow", type=int, default=10, help="Slow mode delay in milliseconds")
+    parser.add_argument("-slow", type=int, default=None, help="Slow mode delay in milliseconds (defaults to BROWSER_SLOW_MO)")
     parser.add_argument("--test", action="store_true", help="Run in test mode")
     parser.add_argument("--mute", action="store_true", help="Disable notifications (do not send Telegram message)")
+    parser.add_argument("--auto-reserve", action="store_true", help="Reserve slots matching AUTO_RESERVE_RULES as soon as they are detected")
+    parser.add_argument("--sniper", action="store_true", help="Warm up ahead of SNIPER_RELEASE_TIME and poll results through the release window")
+    parser.add_argument("--coordinator", action="store_true", help="Split the scan into units on the work queue and merge worker results")
+    parser.add_argument("--worker", action="store_true", help="Scan units pulled from the work queue until it is idle")
+    parser.add_argument("--workers", type=int, default=0, help="Number of local worker processes started by the coordinator")
+    parser.add_argument("--queue", type=str, default=None, help="Path of the SQLite work queue (defaults to SHARD_QUEUE_PATH)")
+    parser.add_argument("--stream", action="store_true", help="Alert the first bookable slot while the remaining panels are still being read")
+    parser.add_argument("--serve", action="store_true", help="Serve cached availability over a local HTTP endpoint")
+    parser.add_argument("--port", type=int, default=None, help="Port of the local availability service (defaults to SERVICE_PORT)")
+    parser.add_argument("--from-snapshot", type=str, default=None, metavar="PATH", help="Replay saved results (JSON or NDJSON) through filtering and notification without a browser")
+    parser.add_argument("--watchlists", type=str, default=None, metavar="PATH", help="Run merged searches for the watchlists in a JSON file (defaults to WATCHLISTS_PATH)")
     return parser.parse_args()
\ No newline at end of file
@@ -20,9 +20,67 @@ class Settings:
             n.strip() for n in os.environ.get('NEIGHBORHOODS', '').split(',')
         ]
         self.booking_url = os.environ.get('BOOKING_URL', '')
+        self.auto_reserve_rules = os.environ.get('AUTO_RESERVE_RULES', '')
+        self.auto_reserve_max_per_day = int(os.environ.get('AUTO_RESERVE_MAX_PER_DAY', '1'))
+        self.sniper_release_time = os.environ.get('SNIPER_RELEASE_TIME', '')
+        self.sniper_warmup_seconds = int(os.environ.get('SNIPER_WARMUP_SECONDS', '60'))
+        self.sniper_window_seconds = int(os.environ.get('SNIPER_WINDOW_SECONDS', '30'))
+        self.sniper_refresh_interval_ms = int(os.environ.get('SNIPER_REFRESH_INTERVAL_MS', '500'))
+        self.stage_policies = os.environ.get('STAGE_POLICIES', '')
+        self.browser_engine = os.environ.get('BROWSER_ENGINE', 'chromium').lower()
+        self.browser_slow_mo = int(os.environ.get('BROWSER_SLOW_MO', '0'))
+        self.browser_viewport = os.environ.get('BROWSER_VIEWPORT', '')
+        self.browser_low_memory = os.environ.get('BROWSER_LOW_MEMORY', '').lower() in ('1', 'true', 'yes')
+        self.browser_shared_process = os.environ.get('BROWSER_SHARED_PROCESS', '').lower() in ('1', 'true', 'yes')
+        self.harvest_mode = os.environ.get('HARVEST_MODE', 'snapshot').lower()
+        self.panel_filter = os.environ.get('PANEL_FILTER', '')
+        self.crawl_rates = os.environ.get('CRAWL_RATES', '')
+        self.crawl_default_rate = float(os.environ.get('CRAWL_DEFAULT_RATE', '2'))
+        self.crawl_default_burst = int(os.environ.get('CRAWL_DEFAULT_BURST', '10'))
+        self.crawl_max_backoff_seconds = float(os.environ.get('CRAWL_MAX_BACKOFF_SECONDS', '300'))
         self.data_dir = Path('data')
         # Create data directory if it doesn't exist
         self.data_dir.mkdir(exist_ok=True)
+        self.crawl_state_path = Path(os.environ.get('CRAWL_STATE_PATH', str(self.data_dir / 'crawl_governor.json')))
+        self.facility_index_path = Path(os.environ.get('FACILITY_INDEX_PATH', str(self.data_dir / 'facilities.json')))
+        self.facility_seed_path = os.environ.get('FACILITY_SEED_PATH', '')
+        self.horizon_tiers = os.environ.get('HORIZON_TIERS', '')
+        self.horizon_state_path = Path(os.environ.get('HORIZON_STATE_PATH', str(self.data_dir / 'horizon_state.json')))
+        self.single_flight_backend = os.environ.get('SINGLE_FLIGHT_BACKEND', 'file').lower()
+        self.single_flight_mode = os.environ.get('SINGLE_FLIGHT_MODE', 'wait').lower()
+        self.single_flight_dir = Path(os.environ.get('SINGLE_FLIGHT_DIR', str(self.data_dir / 'single_flight')))
+        self.single_flight_wait_seconds = float(os.environ.get('SINGLE_FLIGHT_WAIT_SECONDS', '900'))
+        self.single_flight_reuse_seconds = float(os.environ.get('SINGLE_FLIGHT_REUSE_SECONDS', '0'))
+        self.single_flight_lease_seconds = float(os.environ.get('SINGLE_FLIGHT_LEASE_SECONDS', '300'))
+        self.log_format = os.environ.get('LOG_FORMAT', 'text').lower()
+        self.log_level = os.environ.get('LOG_LEVEL', 'INFO').upper()
+        self.log_path = os.environ.get('LOG_PATH', str(self.data_dir / 'events.jsonl'))
+        self.log_debug_sample_rate = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', '0.1'))
+        self.log_max_bytes = int(os.environ.get('LOG_MAX_BYTES', '10000000'))
+        self.flight_recorder_dir = Path(os.environ.get('FLIGHT_RECORDER_DIR', str(self.data_dir / 'flight_recorder')))
+        self.flight_recorder_max_events = int(os.environ.get('FLIGHT_RECORDER_MAX_EVENTS', '1000'))
+        self.flight_recorder_max_bytes = int(os.environ.get('FLIGHT_RECORDER_MAX_BYTES', '5000000'))
+        self.flight_recorder_screenshots = os.environ.get('FLIGHT_RECORDER_SCREENSHOTS', '').lower() in ('1', 'true', 'yes')
+        self.flight_recorder_latency_threshold_seconds = float(
+            os.environ.get('FLIGHT_RECORDER_LATENCY_THRESHOLD_SECONDS', '120')
+        )
+        self.watchlists_path = os.environ.get('WATCHLISTS_PATH', '')
+        self.snapshot_history_path = os.environ.get('SNAPSHOT_HISTORY_PATH', '')
+        self.service_host = os.environ.get('SERVICE_HOST', '127.0.0.1')
+        self.service_port = int(os.environ.get('SERVICE_PORT', '8765'))
+        self.service_freshness_seconds = float(os.environ.get('SERVICE_FRESHNESS_SECONDS', '300'))
+        self.metrics_port = int(os.environ.get('METRICS_PORT', '0'))
+        self.metrics_textfile = os.environ.get('METRICS_TEXTFILE', '')
+        self.notification_sinks = os.environ.get('NOTIFICATION_SINKS', 'telegram')
+        self.notification_sink_rates = os.environ.get('NOTIFICATION_SINK_RATES', '')
+        self.shard_targets = [
+            t.strip() for t in os.environ.get('SHARD_TARGETS', self.booking_url).split(',') if t.strip()
+        ]
+        self.shard_group_size = int(os.environ.get('SHARD_NEIGHBORHOOD_GROUP_SIZE', '1'))
+        self.shard_queue_path = Path(os.environ.get('SHARD_QUEUE_PATH', str(self.data_dir / 'scan_queue.sqlite')))
+        self.shard_lease_seconds = int(os.environ.get('SHARD_LEASE_SECONDS', '300'))
+        self.shard_run_timeout_seconds = int(os.environ.get('SHARD_RUN_TIMEOUT_SECONDS', '900'))
+        self.shard_idle_exit_seconds = int(os.environ.get('SHARD_IDLE_EXIT_SECONDS', '30'))
         
     def validate(self):
         """Validate settings and provide helpful error messages."""
@@ -39,6 +97,21 @@ class Settings:
             
         if not self.booking_url:
             errors.append("BOOKING_URL is not set")
+
+        if self.browser_engine not in ('chromium', 'firefox', 'webkit'):
+            errors.append("BROWSER_ENGINE must be chromium, firefox or webkit")
+
+        if self.single_flight_backend not in ('none', 'file', 'firestore'):
+            errors.append("SINGLE_FLIGHT_BACKEND must be none, file or firestore")
+
+        if self.single_flight_mode not in ('wait', 'skip'):
+            errors.append("SINGLE_FLIGHT_MODE must be wait or skip")
+
+        if self.log_format not in ('text', 'json'):
+            errors.append("LOG_FORMAT must be text or json")
+
+        if self.crawl_default_rate <= 0 or self.crawl_default_burst < 1:
+            errors.append("CRAWL_DEFAULT_RATE must be positive and CRAWL_DEFAULT_BURST at least 1")
         
         return errors
 
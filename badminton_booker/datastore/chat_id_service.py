@@ -2,24 +2,42 @@
 """Firestore and chat ID updating module."""
 
 import os
+import time
 import requests
 import logging
 from typing import List, Dict
 from dotenv import load_dotenv
 from firebase_admin import credentials, firestore
 import firebase_admin
+from badminton_booker.config.settings import get_settings
+from badminton_booker.metrics.event_log import configure_logging_from_settings, log_event, log_phase
+from badminton_booker.metrics.registry import REGISTRY
 
 # Load environment variables
 load_dotenv()
 
-# Load Firebase certificate path from environment variable
-firebase_cert_path = os.environ.get("FIREBASE_CERT_PATH", "firebase_service_account.json")
-cred = credentials.Certificate(firebase_cert_path)
-firebase_admin.initialize_app(cred)
-db = firestore.client()
+# Firestore client, initialized on first use so importing this module needs no credentials
+db = None
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+FIRESTORE_OPERATIONS = REGISTRY.counter(
+    'firestore_operations', 'Firestore chat ID operations by outcome.', ['operation', 'outcome'])
+FIRESTORE_DURATION = REGISTRY.histogram(
+    'firestore_operation_duration_seconds', 'Latency of Firestore chat ID operations.', ['operation'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30))
+
+logger = logging.getLogger(__name__)
+
+
+def get_db():
+    """Initialize the Firebase app on first use and return the Firestore client."""
+    global db
+    if db is None:
+        # Load Firebase certificate path from environment variable
+        firebase_cert_path = os.environ.get("FIREBASE_CERT_PATH", "firebase_service_account.json")
+        cred = credentials.Certificate(firebase_cert_path)
+        firebase_admin.initialize_app(cred)
+        db = firestore.client()
+    return db
 
 
 def validate_env_vars(required_vars: List[str]) -> None:
@@ -40,7 +58,7 @@ def fetch_chat_info_from_telegram_api() -> List[Dict[str, str]]:
     token = os.environ.get("TELEGRAM_BOT_TOKEN")
     url = f"https://api.telegram.org/bot{token}/getUpdates"
     try:
-        response = requests.get(url)
+        response = requests.get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
         chat_info = {}
@@ -54,7 +72,8 @@ def fetch_chat_info_from_telegram_api() -> List[Dict[str, str]]:
                 chat_info[chat_id] = {"chatId": str(chat_id), "name": name}
         return [chat_info[k] for k in sorted(chat_info.keys())]
     except requests.RequestException as e:
-        logging.error(f"Failed to fetch chat info from Telegram API: {e}")
+        log_event(logger, "telegram_updates_failed", f"Failed to fetch chat info from Telegram API: {e}",
+                  logging.ERROR, error=str(e))
         raise
 
 def fetch_chat_ids_from_firestore() -> List[str]:
@@ -64,15 +83,23 @@ def fetch_chat_ids_from_firestore() -> List[str]:
     Returns:
         List[str]: A list of chat IDs.
     """
+    started = time.perf_counter()
     try:
         chat_ids = []
-        docs = db.collection("chat_ids").stream()
+        docs = get_db().collection("chat_ids").stream()
         for doc in docs:
             chat_ids.append(doc.id)
+        FIRESTORE_OPERATIONS.inc(operation="fetch", outcome="ok")
+        log_event(logger, "chat_ids_fetched", f"Fetched {len(chat_ids)} chat IDs from Firestore.",
+                  chatIds=len(chat_ids), durationMs=round((time.perf_counter() - started) * 1000))
         return chat_ids
     except Exception as e:
-        logging.error(f"Failed to fetch chat IDs from Firestore: {e}")
+        FIRESTORE_OPERATIONS.inc(operation="fetch", outcome="error")
+        log_event(logger, "firestore_failed", f"Failed to fetch chat IDs from Firestore: {e}", logging.ERROR,
+                  operation="fetch", error=str(e))
         raise
+    finally:
+        FIRESTORE_DURATION.observe(time.perf_counter() - started, operation="fetch")
 
 def update_chat_ids_in_firestore(chat_info: List[Dict[str, str]]) -> None:
     """
@@ -81,32 +108,46 @@ def update_chat_ids_in_firestore(chat_info: List[Dict[str, str]]) -> None:
     Args:
         chat_info (List[Dict[str, str]]): List of chat info dictionaries to update in Firestore.
     """
+    started = time.perf_counter()
     try:
+        db = get_db()
         batch = db.batch()
         for chat in chat_info:
             doc_ref = db.collection("chat_ids").document(chat["chatId"])
             batch.set(doc_ref, chat)
         batch.commit()
-        logging.info(f"Successfully updated {len(chat_info)} chat IDs in Firestore.")
+        FIRESTORE_OPERATIONS.inc(operation="update", outcome="ok")
+        log_event(logger, "chat_ids_updated", f"Successfully updated {len(chat_info)} chat IDs in Firestore.",
+                  chatIds=[chat["chatId"] for chat in chat_info],
+                  durationMs=round((time.perf_counter() - started) * 1000))
     except Exception as e:
-        logging.error(f"Failed to update chat IDs in Firestore: {e}")
+        FIRESTORE_OPERATIONS.inc(operation="update", outcome="error")
+        log_event(logger, "firestore_failed", f"Failed to update chat IDs in Firestore: {e}", logging.ERROR,
+                  operation="update", error=str(e))
         raise
+    finally:
+        FIRESTORE_DURATION.observe(time.perf_counter() - started, operation="update")
 
 
 def main() -> None:
     """Main function to fetch and update chat IDs. Will run from the Github Action."""
+    # Configured here rather than on import so the scanner's own configuration is left alone
+    configure_logging_from_settings(get_settings())
     try:
         # Validate required environment variables
         validate_env_vars(["TELEGRAM_BOT_TOKEN"])
 
         # Fetch chat info from Telegram API
-        chat_info = fetch_chat_info_from_telegram_api()
-        logging.info(f"Fetched {len(chat_info)} chat IDs from Telegram API.")
+        with log_phase("telegram_updates"):
+            chat_info = fetch_chat_info_from_telegram_api()
+        log_event(logger, "telegram_updates_fetched", f"Fetched {len(chat_info)} chat IDs from Telegram API.",
+                  chatIds=[chat["chatId"] for chat in chat_info])
 
         # Update chat IDs in Firestore
-        update_chat_ids_in_firestore(chat_info)
+        with log_phase("firestore_update"):
+            update_chat_ids_in_firestore(chat_info)
     except Exception as e:
-        logging.error(f"An error occurred: {e}")
+        log_event(logger, "chat_id_sync_failed", f"An error occurred: {e}", logging.ERROR, exc_info=True)
 
 
 if __name__ == "__main__":
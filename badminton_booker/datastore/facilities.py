@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Local index of facility metadata keyed by the court name shown on the booking site."""
+
+import json
+import os
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+
+# Facility attributes copied onto reservations
+FACILITY_FIELDS = ('borough', 'address', 'indoor')
+
+
+def normalize_name(name: str) -> str:
+    """Key a court name independently of case, accents and spacing."""
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.casefold().split())
+
+
+class FacilityIndex:
+    """Facility name to ``borough``, ``address`` and ``indoor``, cached in a JSON file.
+
+    The index is loaded once per run and every lookup is a dictionary access.
+    It grows only when a scan reports names it has not seen: a scan limited to
+    a single neighborhood attributes its unseen names to that borough, and
+    names that cannot be attributed are kept as unresolved until a seed file
+    or a later single-neighborhood scan fills them in.
+    """
+
+    def __init__(self, path, seed_path=None):
+        """Load the index, merging in a hand-maintained seed file when given.
+
+        Args:
+            path: JSON file the index is cached in
+            seed_path: Optional JSON list of facilities with a ``name`` and their attributes
+        """
+        self.path = Path(path)
+        self.facilities = {}
+        self.dirty = False
+        try:
+            with open(self.path) as f:
+                self.facilities = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.facilities = {}
+        if seed_path:
+            self.merge_seed(seed_path)
+
+    def merge_seed(self, seed_path) -> int:
+        """Add or complete facilities from a seed file, returning how many entries changed."""
+        with open(seed_path) as f:
+            seed = json.load(f)
+        changed = 0
+        for facility in seed:
+            key = normalize_name(facility['name'])
+            entry = self.facilities.setdefault(key, {'name': facility['name']})
+            updates = {field: facility[field] for field in FACILITY_FIELDS if facility.get(field) is not None}
+            if any(entry.get(field) != value for field, value in updates.items()):
+                entry.update(updates)
+                changed += 1
+        self.dirty = self.dirty or changed > 0
+        return changed
+
+    def lookup(self, name: str):
+        """Return the metadata of a facility, or None if it is unknown."""
+        return self.facilities.get(normalize_name(name))
+
+    def unseen(self, names) -> list[str]:
+        """Return the names that have no entry in the index yet."""
+        return sorted({name for name in names if name and normalize_name(name) not in self.facilities})
+
+    def unresolved(self) -> list[str]:
+        """Return the names seen on the site whose borough is still unknown."""
+        return sorted(entry['name'] for entry in self.facilities.values() if not entry.get('borough'))
+
+    def learn(self, names, neighborhoods: list) -> int:
+        """Record the names of a scan, attributing them to the borough when only one was searched.
+
+        Returns:
+            int: Number of entries added or completed.
+        """
+        borough = neighborhoods[0] if len(neighborhoods) == 1 else None
+        changed = 0
+        for name in {name for name in names if name}:
+            key = normalize_name(name)
+            entry = self.facilities.get(key)
+            if entry is None:
+                self.facilities[key] = {'name': name, 'borough': borough, 'firstSeen': datetime.now().isoformat()}
+                changed += 1
+            elif borough and not entry.get('borough'):
+                entry['borough'] = borough
+                changed += 1
+        self.dirty = self.dirty or changed > 0
+        return changed
+
+    def enrich(self, panel: dict) -> dict:
+        """Copy the known attributes of the panel's facility onto it."""
+        facility = self.facilities.get(normalize_name(panel.get('name', '')))
+        if facility:
+            for field in FACILITY_FIELDS:
+                if facility.get(field) is not None:
+                    panel[field] = facility[field]
+        return panel
+
+    def save(self) -> None:
+        """Write the index back if it changed, replacing the file atomically."""
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + f'.{os.getpid()}.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(self.facilities, f, indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+
+async def enrich_panels(panels, index: FacilityIndex):
+    """Enrich a stream of raw panels from the index as they are read."""
+    async for panel in panels:
+        yield index.enrich(panel)
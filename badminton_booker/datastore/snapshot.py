@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Reading and writing saved scan results for offline replay."""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterator
+from badminton_booker.booking.handle_time import restore_reservation_times
+from badminton_booker.metrics.event_log import log_event
+
+logger = logging.getLogger(__name__)
+
+
+def restore_result_data(result_data: Dict) -> Dict:
+    """Restore the datetime fields of saved result data."""
+    restored = dict(result_data)
+    restored["reservations"] = [
+        restore_reservation_times(res) for res in result_data.get("reservations", [])
+    ]
+    return restored
+
+
+def iter_snapshot_results(path) -> Iterator[Dict]:
+    """
+    Yield result data saved by ``--test`` or appended to an NDJSON history file.
+
+    NDJSON files (``.ndjson``/``.jsonl``) are read one line at a time, so large
+    history files are never loaded into memory at once.
+
+    Args:
+        path: Path of a JSON snapshot or an NDJSON history file
+
+    Yields:
+        Dict: Result data with datetime start and end times.
+    """
+    path = Path(path)
+    if path.suffix in (".ndjson", ".jsonl"):
+        with open(path) as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield restore_result_data(json.loads(line))
+                except json.JSONDecodeError as e:
+                    log_event(logger, 'snapshot_line_invalid', f"Skipping invalid snapshot line {line_number}: {e}",
+                              logging.WARNING, path=str(path), line=line_number, error=str(e))
+    else:
+        with open(path) as f:
+            yield restore_result_data(json.load(f))
+
+
+def append_snapshot(path, result_data: Dict) -> None:
+    """Append result data as one line of an NDJSON history file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(result_data, default=str) + "\n")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Structured JSONL event log written from a background thread so logging never blocks the event loop."""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+LOG_FORMATS = ('text', 'json')
+
+# Identifies every event of one process, overridable to correlate a CI job with its logs
+RUN_ID = os.environ.get('RUN_ID') or uuid.uuid4().hex[:12]
+
+_phase = contextvars.ContextVar('log_phase', default='main')
+
+# Listener of the current configuration, stopped when logging is configured again
+_listener = None
+
+
+@contextmanager
+def log_phase(name: str):
+    """Tag the events logged inside the block, including from awaited coroutines, with a phase."""
+    token = _phase.set(name)
+    try:
+        yield
+    finally:
+        _phase.reset(token)
+
+
+def current_phase() -> str:
+    """Return the phase events are currently tagged with."""
+    return _phase.get()
+
+
+def log_event(logger: logging.Logger, event: str, message: str, level: int = logging.INFO,
+              sample_rate: float = None, exc_info: bool = False, **fields) -> None:
+    """Log a named event with structured fields.
+
+    Args:
+        logger: Logger of the calling module
+        event (str): Stable name of the event, e.g. ``scan_finished``
+        message (str): Human readable message shown on the console
+        level (int): Logging level
+        sample_rate (float): Fraction of these debug events to keep, overriding the configured rate
+        exc_info (bool): Attach the exception being handled
+        **fields: Values written as keys of the JSON event, e.g. slot counts or chat IDs
+    """
+    extra = {'event': event, 'fields': fields}
+    if sample_rate is not None:
+        extra['sample_rate'] = sample_rate
+    logger.log(level, message, exc_info=exc_info, extra=extra)
+
+
+class ContextFilter(logging.Filter):
+    """Stamp records with the run ID and phase of the caller before they leave its task."""
+
+    def filter(self, record):
+        record.run_id = RUN_ID
+        record.phase = _phase.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a random fraction of debug records; higher levels always pass."""
+
+    def __init__(self, rate: float = 1.0, rng: random.Random = None):
+        """Initialize the filter.
+
+        Args:
+            rate (float): Fraction of debug records to keep, from 0 to 1
+            rng: Random generator, seeded in tests
+        """
+        super().__init__()
+        self.rate = rate
+        self.rng = rng or random.Random()
+        self.dropped = 0
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = getattr(record, 'sample_rate', self.rate)
+        if rate >= 1 or self.rng.random() < rate:
+            # Readers scale counts of sampled events back up with it
+            record.sample_rate = rate
+            return True
+        self.dropped += 1
+        return False
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Render a record as one JSON object per line."""
+
+    def format(self, record):
+        event = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'runId': getattr(record, 'run_id', RUN_ID),
+            'phase': getattr(record, 'phase', None),
+            'logger': record.name,
+            'event': getattr(record, 'event', None),
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'sample_rate', 1) < 1:
+            event['sampleRate'] = record.sample_rate
+        event.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            event['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            event['exception'] = record.exc_text
+        return json.dumps(event, default=str, ensure_ascii=False)
+
+
+class _EventQueueHandler(QueueHandler):
+    """Queue handler that keeps the exception of a record as a separate field."""
+
+    def prepare(self, record):
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        # Tracebacks cannot cross the queue, their rendering can
+        record = super().prepare(record)
+        record.exc_text = exc_text
+        return record
+
+    def format(self, record):
+        # The message goes through the queue unformatted, the listener's handlers render it
+        return record.getMessage()
+
+
+def configure_logging(path=None, console_format: str = 'text', level: str = 'INFO',
+                      debug_sample_rate: float = 1.0, max_bytes: int = 10_000_000, stream=None) -> QueueListener:
+    """Route every log record through a queue to the console and a JSONL file.
+
+    The caller only pays for putting the record on an in-memory queue; a
+    listener thread formats and writes it. Calling this again replaces the
+    previous configuration, which is how worker processes set up their own.
+
+    Args:
+        path: JSONL file, rotated once it reaches ``max_bytes``; None to log to the console only
+        console_format (str): ``text`` for plain messages, ``json`` for the JSONL events
+        level (str): Lowest level logged
+        debug_sample_rate (float): Fraction of debug events kept
+        max_bytes (int): Size at which the JSONL file is rotated
+        stream: Console stream, standard output by default
+
+    Returns:
+        QueueListener: The running listener, stopped at exit.
+    """
+    global _listener
+    if console_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format {console_format!r}, expected one of {', '.join(LOG_FORMATS)}")
+    flush_logging()
+
+    console = logging.StreamHandler(stream or sys.stdout)
+    console.setFormatter(JsonLineFormatter() if console_format == 'json' else logging.Formatter('%(message)s'))
+    handlers = [console]
+    if path:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=3, encoding='utf-8')
+        file_handler.setFormatter(JsonLineFormatter())
+        handlers.append(file_handler)
+
+    # Unbounded, so a slow disk delays the log but never the scan
+    records = queue.SimpleQueue()
+    queue_handler = _EventQueueHandler(records)
+    queue_handler.addFilter(SamplingFilter(debug_sample_rate))
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def process_log_path(path, suffix: str) -> Path:
+    """Give a process its own JSONL file next to ``path``, e.g. ``events.worker-42.jsonl``.
+
+    Rotating handlers in different processes must not share a file: each
+    one rotates it on its own, losing or interleaving the other's events.
+    """
+    path = Path(path)
+    return path.with_name(f'{path.stem}.{suffix}{path.suffix}')
+
+
+def configure_logging_from_settings(settings, process_suffix: str = None) -> QueueListener:
+    """Configure logging from the ``LOG_*`` settings.
+
+    Args:
+        settings: Application settings
+        process_suffix (str): Write to a file of this process's own instead of ``LOG_PATH``,
+            for worker processes running next to the one owning it
+    """
+    path = settings.log_path or None
+    if path and process_suffix:
+        path = process_log_path(path, process_suffix)
+    return configure_logging(
+        path=path,
+        console_format=settings.log_format,
+        level=settings.log_level,
+        debug_sample_rate=settings.log_debug_sample_rate,
+        max_bytes=settings.log_max_bytes,
+    )
+
+
+def flush_logging() -> None:
+    """Write out every queued record and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(flush_logging)
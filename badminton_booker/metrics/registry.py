@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""In-process counters and latency histograms exported in the Prometheus text format."""
+
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from badminton_booker.metrics.event_log import log_event
+
+# Seconds, covering a Telegram call up to a full multi-neighborhood scan
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value) -> str:
+    """Escape a label value for the text format."""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    """Render ``{name="value",...}``, or nothing when there are no labels."""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value) -> str:
+    """Render a sample value, keeping integral values free of a trailing ``.0``."""
+    if value == float('inf'):
+        return '+Inf'
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    """Name, help text and label names shared by every metric type."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        """Initialize a metric with no samples."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        """Order label values by the declared label names."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, one series per label combination."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        """Initialize a counter with no samples."""
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Increase the series selected by ``labels``."""
+        if amount < 0:
+            raise ValueError('Counters can only increase')
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """Current value of one series."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        """Yield ``(name, labels, value)`` for every series."""
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name + '_total', dict(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets, one series per label combination."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Initialize a histogram with no observations."""
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series = {}
+
+    def observe(self, value: float, **labels) -> None:
+        """Record one observation in the series selected by ``labels``."""
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._series.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._series[key] = (counts, total + value)
+
+    def count(self, **labels) -> int:
+        """Number of observations in one series."""
+        with self._lock:
+            counts, _ = self._series.get(self._key(labels), ([0] * len(self.buckets), 0.0))
+            return counts[-1]
+
+    def samples(self):
+        """Yield ``(name, labels, value)`` for the buckets, sum and count of every series."""
+        with self._lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+        for key, (counts, total) in sorted(series.items()):
+            labels = dict(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, counts):
+                yield self.name + '_bucket', {**labels, 'le': _format_value(bound)}, count
+            yield self.name + '_sum', labels, total
+            yield self.name + '_count', labels, counts[-1]
+
+
+class MetricsRegistry:
+    """Named metrics of the process, created on first use by the instrumented modules."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        """Return the counter called ``name``, registering it if needed."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        """Return the histogram called ``name``, registering it if needed."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self.metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+# Registry shared by every instrumented module
+REGISTRY = MetricsRegistry()
+
+
+def write_textfile(path, registry: MetricsRegistry = REGISTRY) -> None:
+    """Write the metrics for a node exporter textfile collector.
+
+    The file is replaced atomically so the collector never reads a partial write.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + f'.{os.getpid()}.tmp')
+    with open(temp_path, 'w') as f:
+        f.write(registry.render())
+    os.replace(temp_path, path)
+
+
+def make_metrics_handler(registry: MetricsRegistry = REGISTRY):
+    """Build a request handler class serving ``/metrics`` from the registry."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """Serve ``/metrics``."""
+
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            """Silence per-request logging."""
+
+    return MetricsHandler
+
+
+def start_metrics_server(host: str, port: int, registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer:
+    """Serve ``/metrics`` from a background thread and return the server."""
+    server = ThreadingHTTPServer((host, port), make_metrics_handler(registry))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    log_event(logger, 'metrics_serving', f"Serving metrics on http://{host}:{server.server_address[1]}/metrics",
+              host=host, port=server.server_address[1])
+    return server
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""One live availability message per chat, edited in place instead of resent on every run."""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+import requests
+from badminton_booker.metrics.event_log import log_event
+from badminton_booker.metrics.registry import REGISTRY
+from badminton_booker.notification import telegram
+
+DEFAULT_STATE_PATH = 'data/telegram_live.json'
+
+NEW_SLOTS_TITLE = "New Badminton Reservations Available:"
+
+# Edit errors after which the live message is replaced by a new one
+LOST_MESSAGE_ERRORS = ("message to edit not found", "message can't be edited", "message_id_invalid")
+
+logger = logging.getLogger(__name__)
+
+API_CALLS = REGISTRY.counter('telegram_live_api_calls', 'Bot API calls made for live messages.', ['method', 'outcome'])
+
+
+def slot_key(slot: dict) -> str:
+    """Identify a slot across runs by its court and times."""
+    start_time, end_time = slot.get('startTime'), slot.get('endTime')
+    start = start_time.isoformat() if isinstance(start_time, datetime) else str(start_time)
+    end = end_time.isoformat() if isinstance(end_time, datetime) else str(end_time)
+    return f"{slot.get('name', '')}|{start}|{end}"
+
+
+def format_live_message(slots: list, url: str, title: str, updated_at: datetime = None) -> str:
+    """Render the live list, stamped with the time it last changed."""
+    updated_at = updated_at or datetime.now()
+    if slots:
+        message = telegram.format_reservations_message(slots, url, title)
+    else:
+        message = "🏸 <b>No bookable badminton reservations right now.</b>\n"
+    return message + f"\n🕒 Updated {updated_at.strftime('%a %-d %b %H:%M')}"
+
+
+class LiveMessageStore:
+    """Message ID and slot keys of each live message, kept in a JSON file.
+
+    A chat has one live message per title, so watchlists sharing a chat keep their own.
+    """
+
+    def __init__(self, path):
+        """Load the state, starting empty when the file is missing or unreadable."""
+        self.path = Path(path)
+        try:
+            with open(self.path) as f:
+                self.chats = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.chats = {}
+
+    def get(self, chat_id, title: str):
+        """Return the live message of a chat, or None."""
+        return self.chats.get(f'{chat_id}|{title}')
+
+    def set(self, chat_id, title: str, message_id: int, keys: list) -> None:
+        """Record the live message of a chat and the slots it lists."""
+        self.chats[f'{chat_id}|{title}'] = {'messageId': message_id, 'slots': sorted(keys), 'updatedAt': time.time()}
+
+    def discard(self, chat_id, title: str) -> None:
+        """Forget the live message of a chat."""
+        self.chats.pop(f'{chat_id}|{title}', None)
+
+    def save(self) -> None:
+        """Write the state, replacing the file atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + f'.{os.getpid()}.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(self.chats, f, indent=2)
+        os.replace(temp_path, self.path)
+
+
+class LiveMessenger:
+    """Keep one live availability message per chat up to date with as few Bot API calls as possible.
+
+    A chat without a live message gets one. After that, a run where nothing
+    changed costs no call, slots that disappeared cost one edit, and new
+    slots cost one edit plus one short message listing only the new slots,
+    so subscribers are still alerted about them.
+    """
+
+    def __init__(self, store: LiveMessageStore, post=None):
+        """Initialize the messenger.
+
+        Args:
+            store: Live message state
+            post: Function with the signature of ``requests.post``, used by tests
+        """
+        self.store = store
+        self.post = post or requests.post
+
+    def _call(self, method: str, params: dict):
+        """Call a Bot API method, returning the decoded response body."""
+        try:
+            response = self.post(
+                f"{telegram.api_url}/bot{telegram.token}/{method}", params=params, timeout=telegram.REQUEST_TIMEOUT
+            )
+            body = response.json()
+        except (requests.RequestException, ValueError) as e:
+            API_CALLS.inc(method=method, outcome='error')
+            return {'ok': False, 'description': str(e)}
+        API_CALLS.inc(method=method, outcome='ok' if body.get('ok') else 'rejected')
+        return body
+
+    def _send(self, chat_id, text: str):
+        """Send a message, returning its ID or None."""
+        body = self._call('sendMessage', {'chat_id': chat_id, 'text': text, 'parse_mode': 'HTML'})
+        if not body.get('ok'):
+            log_event(logger, 'live_message_send_failed',
+                      f"Failed to send live message to {chat_id}: {body.get('description')}", logging.WARNING,
+                      chatId=chat_id, error=body.get('description'))
+            return None
+        return body['result']['message_id']
+
+    def _edit(self, chat_id, message_id: int, text: str) -> str:
+        """Edit a message in place.
+
+        Returns:
+            str: ``edited``, ``lost`` when the message can no longer be edited, or ``failed``.
+        """
+        body = self._call(
+            'editMessageText', {'chat_id': chat_id, 'message_id': message_id, 'text': text, 'parse_mode': 'HTML'}
+        )
+        description = (body.get('description') or '').lower()
+        if body.get('ok') or 'message is not modified' in description:
+            return 'edited'
+        if any(error in description for error in LOST_MESSAGE_ERRORS):
+            return 'lost'
+        log_event(logger, 'live_message_edit_failed',
+                  f"Failed to edit live message in {chat_id}: {body.get('description')}", logging.WARNING,
+                  chatId=chat_id, messageId=message_id, error=body.get('description'))
+        return 'failed'
+
+    def update_chat(self, chat_id, slots: list, url: str, title: str) -> dict:
+        """Bring the live message of one chat up to date.
+
+        Returns:
+            dict: Counts of messages ``sent`` and ``edited`` and whether the chat ``failed``.
+        """
+        counts = {'sent': 0, 'edited': 0, 'failed': False}
+        keys = {slot_key(slot): slot for slot in slots}
+        live = self.store.get(chat_id, title)
+        text = format_live_message(slots, url, title)
+
+        if live is not None and set(live['slots']) == set(keys):
+            return counts
+
+        if live is not None:
+            outcome = self._edit(chat_id, live['messageId'], text)
+            if outcome == 'edited':
+                counts['edited'] += 1
+                self.store.set(chat_id, title, live['messageId'], list(keys))
+                new_slots = [slot for key, slot in keys.items() if key not in live['slots']]
+                if new_slots:
+                    # Edits are silent, the new slots still deserve a notification
+                    message = telegram.format_reservations_message(new_slots, url, NEW_SLOTS_TITLE)
+                    if self._send(chat_id, message) is None:
+                        counts['failed'] = True
+                    else:
+                        counts['sent'] += 1
+                return counts
+            if outcome == 'failed':
+                counts['failed'] = True
+                return counts
+
+        if not slots:
+            # Nothing to announce to a chat without a live message
+            self.store.discard(chat_id, title)
+            return counts
+        message_id = self._send(chat_id, text)
+        if message_id is None:
+            counts['failed'] = True
+        else:
+            counts['sent'] += 1
+            self.store.set(chat_id, title, message_id, list(keys))
+        return counts
+
+    def update(self, slots: list, url: str, title: str, recipients=None) -> dict:
+        """Update the live message of every chat and save the state.
+
+        Returns:
+            dict: Totals of messages ``sent`` and ``edited`` and the number of ``failed`` chats.
+        """
+        if recipients is None:
+            recipients = telegram.get_chat_ids()
+        totals = {'sent': 0, 'edited': 0, 'failed': 0}
+        try:
+            for chat_id in recipients:
+                counts = self.update_chat(chat_id, slots, url, title)
+                totals['sent'] += counts['sent']
+                totals['edited'] += counts['edited']
+                totals['failed'] += counts['failed']
+        finally:
+            self.store.save()
+        log_event(logger, 'live_messages_updated',
+                  f"Live messages: {totals['sent']} sent, {totals['edited']} edited for {len(recipients)} chats",
+                  chats=len(recipients), **totals)
+        return totals
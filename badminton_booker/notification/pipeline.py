@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Streaming extract, parse, filter and notify pipeline with an early first alert."""
+
+import asyncio
+import logging
+import time
+from badminton_booker.booking.courts import parse_panel
+from badminton_booker.config.settings import get_settings
+from badminton_booker.metrics.event_log import log_event
+from badminton_booker.notification.sinks import CLOSE_TIMEOUT_SECONDS, EventBus, build_event, build_sinks
+
+# Marks the end of the stream on every queue
+_DONE = object()
+
+logger = logging.getLogger(__name__)
+
+
+async def _extract_stage(panels, out_queue):
+    """Push raw panels from the page onto the parse queue."""
+    try:
+        async for panel in panels:
+            await out_queue.put(panel)
+    finally:
+        await out_queue.put(_DONE)
+
+
+async def _parse_stage(in_queue, out_queue, reservations):
+    """Convert raw panels into reservations, keeping every reservation for the final result."""
+    while True:
+        panel = await in_queue.get()
+        if panel is _DONE:
+            break
+        try:
+            reservation = parse_panel(panel)
+        except Exception as e:
+            log_event(logger, 'panel_unparseable', f"Could not parse panel {panel.get('name', '')}: {e}",
+                      logging.WARNING, name=panel.get('name', ''), error=str(e))
+            continue
+        reservations.append(reservation)
+        await out_queue.put(reservation)
+    await out_queue.put(_DONE)
+
+
+async def _filter_stage(in_queue, out_queue):
+    """Forward only the reservations that can be booked."""
+    while True:
+        reservation = await in_queue.get()
+        if reservation is _DONE:
+            break
+        if reservation.get('canReserve', False):
+            await out_queue.put(reservation)
+    await out_queue.put(_DONE)
+
+
+async def _notify_stage(in_queue, url, started, stats, sinks, close_timeout):
+    """Alert the first bookable slot immediately, then send the rest once the stream ends.
+
+    Sinks showing current availability get the whole list once, when the stream ends.
+    """
+    alerts = EventBus([sink for sink in sinks if not sink.wants_empty])
+    live = EventBus([sink for sink in sinks if sink.wants_empty])
+    bookable = []
+    while True:
+        reservation = await in_queue.get()
+        if reservation is _DONE:
+            break
+        bookable.append(reservation)
+        if stats['firstAlertMs'] is None:
+            alerts.publish(build_event({'reservations': [reservation], 'url': url}, "Badminton Reservation Available:"))
+            await alerts.flush()
+            stats['firstAlertMs'] = round((time.perf_counter() - started) * 1000, 1)
+            stats['alertsSent'] += 1
+            log_event(logger, 'first_alert_sent', f"First alert sent {stats['firstAlertMs']} ms after the run started",
+                      firstAlertMs=stats['firstAlertMs'])
+
+    if len(bookable) > 1:
+        alerts.publish(build_event({'reservations': bookable[1:], 'url': url}, "More Badminton Reservations Available:"))
+        stats['alertsSent'] += 1
+    if live.sinks:
+        live.publish(build_event({'reservations': bookable, 'url': url}, include_empty=True))
+    await asyncio.gather(alerts.close(close_timeout), live.close(close_timeout))
+
+
+async def run_notification_pipeline(panels, url, started=None, queue_size=8, mute=False, sinks=None,
+                                    close_timeout=CLOSE_TIMEOUT_SECONDS):
+    """Run the stages concurrently over bounded queues.
+
+    Args:
+        panels: Async iterator of raw panels, e.g. from ``stream_available_bookings``
+        url (str): Search results URL included in the alerts
+        started (float): ``time.perf_counter()`` value the time to first alert is measured from
+        queue_size (int): Capacity of each queue; a slow stage makes upstream stages wait
+        mute (bool): Parse and filter without sending anything
+        sinks (list): Notification sinks, the ones in ``NOTIFICATION_SINKS`` by default
+        close_timeout (float): Seconds to wait for the sinks once the stream ends
+
+    Returns:
+        tuple[list[dict], dict]: Every parsed reservation and the pipeline stats.
+    """
+    started = started if started is not None else time.perf_counter()
+    if sinks is None and not mute:
+        settings = get_settings()
+        sinks = build_sinks(settings.notification_sinks, settings.notification_sink_rates)
+    parse_queue = asyncio.Queue(maxsize=queue_size)
+    filter_queue = asyncio.Queue(maxsize=queue_size)
+    notify_queue = asyncio.Queue(maxsize=queue_size)
+    reservations = []
+    stats = {'firstAlertMs': None, 'alertsSent': 0}
+
+    stages = [
+        _extract_stage(panels, parse_queue),
+        _parse_stage(parse_queue, filter_queue, reservations),
+        _filter_stage(filter_queue, notify_queue),
+    ]
+    if mute:
+        stages.append(_drain(notify_queue))
+    else:
+        stages.append(_notify_stage(notify_queue, url, started, stats, sinks, close_timeout))
+
+    await asyncio.gather(*stages)
+    return reservations, stats
+
+
+async def _drain(in_queue):
+    """Consume the queue without acting on it."""
+    while await in_queue.get() is not _DONE:
+        continue
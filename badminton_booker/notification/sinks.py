@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""Async event bus fanning detected-slot events out to independent notification sinks."""
+
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+import requests
+from badminton_booker.metrics.event_log import log_event
+from badminton_booker.metrics.registry import REGISTRY
+from badminton_booker.notification import telegram
+from badminton_booker.notification.live_message import DEFAULT_STATE_PATH, LiveMessageStore, LiveMessenger
+
+DEFAULT_TITLE = "Badminton Reservations Available:"
+
+# Reservation fields carried by events
+SLOT_FIELDS = ('name', 'startTime', 'endTime', 'price', 'borough', 'address', 'indoor', 'cacheAgeSeconds')
+
+# Deliveries per second when NOTIFICATION_SINK_RATES does not set one, 0 for unlimited
+DEFAULT_RATES = {'telegram': 1.0, 'telegram-live': 1.0, 'webhook': 5.0, 'file': 0.0, 'stdout': 0.0}
+
+# Seconds a run waits for the sinks to drain before discarding undelivered events
+CLOSE_TIMEOUT_SECONDS = 60
+
+EVENTS = REGISTRY.counter('notification_events', 'Notification events handled per sink by outcome.', ['sink', 'outcome'])
+
+# Tells a sink worker to stop once its queue is drained
+_STOP = object()
+
+logger = logging.getLogger(__name__)
+
+
+def _render_text(title: str, slots: list[dict], url: str) -> str:
+    """Plain text rendering shared by every sink that does not need its own markup."""
+    lines = [title]
+    for i, slot in enumerate(slots, 1):
+        start_time, end_time = slot.get('startTime'), slot.get('endTime')
+        if isinstance(start_time, datetime):
+            when = start_time.strftime('%A %-d %B %H:%M')
+            when += f" - {end_time.strftime('%H:%M')}" if isinstance(end_time, datetime) else ''
+        else:
+            when = f"{start_time} - {end_time}"
+        line = f"{i}. {slot.get('name', 'Unknown Location')}, {when}, ${slot.get('price', 'N/A')}"
+        if slot.get('cacheAgeSeconds') is not None:
+            line += f" (last checked {telegram.format_age(slot['cacheAgeSeconds'])} ago)"
+        lines.append(line)
+    if url:
+        lines.append(f"Book: {url}")
+    return '\n'.join(lines)
+
+
+def build_event(reservations_data: dict, title: str = DEFAULT_TITLE, recipients=None, include_empty: bool = False):
+    """Render the bookable reservations of a result once into a sink-neutral event.
+
+    Args:
+        include_empty (bool): Build an event without slots too, for sinks that show current availability
+
+    Returns:
+        dict: Event with ``title``, ``url``, ``detectedAt``, ``slots``, ``recipients``
+        and a plain ``text`` rendering, or None when nothing can be booked.
+    """
+    slots = [
+        {key: res.get(key) for key in SLOT_FIELDS}
+        for res in reservations_data.get('reservations', []) if res.get('canReserve', False)
+    ]
+    if not slots and not include_empty:
+        return None
+    url = reservations_data.get('url', '')
+    return {
+        'title': title,
+        'url': url,
+        'detectedAt': datetime.now().astimezone().isoformat(),
+        'slots': slots,
+        'recipients': recipients,
+        'text': _render_text(title, slots, url),
+    }
+
+
+class Sink(ABC):
+    """Destination of notification events, rate limited and queued by the bus."""
+
+    kind = 'sink'
+    # Sinks showing current availability are also told when nothing can be booked
+    wants_empty = False
+
+    def __init__(self, rate_per_second: float = 0.0, queue_size: int = 100):
+        """Initialize the sink.
+
+        Args:
+            rate_per_second (float): Maximum deliveries per second, 0 for unlimited
+            queue_size (int): Events kept waiting before the oldest ones are dropped
+        """
+        self.rate_per_second = rate_per_second
+        self.queue_size = queue_size
+
+    @property
+    def name(self) -> str:
+        """Name used in logs and metrics."""
+        return self.kind
+
+    @abstractmethod
+    async def deliver(self, event: dict) -> bool:
+        """Deliver one event, returning True on success."""
+
+
+class TelegramSink(Sink):
+    """Send events as HTML messages through the Telegram Bot API."""
+
+    kind = 'telegram'
+
+    async def deliver(self, event):
+        message = telegram.format_reservations_message(event['slots'], event['url'], event['title'])
+        if event.get('recipients') is None:
+            return await asyncio.to_thread(telegram.send_notification, message)
+        return await asyncio.to_thread(telegram.send_notification, message, event['recipients'])
+
+
+class LiveTelegramSink(Sink):
+    """Keep one live Telegram message per chat up to date by editing it in place."""
+
+    kind = 'telegram-live'
+    wants_empty = True
+
+    def __init__(self, state_path=DEFAULT_STATE_PATH, rate_per_second: float = 0.0, queue_size: int = 100):
+        super().__init__(rate_per_second, queue_size)
+        self.state_path = state_path
+
+    def _update(self, event):
+        messenger = LiveMessenger(LiveMessageStore(self.state_path))
+        return messenger.update(event['slots'], event['url'], event['title'], event.get('recipients'))
+
+    async def deliver(self, event):
+        totals = await asyncio.to_thread(self._update, event)
+        return totals['failed'] == 0
+
+
+class WebhookSink(Sink):
+    """POST events as JSON to a URL."""
+
+    kind = 'webhook'
+
+    def __init__(self, url: str, rate_per_second: float = 0.0, queue_size: int = 100, timeout: float = 10):
+        super().__init__(rate_per_second, queue_size)
+        self.url = url
+        self.timeout = timeout
+
+    async def deliver(self, event):
+        body = json.dumps(event, default=str)
+        response = await asyncio.to_thread(
+            requests.post, self.url, data=body, headers={'Content-Type': 'application/json'}, timeout=self.timeout
+        )
+        if response.status_code >= 300:
+            log_event(logger, 'webhook_rejected',
+                      f"Webhook rejected the notification. Status code: {response.status_code}", logging.WARNING,
+                      status=response.status_code)
+            return False
+        return True
+
+
+class FileSink(Sink):
+    """Append events to a local NDJSON file."""
+
+    kind = 'file'
+
+    def __init__(self, path, rate_per_second: float = 0.0, queue_size: int = 100):
+        super().__init__(rate_per_second, queue_size)
+        self.path = Path(path)
+
+    def _append(self, event):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(event, default=str) + '\n')
+
+    async def deliver(self, event):
+        await asyncio.to_thread(self._append, event)
+        return True
+
+
+class StdoutSink(Sink):
+    """Print the plain text rendering of events."""
+
+    kind = 'stdout'
+
+    async def deliver(self, event):
+        print(event['text'])
+        return True
+
+
+def parse_sink_rates(spec: str) -> dict:
+    """Parse ``NOTIFICATION_SINK_RATES`` such as ``telegram=1,webhook=5`` (deliveries per second)."""
+    rates = dict(DEFAULT_RATES)
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        kind, _, rate = item.partition('=')
+        rates[kind.strip()] = float(rate)
+    return rates
+
+
+def build_sinks(spec: str, rates_spec: str = '') -> list[Sink]:
+    """Build sinks from ``NOTIFICATION_SINKS``.
+
+    The spec is a comma separated list of ``telegram``, ``telegram-live``
+    (optionally ``telegram-live:<state path>``), ``stdout``, ``file:<path>``
+    and ``webhook:<url>``.
+    """
+    rates = parse_sink_rates(rates_spec)
+    sinks = []
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        kind, _, target = item.partition(':')
+        rate = rates.get(kind, 0.0)
+        if kind == 'telegram':
+            sinks.append(TelegramSink(rate))
+        elif kind == 'telegram-live':
+            sinks.append(LiveTelegramSink(target or DEFAULT_STATE_PATH, rate))
+        elif kind == 'stdout':
+            sinks.append(StdoutSink(rate))
+        elif kind == 'file' and target:
+            sinks.append(FileSink(target, rate))
+        elif kind == 'webhook' and target:
+            sinks.append(WebhookSink(target, rate))
+        else:
+            raise ValueError(f"Invalid notification sink: {item}")
+    return sinks
+
+
+class EventBus:
+    """Fan events out to every sink at once, each through its own queue and rate limit.
+
+    A slow or failing sink only backs up its own queue; once that queue is
+    full its oldest events are dropped instead of delaying the other sinks.
+    """
+
+    def __init__(self, sinks: list[Sink]):
+        """Initialize the bus; workers start on the first publish."""
+        self.sinks = sinks
+        self.queues = []
+        self.workers = []
+        self.stats = {sink.name: {'delivered': 0, 'failed': 0, 'dropped': 0} for sink in sinks}
+
+    def _start(self):
+        for sink in self.sinks:
+            queue = asyncio.Queue(maxsize=sink.queue_size)
+            self.queues.append(queue)
+            self.workers.append(asyncio.create_task(self._run_sink(sink, queue)))
+
+    async def _run_sink(self, sink, queue):
+        """Deliver queued events to one sink, spacing deliveries by its rate limit."""
+        loop = asyncio.get_running_loop()
+        interval = 1 / sink.rate_per_second if sink.rate_per_second > 0 else 0
+        next_at = 0.0
+        while True:
+            event = await queue.get()
+            try:
+                if event is _STOP:
+                    return
+                delay = next_at - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                outcome = 'delivered' if await sink.deliver(event) else 'failed'
+            except Exception as e:
+                log_event(logger, 'sink_failed', f"Notification sink {sink.name} failed: {e}", logging.ERROR,
+                          exc_info=True, sink=sink.name, error=str(e))
+                outcome = 'failed'
+            finally:
+                queue.task_done()
+            self.stats[sink.name][outcome] += 1
+            EVENTS.inc(sink=sink.name, outcome=outcome)
+            next_at = loop.time() + interval
+
+    def publish(self, event: dict) -> None:
+        """Queue an event for every sink without waiting for any of them.
+
+        An event without slots only goes to the sinks showing current availability.
+        """
+        if not self.workers:
+            self._start()
+        empty = 'slots' in event and not event['slots']
+        for sink, queue in zip(self.sinks, self.queues):
+            if empty and not sink.wants_empty:
+                continue
+            self._put(sink, queue, event)
+
+    def _put(self, sink, queue, item):
+        """Queue an item without waiting, dropping the oldest queued event when the queue is full."""
+        if queue.full():
+            queue.get_nowait()
+            queue.task_done()
+            self.stats[sink.name]['dropped'] += 1
+            EVENTS.inc(sink=sink.name, outcome='dropped')
+        queue.put_nowait(item)
+
+    async def flush(self) -> None:
+        """Wait until every event published so far has been handled, leaving the workers running."""
+        await asyncio.gather(*(queue.join() for queue in self.queues))
+
+    async def close(self, timeout: float = CLOSE_TIMEOUT_SECONDS) -> dict:
+        """Let every sink drain its queue, then stop the workers.
+
+        Args:
+            timeout (float): Seconds to wait for slow sinks before cancelling them, None to wait for ever
+
+        Returns:
+            dict: Delivered, failed and dropped event counts per sink.
+        """
+        # A stuck sink never frees a slot, so the stop marker must not wait for one
+        for sink, queue in zip(self.sinks, self.queues):
+            self._put(sink, queue, _STOP)
+        try:
+            await asyncio.wait_for(asyncio.gather(*self.workers), timeout)
+        except asyncio.TimeoutError:
+            log_event(logger, 'sinks_timeout',
+                      "Timed out waiting for notification sinks; undelivered events were discarded.",
+                      logging.WARNING, timeoutSeconds=timeout)
+        self.queues, self.workers = [], []
+        return self.stats
+
+
+async def notify_sinks(reservations_data: dict, sinks: list[Sink], title: str = DEFAULT_TITLE, recipients=None,
+                       close_timeout: float = CLOSE_TIMEOUT_SECONDS):
+    """Publish one result to every sink and wait for the deliveries, at most ``close_timeout`` seconds.
+
+    Returns:
+        bool: True if an event was published and every sink delivered it.
+    """
+    event = build_event(reservations_data, title, recipients)
+    if event is None:
+        # Live messages still need to show that the slots they list are gone
+        sinks = [sink for sink in sinks if sink.wants_empty]
+        if not sinks:
+            log_event(logger, 'nothing_to_notify', "No bookable reservations found to notify about.",
+                      slots=len(reservations_data.get('reservations', [])))
+            return False
+        event = build_event(reservations_data, title, recipients, include_empty=True)
+    bus = EventBus(sinks)
+    bus.publish(event)
+    stats = await bus.close(close_timeout)
+    return all(counts['failed'] == 0 and counts['dropped'] == 0 for counts in stats.values())
@@ -1,25 +1,49 @@
 #!/usr/bin/env python3
 """Telegram notification module for badminton booker."""
 
+import logging
 import requests
 import os
+import time
 from dotenv import load_dotenv
 from datetime import datetime
-from badminton_booker.datastore.chat_id_service import fetch_chat_ids_from_firestore
+from badminton_booker.datastore import chat_id_service
+from badminton_booker.metrics.event_log import log_event, log_phase
+from badminton_booker.metrics.registry import REGISTRY
 
 # Load environment variables from .env file if it exists
 load_dotenv()
 
 # Telegram bot configuration - get from environment variables
 token = os.environ.get("TELEGRAM_BOT_TOKEN", "")
-chat_ids = fetch_chat_ids_from_firestore()
+api_url = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org")
+# Chat IDs are fetched from Firestore on first send
+chat_ids = None
+# Seconds before a Bot API call is abandoned, so one hung request cannot stall a run
+REQUEST_TIMEOUT = 10
 
+logger = logging.getLogger(__name__)
 
-def send_notification(message=None):
+SENDS = REGISTRY.counter('telegram_sends', 'Telegram sendMessage calls by outcome.', ['outcome'])
+SEND_DURATION = REGISTRY.histogram(
+    'telegram_send_duration_seconds', 'Latency of Telegram sendMessage calls.',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+
+
+def get_chat_ids():
+    """Return the subscribed chat IDs, fetching them from Firestore on first use."""
+    global chat_ids
+    if chat_ids is None:
+        chat_ids = chat_id_service.fetch_chat_ids_from_firestore()
+    return chat_ids
+
+
+def send_notification(message=None, recipients=None):
     """Send a notification message via Telegram Bot API
 
     Args:
         message (str): Message to send. If None, a test message will be sent.
+        recipients (list): Chat IDs to send to. Defaults to every subscribed chat.
 
     Returns:
         bool: True if successful, False otherwise
@@ -29,43 +53,112 @@ def send_notification(message=None):
             message = "🔔 Test Message: Badminton notification system is working!"
 
         # Create the Telegram API URL
-        url = f"https://api.telegram.org/bot{token}/sendMessage"
+        url = f"{api_url}/bot{token}/sendMessage"
         
         # If no chat IDs, return success (nothing to do)
-        if not chat_ids:
+        if recipients is None:
+            recipients = get_chat_ids()
+        if not recipients:
             return True
             
         all_success = True
         
-        for chat_id in chat_ids:
+        for chat_id in recipients:
             # Request parameters
             params = {"chat_id": chat_id, "text": message, "parse_mode": "HTML"}
 
             # Send HTTP request to Telegram Bot API
-            response = requests.post(url, params=params)
+            sent_at = time.perf_counter()
+            try:
+                response = requests.post(url, params=params, timeout=REQUEST_TIMEOUT)
+            except requests.RequestException:
+                SENDS.inc(outcome='error')
+                raise
+            finally:
+                duration_ms = round((time.perf_counter() - sent_at) * 1000)
+                SEND_DURATION.observe(duration_ms / 1000)
 
             # Check if request was successful
             if response.status_code == 200:
-                print("Notification sent successfully!")
+                SENDS.inc(outcome='sent')
+                log_event(logger, 'telegram_sent', "Notification sent successfully!",
+                          chatId=chat_id, durationMs=duration_ms)
             else:
-                print(
-                    f"Failed to send notification. Status code: {response.status_code}"
+                SENDS.inc(outcome='rejected')
+                log_event(
+                    logger, 'telegram_rejected',
+                    f"Failed to send notification. Status code: {response.status_code}. Response: {response.json()}",
+                    logging.WARNING, chatId=chat_id, status=response.status_code, durationMs=duration_ms,
                 )
-                print(f"Response: {response.json()}")
                 all_success = False
 
         return all_success
 
     except Exception as e:
-        print(f"Failed to send notification: {e}")
+        log_event(logger, 'telegram_failed', f"Failed to send notification: {e}", logging.ERROR, error=str(e))
         return False
 
 
-def notify_about_reservations(reservations_data):
+def format_age(seconds) -> str:
+    """Describe an age in seconds as minutes, or hours past two hours."""
+    minutes = round(seconds / 60)
+    if minutes < 120:
+        return f"{minutes} min"
+    return f"{minutes // 60} h {minutes % 60:02d}"
+
+
+def format_reservations_message(bookable_reservations, url="", title="Badminton Reservations Available:"):
+    """Build the HTML message listing bookable reservations
+
+    Args:
+        bookable_reservations (list): Reservations to list, in display order
+        url (str): Search results URL for the 'Book Now' link
+        title (str): Bold heading of the message
+
+    Returns:
+        str: HTML formatted message
+    """
+    message = f"🏸 <b>{title}</b>\n\n"
+
+    for i, res in enumerate(bookable_reservations, 1):
+        # Format the start and end times - they're already in Eastern Time due to browser config
+        start_time = res.get("startTime")
+        # Format the datetime object directly
+        if isinstance(start_time, datetime):
+            dateText = start_time.strftime('%A %-d %B')
+            start_time_str = start_time.strftime('%H:%M')
+            end_time_str = res.get("endTime").strftime('%H:%M') if isinstance(res.get("endTime"), datetime) else "N/A"
+        else:
+            # For backward compatibility if startTime is still a string
+            dateText = "Today"
+            start_time_str = str(start_time)
+            end_time_str = str(res.get("endTime", "N/A"))
+        
+        message += f"{i}. <b>{res.get('name', 'Unknown Location')}</b>\n"
+        # Address and borough are only known for facilities in the local index
+        location = ", ".join(str(part) for part in (res.get("address"), res.get("borough")) if part)
+        if location:
+            message += f"   📍 {location}\n"
+        message += f"   📅 {dateText}: {start_time_str} - {end_time_str}\n"
+        # Slots answered from the horizon cache were not seen on this run
+        if res.get("cacheAgeSeconds") is not None:
+            message += f"   🕒 Last checked {format_age(res['cacheAgeSeconds'])} ago\n"
+        message += f"   💰 ${res.get('price', 'N/A')}\n\n"
+
+    # Include URL if available
+    if url:
+        message += f"\n🔗 <a href='{url}'>Book Now</a>"
+
+    return message
+
+
+def notify_about_reservations(reservations_data, title="Badminton Reservations Available:", recipients=None):
     """Send notification about available badminton reservations
 
     Args:
         reservations_data (dict): Dictionary containing reservation data
+        title (str): Bold heading of the message
+        recipients (list): Chat IDs to notify. Defaults to every subscribed chat.
 
     Returns:
         bool: True if a notification was sent, False otherwise
@@ -80,38 +173,20 @@ def notify_about_reservations(reservations_data):
 
         # If no bookable reservations, do nothing and return False
         if not bookable_reservations:
-            print("No bookable reservations found to notify about.")
+            log_event(logger, 'nothing_to_notify', "No bookable reservations found to notify about.",
+                      slots=len(reservations))
             return False
 
-        # Build message with available bookable reservations
-        message = "🏸 <b>Badminton Reservations Available:</b>\n\n"
-
-        for i, res in enumerate(bookable_reservations, 1):
-            # Format the start and end times - they're already in Eastern Time due to browser config
-            start_time = res.get("startTime")
-            # Format the datetime object directly
-            if isinstance(start_time, datetime):
-                dateText = start_time.strftime('%A %-d %B')
-                start_time_str = start_time.strftime('%H:%M')
-                end_time_str = res.get("endTime").strftime('%H:%M') if isinstance(res.get("endTime"), datetime) else "N/A"
-            else:
-                # For backward compatibility if startTime is still a string
-                dateText = "Today"
-                start_time_str = str(start_time)
-                end_time_str = str(res.get("endTime", "N/A"))
-            
-            message += f"{i}. <b>{res.get('name', 'Unknown Location')}</b>\n"
-            message += f"   📅 {dateText}: {start_time_str} - {end_time_str}\n"
-            message += f"   💰 ${res.get('price', 'N/A')}\n\n"
-
-        # Include URL if available
-        url = reservations_data.get("url", "")
-        if url:
-            message += f"\n🔗 <a href='{url}'>Book Now</a>"
+        message = format_reservations_message(bookable_reservations, reservations_data.get("url", ""), title)
+        log_event(logger, 'notification_prepared', f"Notifying about {len(bookable_reservations)} bookable slots",
+                  slots=len(reservations), bookable=len(bookable_reservations), chatIds=recipients)
 
         # Send the notification with bookable reservations
-        return send_notification(message)
+        with log_phase('notify'):
+            if recipients is None:
+                return send_notification(message)
+            return send_notification(message, recipients)
 
     except Exception as e:
-        print(f"Error creating notification: {e}")
+        log_event(logger, 'notification_failed', f"Error creating notification: {e}", logging.ERROR, error=str(e))
         return False
\ No newline at end of file
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Local HTTP service answering availability queries from cached scan results."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from badminton_booker.booking.courts import check_available_courts
+from badminton_booker.metrics.event_log import log_event
+from badminton_booker.metrics.registry import CONTENT_TYPE, REGISTRY
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """Latest scan result, refreshed at most once per freshness period.
+
+    Concurrent callers that find the cache stale share a single in-flight
+    scrape instead of each starting their own.
+    """
+
+    def __init__(self, scrape, freshness_seconds: float):
+        """Initialize the cache.
+
+        Args:
+            scrape: Blocking function returning fresh result data
+            freshness_seconds (float): Age after which the cached result is refreshed
+        """
+        self.scrape = scrape
+        self.freshness_seconds = freshness_seconds
+        self.result = None
+        self.fetched_at = None
+        self.scrapes = 0
+        self._lock = threading.Lock()
+        self._in_flight = None
+
+    def age(self):
+        """Seconds since the cached result was fetched, or None if there is none."""
+        return None if self.fetched_at is None else time.monotonic() - self.fetched_at
+
+    def get(self):
+        """Return a result no older than the freshness period, scraping if needed."""
+        with self._lock:
+            age = self.age()
+            if age is not None and age < self.freshness_seconds:
+                return self.result
+            if self._in_flight is None:
+                self._in_flight = threading.Event()
+                in_flight, leader = self._in_flight, True
+            else:
+                in_flight, leader = self._in_flight, False
+
+        if not leader:
+            in_flight.wait()
+            return self.result
+
+        try:
+            self.scrapes += 1
+            result = self.scrape()
+            with self._lock:
+                if result is not None:
+                    self.result = result
+                    self.fetched_at = time.monotonic()
+        except Exception as e:
+            log_event(logger, 'scrape_failed', f"Scrape failed, serving the previous result: {e}", logging.ERROR,
+                      exc_info=True, error=str(e))
+        finally:
+            with self._lock:
+                self._in_flight = None
+            in_flight.set()
+        return self.result
+
+
+def _parse_hhmm(value: str):
+    """Parse an ``HH:MM`` query value."""
+    return datetime.strptime(value, "%H:%M").time()
+
+
+def filter_reservations(reservations, court=None, date=None, start=None, end=None, bookable_only=False, borough=None):
+    """Filter reservations by court name substring, borough, ``YYYY-MM-DD`` date and ``HH:MM`` time range."""
+    start = _parse_hhmm(start) if start else None
+    end = _parse_hhmm(end) if end else None
+    matches = []
+    for res in reservations:
+        if bookable_only and not res.get('canReserve', False):
+            continue
+        if court and court.lower() not in res.get('name', '').lower():
+            continue
+        if borough and (res.get('borough') or '').lower() != borough.lower():
+            continue
+        start_time = res.get('startTime')
+        if date or start or end:
+            if not isinstance(start_time, datetime):
+                continue
+            if date and start_time.strftime('%Y-%m-%d') != date:
+                continue
+            if start and start_time.time() < start:
+                continue
+            end_time = res.get('endTime')
+            if end and isinstance(end_time, datetime) and end_time.time() > end:
+                continue
+        matches.append(res)
+    return matches
+
+
+def make_handler(cache: ResultCache):
+    """Build a request handler class serving from the given cache."""
+
+    class AvailabilityHandler(BaseHTTPRequestHandler):
+        """Serve ``/availability``, ``/health`` and ``/metrics``."""
+
+        def _send(self, status, body=b'', headers=None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path == '/health':
+                age = cache.age()
+                body = json.dumps({'status': 'ok', 'cacheAgeSeconds': age, 'scrapes': cache.scrapes}).encode()
+                self._send(200, body, {'Content-Type': 'application/json'})
+                return
+            if parsed.path == '/metrics':
+                self._send(200, REGISTRY.render().encode(), {'Content-Type': CONTENT_TYPE})
+                return
+            if parsed.path != '/availability':
+                self._send(404)
+                return
+
+            query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+            result = cache.get()
+            if result is None:
+                self._send(503, b'{"error": "No results available yet"}', {'Content-Type': 'application/json'})
+                return
+
+            try:
+                reservations = filter_reservations(
+                    result.get('reservations', []),
+                    court=query.get('court'),
+                    date=query.get('date'),
+                    start=query.get('from'),
+                    end=query.get('to'),
+                    bookable_only=query.get('bookable', '').lower() in ('1', 'true', 'yes'),
+                    borough=query.get('borough'),
+                )
+            except ValueError as e:
+                self._send(400, json.dumps({'error': str(e)}).encode(), {'Content-Type': 'application/json'})
+                return
+
+            body = json.dumps({
+                'timestamp': result.get('timestamp'),
+                'url': result.get('url'),
+                'reservations': reservations,
+            }, default=str).encode()
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            max_age = max(0, int(cache.freshness_seconds - (cache.age() or 0)))
+            headers = {'ETag': etag, 'Cache-Control': f'max-age={max_age}'}
+
+            if self.headers.get('If-None-Match') == etag:
+                self._send(304, headers=headers)
+                return
+            self._send(200, body, {**headers, 'Content-Type': 'application/json'})
+
+        def log_message(self, format, *args):
+            """Silence per-request logging."""
+
+    return AvailabilityHandler
+
+
+def serve(args, host: str, port: int, freshness_seconds: float):
+    """Serve cached availability until interrupted."""
+    cache = ResultCache(lambda: asyncio.run(check_available_courts(args)), freshness_seconds)
+    server = ThreadingHTTPServer((host, port), make_handler(cache))
+    log_event(logger, 'service_serving',
+              f"Serving availability on http://{host}:{port}/availability (freshness {freshness_seconds}s)",
+              host=host, port=port, freshnessSeconds=freshness_seconds)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
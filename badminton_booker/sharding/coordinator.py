@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Split a scan into units, hand them to workers and merge their results."""
+
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List
+from badminton_booker.booking.handle_time import restore_reservation_times
+from badminton_booker.metrics.event_log import log_event
+
+logger = logging.getLogger(__name__)
+
+
+def plan_units(targets: List[str], neighborhoods: List[str], dates: List[str], group_size: int) -> List[Dict]:
+    """Build one scan unit per target, neighborhood group and date.
+
+    Args:
+        targets (List[str]): Booking URLs to scan
+        neighborhoods (List[str]): Neighborhoods to split into groups
+        dates (List[str]): Two digit days of the month to scan
+        group_size (int): Number of neighborhoods searched together in one unit
+
+    Returns:
+        List[Dict]: Unit payloads with ``target``, ``neighborhoods`` and ``date`` keys.
+    """
+    group_size = max(group_size, 1)
+    groups = [neighborhoods[i:i + group_size] for i in range(0, len(neighborhoods), group_size)]
+    return [
+        {"target": target, "neighborhoods": group, "date": date}
+        for target in targets
+        for group in groups
+        for date in dates
+    ]
+
+
+def merge_unit_results(units: List[Dict]) -> Dict:
+    """Merge the result data of completed units into a single result.
+
+    Reservations seen by several units are kept once, and the coverage
+    section lists which units completed, only partially covered their
+    search, or failed.
+    """
+    reservations = []
+    seen = set()
+    url = ""
+    completed, partial, missing = [], [], []
+    for unit in units:
+        result = unit.get("result")
+        if unit["status"] != "done" or not result:
+            missing.append(unit["payload"])
+            continue
+        if result.get("coverage", {}).get("complete", True):
+            completed.append(unit["payload"])
+        else:
+            partial.append(unit["payload"])
+        url = url or result.get("url", "")
+        for res in result.get("reservations", []):
+            key = (res.get("name"), str(res.get("startTime")), str(res.get("endTime")))
+            if key in seen:
+                continue
+            seen.add(key)
+            reservations.append(restore_reservation_times(res))
+
+    return {
+        "reservations": reservations,
+        "url": url,
+        "timestamp": datetime.now().isoformat(),
+        "timezone": datetime.now().astimezone().tzname(),
+        "coverage": {
+            "complete": not missing and not partial,
+            "units": {"completed": completed, "partial": partial, "missing": missing},
+        },
+    }
+
+
+async def run_coordinator(queue, units: List[Dict], timeout_seconds: float, poll_interval: float = 1.0) -> Dict:
+    """Enqueue the units of a new run and wait for workers to finish them.
+
+    Returns merged results when every unit is done or failed, or whatever
+    has completed once ``timeout_seconds`` elapses.
+    """
+    run_id = uuid.uuid4().hex
+    queue.enqueue(run_id, units)
+    log_event(logger, 'units_queued', f"Coordinator: queued {len(units)} scan units for run {run_id}",
+              units=len(units), shardRunId=run_id)
+
+    deadline = time.monotonic() + timeout_seconds
+    while True:
+        progress = queue.progress(run_id)
+        finished = progress.get("done", 0) + progress.get("failed", 0)
+        if finished >= len(units):
+            break
+        if time.monotonic() >= deadline:
+            log_event(logger, 'coordinator_timeout', f"Coordinator: timed out with {finished}/{len(units)} units finished",
+                      logging.WARNING, finished=finished, units=len(units), shardRunId=run_id)
+            break
+        await asyncio.sleep(poll_interval)
+
+    progress = queue.progress(run_id)
+    log_event(logger, 'coordinator_finished',
+              f"Coordinator: {progress.get('done', 0)} units done, {progress.get('failed', 0)} failed",
+              done=progress.get('done', 0), failed=progress.get('failed', 0), shardRunId=run_id)
+    return merge_unit_results(queue.units(run_id))
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""Single-flight guard so overlapping runs share one scan and notify cycle instead of repeating it."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from firebase_admin import firestore
+from badminton_booker.datastore.chat_id_service import get_db
+from badminton_booker.datastore.snapshot import restore_result_data
+from badminton_booker.metrics.event_log import log_event
+from badminton_booker.sharding.worker import default_worker_id
+
+try:
+    import fcntl
+except ImportError:  # Windows: every run then acts as the leader
+    fcntl = None
+
+BACKENDS = ('none', 'file', 'firestore')
+MODES = ('wait', 'skip')
+# Firestore documents are limited to 1 MiB, leave room for the lease fields
+MAX_PUBLISHED_BYTES = 900_000
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLost(Exception):
+    """The lease expired while the cycle ran and another process may have taken it over."""
+
+
+def cycle_key(booking_url: str, neighborhoods: list, mode: str = 'scan', muted: bool = False) -> str:
+    """Name the cycle after the search it runs, so different searches never block each other.
+
+    Muted runs get their own key: a run that sends nothing must not stand in for one that notifies.
+    """
+    search = json.dumps([booking_url, sorted(neighborhoods), mode, muted])
+    return f"{mode}-{hashlib.sha1(search.encode()).hexdigest()[:12]}"
+
+
+def _published(finished_at: float, holder: str, result) -> dict:
+    """Shape of the result left behind by a finished cycle."""
+    return {'finishedAt': finished_at, 'holder': holder, 'result': result}
+
+
+class FileLease:
+    """Lock file on the local disk, released by the kernel if the holding process dies."""
+
+    def __init__(self, directory, key: str):
+        """Initialize the lease of a cycle.
+
+        Args:
+            directory: Directory holding the lock and the last published result
+            key (str): Name of the cycle
+        """
+        self.directory = Path(directory)
+        self.lock_path = self.directory / f'{key}.lock'
+        self.result_path = self.directory / f'{key}.result.json'
+        self._lock_file = None
+
+    def try_acquire(self, holder: str) -> bool:
+        """Take the lock without waiting, returning False if another process holds it."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.lock_path, 'a+')
+        if fcntl:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(holder)
+        lock_file.flush()
+        self._lock_file = lock_file
+        return True
+
+    def renew(self, holder: str) -> bool:
+        """The lock lasts as long as the process, there is nothing to renew."""
+        return self._lock_file is not None
+
+    def holder(self):
+        """Return who holds the lock, as written by the holder."""
+        try:
+            return self.lock_path.read_text() or None
+        except FileNotFoundError:
+            return None
+
+    def release(self, holder: str) -> None:
+        """Release the lock."""
+        if self._lock_file is None:
+            return
+        self._lock_file.seek(0)
+        self._lock_file.truncate()
+        if fcntl:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+        self._lock_file.close()
+        self._lock_file = None
+
+    def publish(self, holder: str, result) -> None:
+        """Leave the result of the cycle for the runs waiting on it, replacing the file atomically."""
+        temp_path = self.result_path.with_name(self.result_path.name + f'.{os.getpid()}.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(_published(time.time(), holder, result), f, default=str)
+        os.replace(temp_path, self.result_path)
+
+    def last_result(self):
+        """Return the last published result, or None."""
+        try:
+            with open(self.result_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+
+class FirestoreLease:
+    """Lease document in Firestore shared by every host, expiring unless the holder renews it."""
+
+    def __init__(self, key: str, lease_seconds: float = 300, db=None, collection: str = 'single_flight'):
+        """Initialize the lease of a cycle.
+
+        Args:
+            key (str): Name of the cycle, used as the document ID
+            lease_seconds (float): How long the lease lasts without renewal
+            db: Firestore client, the configured one by default
+            collection (str): Collection holding the lease documents
+        """
+        self.key = key
+        self.lease_seconds = lease_seconds
+        self._db = db
+        self.collection = collection
+
+    def _document(self):
+        """Return the lease document, connecting to Firestore on first use."""
+        if self._db is None:
+            self._db = get_db()
+        return self._db.collection(self.collection).document(self.key)
+
+    def _claim(self, holder: str, renewing: bool) -> bool:
+        """Take or extend the lease in a transaction."""
+        document = self._document()
+
+        @firestore.transactional
+        def claim(transaction):
+            snapshot = document.get(transaction=transaction)
+            lease = snapshot.to_dict() if snapshot.exists else {}
+            now = time.time()
+            held_by_other = lease.get('holder') not in (None, holder) and lease.get('expiresAt', 0) > now
+            if held_by_other or (renewing and lease.get('holder') != holder):
+                return False
+            transaction.set(document, {'holder': holder, 'expiresAt': now + self.lease_seconds}, merge=True)
+            return True
+
+        return claim(self._db.transaction())
+
+    def try_acquire(self, holder: str) -> bool:
+        """Take the lease if it is free or expired."""
+        return self._claim(holder, renewing=False)
+
+    def renew(self, holder: str) -> bool:
+        """Extend the lease, returning False if it was lost to another holder."""
+        return self._claim(holder, renewing=True)
+
+    def holder(self):
+        """Return the current holder of an unexpired lease."""
+        lease = self._document().get().to_dict() or {}
+        return lease.get('holder') if lease.get('expiresAt', 0) > time.time() else None
+
+    def release(self, holder: str) -> None:
+        """Give up the lease if it is still ours."""
+        document = self._document()
+
+        @firestore.transactional
+        def release(transaction):
+            snapshot = document.get(transaction=transaction)
+            if snapshot.exists and (snapshot.to_dict() or {}).get('holder') == holder:
+                transaction.set(document, {'holder': None, 'expiresAt': 0}, merge=True)
+
+        release(self._db.transaction())
+
+    def publish(self, holder: str, result) -> None:
+        """Store the result of the cycle on the lease document.
+
+        Raises:
+            ValueError: If the serialized result would not fit in a Firestore document.
+        """
+        encoded = json.dumps(result, default=str)
+        size = len(encoded.encode())
+        if size > MAX_PUBLISHED_BYTES:
+            raise ValueError(f"result of {size} bytes is over the {MAX_PUBLISHED_BYTES} byte lease document limit")
+        published = _published(time.time(), holder, encoded)
+        self._document().set({'published': published}, merge=True)
+
+    def last_result(self):
+        """Return the last published result, or None."""
+        published = (self._document().get().to_dict() or {}).get('published')
+        if not published:
+            return None
+        return {**published, 'result': json.loads(published['result'])}
+
+
+class SingleFlight:
+    """Run a cycle in at most one process at a time.
+
+    The process that takes the lease runs the cycle and publishes its result.
+    Any other process either skips, or waits for the running cycle and
+    reuses its result. A result published shortly before a process started
+    is reused as well. If the leader fails without publishing, a waiting
+    process takes over the lease and runs the cycle itself.
+    """
+
+    def __init__(self, lease, mode: str = 'wait', wait_timeout_seconds: float = 900, reuse_seconds: float = 60,
+                 poll_interval: float = 2.0, renew_interval: float = None, holder: str = None):
+        """Initialize the guard.
+
+        Args:
+            lease: ``FileLease`` or ``FirestoreLease``
+            mode (str): ``wait`` to reuse the running cycle's result, ``skip`` to return at once
+            wait_timeout_seconds (float): Longest wait for a running cycle
+            reuse_seconds (float): Age up to which a result published before starting is reused
+            poll_interval (float): Seconds between checks while waiting
+            renew_interval (float): Seconds between lease renewals while leading, a third of
+                the Firestore lease by default
+            holder (str): Identity written on the lease, the host name and PID by default
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown single-flight mode {mode!r}, expected one of {', '.join(MODES)}")
+        self.lease = lease
+        self.mode = mode
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self.reuse_seconds = reuse_seconds
+        self.poll_interval = poll_interval
+        self.renew_interval = renew_interval or getattr(lease, 'lease_seconds', 300) / 3
+        self.holder = holder or default_worker_id()
+
+    async def _renew(self, running) -> None:
+        """Keep the lease alive while the cycle runs, cancelling the cycle if the lease is lost."""
+        while True:
+            await asyncio.sleep(self.renew_interval)
+            if not await asyncio.to_thread(self.lease.renew, self.holder):
+                log_event(logger, 'single_flight_lease_lost',
+                          f"Single-flight lease lost while running as {self.holder}, stopping the cycle",
+                          logging.WARNING, holder=self.holder, role='leader')
+                # Another process may be running the same cycle by now: stop before it notifies twice
+                running.cancel()
+                return
+
+    async def _lead(self, cycle):
+        """Run the cycle holding the lease and publish its result before releasing it.
+
+        Raises:
+            LeaseLost: If the lease could not be renewed; the cycle is cancelled and nothing is published.
+        """
+        running = asyncio.ensure_future(cycle())
+        renewal = asyncio.create_task(self._renew(running))
+        try:
+            try:
+                result = await running
+            except asyncio.CancelledError:
+                if renewal.done() and not renewal.cancelled():
+                    raise LeaseLost(f"lease lost while running as {self.holder}") from None
+                raise
+            if renewal.done() and not renewal.cancelled():
+                # The cycle finished as the lease was lost, its result may not be the one to reuse
+                return result
+            try:
+                await asyncio.to_thread(self.lease.publish, self.holder, result)
+            except Exception as e:
+                # Waiting processes find the lease free and no fresh result, so they run the cycle themselves
+                log_event(logger, 'single_flight_publish_failed',
+                          f"Could not publish the results of the cycle run as {self.holder}: {e}",
+                          logging.WARNING, holder=self.holder, role='leader', error=str(e))
+            return result
+        finally:
+            renewal.cancel()
+            await asyncio.to_thread(self.lease.release, self.holder)
+
+    def _reusable(self, published, started: float) -> bool:
+        """Whether a published result is recent enough to stand in for running the cycle."""
+        return bool(published) and published['finishedAt'] >= started - self.reuse_seconds
+
+    def _follow(self, published):
+        """Return the result of another process's cycle as this process's own."""
+        log_event(logger, 'single_flight_reused', f"Reusing the results of the cycle run by {published['holder']}",
+                  holder=published['holder'], role='follower')
+        result = published['result']
+        return 'follower', restore_result_data(result) if result else result
+
+    async def run(self, cycle):
+        """Run ``cycle`` unless another process already is.
+
+        Args:
+            cycle: Coroutine function returning the result data of the cycle
+
+        Returns:
+            tuple: ``(role, result)`` where role is ``leader`` when this process ran the cycle,
+            ``follower`` when it reused another one's result, or ``skipped``.
+        """
+        started = time.time()
+        while True:
+            published = await asyncio.to_thread(self.lease.last_result)
+            if self._reusable(published, started):
+                return self._follow(published)
+
+            if await asyncio.to_thread(self.lease.try_acquire, self.holder):
+                # The leader may have published and released between the check above and taking the lease
+                published = await asyncio.to_thread(self.lease.last_result)
+                if self._reusable(published, started):
+                    await asyncio.to_thread(self.lease.release, self.holder)
+                    return self._follow(published)
+                try:
+                    return 'leader', await self._lead(cycle)
+                except LeaseLost:
+                    # Whoever took the lease over is running the cycle, wait for it like any other
+                    continue
+
+            holder = await asyncio.to_thread(self.lease.holder)
+            if self.mode == 'skip':
+                log_event(logger, 'single_flight_skipped', f"Skipping: a cycle is already running as {holder}",
+                          holder=holder, role='skipped')
+                return 'skipped', None
+            if time.time() - started >= self.wait_timeout_seconds:
+                log_event(logger, 'single_flight_wait_timeout', f"Gave up waiting for the cycle running as {holder}",
+                          logging.WARNING, holder=holder, role='skipped')
+                return 'skipped', None
+            await asyncio.sleep(self.poll_interval)
+
+
+def single_flight_from_settings(settings, key: str):
+    """Build the configured guard for a cycle, or None when ``SINGLE_FLIGHT_BACKEND=none``."""
+    if settings.single_flight_backend == 'none':
+        return None
+    if settings.single_flight_backend == 'firestore':
+        lease = FirestoreLease(key, settings.single_flight_lease_seconds)
+    else:
+        lease = FileLease(settings.single_flight_dir, key)
+    return SingleFlight(
+        lease,
+        settings.single_flight_mode,
+        settings.single_flight_wait_seconds,
+        settings.single_flight_reuse_seconds,
+    )
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""SQLite backed work queue shared by the scan coordinator and its workers."""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+class WorkQueue:
+    """Lease based queue of scan units stored in a local SQLite database.
+
+    Workers lease a unit for a limited time. A unit whose lease expires
+    without being completed is handed to the next worker that asks for work.
+    """
+
+    def __init__(self, path: Path, max_attempts: int = 3):
+        """Open (and create if needed) the queue database."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS units (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    leased_until REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection that waits for other processes instead of failing."""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def enqueue(self, run_id: str, payloads: List[Dict]) -> List[int]:
+        """Add scan units for a run and return their IDs."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            ids = [
+                conn.execute(
+                    "INSERT INTO units (run_id, payload) VALUES (?, ?)",
+                    (run_id, json.dumps(payload)),
+                ).lastrowid
+                for payload in payloads
+            ]
+            conn.execute("COMMIT")
+            return ids
+        finally:
+            conn.close()
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Tuple[int, str, Dict]]:
+        """Lease the oldest pending or expired unit.
+
+        An expired unit that already used up ``max_attempts`` is marked failed
+        instead, so a unit that keeps crashing its workers is not retried forever.
+
+        Returns:
+            Optional[Tuple[int, str, Dict]]: ``(unit ID, run ID, payload)`` or None when idle.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                """
+                UPDATE units SET status = 'failed', error = 'lease expired', leased_until = NULL
+                WHERE status = 'leased' AND leased_until < ? AND attempts >= ?
+                """,
+                (now, self.max_attempts),
+            )
+            row = conn.execute(
+                """
+                SELECT id, run_id, payload FROM units
+                WHERE status = 'pending' OR (status = 'leased' AND leased_until < ?)
+                ORDER BY id LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                """
+                UPDATE units SET status = 'leased', worker = ?, leased_until = ?, attempts = attempts + 1
+                WHERE id = ?
+                """,
+                (worker_id, now + lease_seconds, row[0]),
+            )
+            conn.execute("COMMIT")
+            return row[0], row[1], json.loads(row[2])
+        finally:
+            conn.close()
+
+    def renew(self, unit_id: int, worker_id: str, lease_seconds: float) -> bool:
+        """Extend the lease of a unit this worker still holds.
+
+        Returns:
+            bool: False when the unit is no longer leased by this worker.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                """
+                UPDATE units SET leased_until = ?
+                WHERE id = ? AND worker = ? AND status = 'leased'
+                """,
+                (time.time() + lease_seconds, unit_id, worker_id),
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def complete(self, unit_id: int, worker_id: str, result: Dict) -> bool:
+        """Store the result of a unit still leased by this worker."""
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                """
+                UPDATE units SET status = 'done', result = ?, leased_until = NULL
+                WHERE id = ? AND worker = ? AND status = 'leased'
+                """,
+                (json.dumps(result, default=str), unit_id, worker_id),
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def fail(self, unit_id: int, worker_id: str, error: str) -> None:
+        """Release a failed unit for retry, or give up after ``max_attempts``."""
+        conn = self._connect()
+        try:
+            conn.execute(
+                """
+                UPDATE units
+                SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    error = ?, leased_until = NULL
+                WHERE id = ? AND worker = ? AND status = 'leased'
+                """,
+                (self.max_attempts, error, unit_id, worker_id),
+            )
+        finally:
+            conn.close()
+
+    def progress(self, run_id: str) -> Dict[str, int]:
+        """Count the units of a run by status."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM units WHERE run_id = ? GROUP BY status",
+                (run_id,),
+            ).fetchall()
+            return {status: count for status, count in rows}
+        finally:
+            conn.close()
+
+    def units(self, run_id: str) -> List[Dict]:
+        """Return every unit of a run with its payload, status and result."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT id, payload, status, result, error FROM units WHERE run_id = ? ORDER BY id",
+                (run_id,),
+            ).fetchall()
+            return [
+                {
+                    "id": unit_id,
+                    "payload": json.loads(payload),
+                    "status": status,
+                    "result": json.loads(result) if result else None,
+                    "error": error,
+                }
+                for unit_id, payload, status, result, error in rows
+            ]
+        finally:
+            conn.close()
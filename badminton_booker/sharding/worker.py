@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Worker loop pulling scan units from the shared work queue."""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+from badminton_booker.booking.courts import check_available_courts
+from badminton_booker.config.settings import get_settings
+from badminton_booker.metrics.event_log import configure_logging_from_settings, log_event
+from badminton_booker.sharding.work_queue import WorkQueue
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    """Identify a worker by host name and process ID."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+async def keep_leased(queue, unit_id: int, worker_id: str, lease_seconds: float) -> None:
+    """Renew a unit's lease every third of its duration until cancelled or the lease is lost."""
+    while True:
+        await asyncio.sleep(lease_seconds / 3)
+        if not await asyncio.to_thread(queue.renew, unit_id, worker_id, lease_seconds):
+            log_event(logger, 'unit_lease_lost',
+                      f"Worker {worker_id}: lost the lease on unit {unit_id} while scanning it", logging.WARNING,
+                      workerId=worker_id, unitId=unit_id)
+            return
+
+
+async def run_worker(queue, args, lease_seconds: float, idle_exit_seconds: float, poll_interval: float = 1.0) -> int:
+    """Lease units and scan them with the existing scraping path until the queue stays idle.
+
+    The lease is renewed while a unit is scanned, so a scan longer than
+    ``lease_seconds`` is not handed to a second worker.
+
+    Returns:
+        int: Number of units completed by this worker.
+    """
+    worker_id = default_worker_id()
+    completed = 0
+    idle_for = 0.0
+
+    while idle_for < idle_exit_seconds:
+        leased = queue.lease(worker_id, lease_seconds)
+        if leased is None:
+            await asyncio.sleep(poll_interval)
+            idle_for += poll_interval
+            continue
+
+        idle_for = 0.0
+        unit_id, run_id, payload = leased
+        log_event(logger, 'unit_started', f"Worker {worker_id}: scanning unit {unit_id} of run {run_id}: {payload}",
+                  workerId=worker_id, unitId=unit_id, shardRunId=run_id, payload=payload)
+        heartbeat = asyncio.create_task(keep_leased(queue, unit_id, worker_id, lease_seconds))
+        try:
+            result = await check_available_courts(
+                args,
+                url=payload["target"],
+                neighborhoods=payload["neighborhoods"],
+                dates=[payload["date"]],
+            )
+            heartbeat.cancel()
+            if result is None:
+                raise RuntimeError("Scan returned no result")
+            if queue.complete(unit_id, worker_id, result):
+                completed += 1
+            else:
+                log_event(logger, 'unit_lease_expired',
+                          f"Worker {worker_id}: lease on unit {unit_id} expired before completion, result discarded",
+                          logging.WARNING, workerId=worker_id, unitId=unit_id, shardRunId=run_id)
+        except Exception as e:
+            log_event(logger, 'unit_failed', f"Worker {worker_id}: unit {unit_id} failed: {e}", logging.ERROR,
+                      workerId=worker_id, unitId=unit_id, shardRunId=run_id, error=str(e))
+            queue.fail(unit_id, worker_id, str(e))
+        finally:
+            heartbeat.cancel()
+
+    return completed
+
+
+def _worker_process(queue_path, args, lease_seconds, idle_exit_seconds):
+    """Entry point of a local worker process."""
+    # A forked worker inherits the queue handler but not the thread draining it,
+    # and writes its own file so it never rotates the coordinator's
+    configure_logging_from_settings(get_settings(), f'worker-{os.getpid()}')
+    asyncio.run(run_worker(WorkQueue(queue_path), args, lease_seconds, idle_exit_seconds))
+
+
+def spawn_local_workers(count: int, queue_path, args, lease_seconds: float, idle_exit_seconds: float):
+    """Start worker processes on this host that exit once the queue is idle."""
+    processes = []
+    for _ in range(count):
+        process = multiprocessing.Process(
+            target=_worker_process,
+            args=(queue_path, args, lease_seconds, idle_exit_seconds),
+            daemon=True,
+        )
+        process.start()
+        processes.append(process)
+    return processes
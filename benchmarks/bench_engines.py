@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Compare browser engines on the same replayed search: wall time, peak RSS and CPU seconds.
+
+A search is recorded once against the live site into a HAR file, then replayed
+offline in a fresh process per engine and run so the measurements include the
+whole browser process tree.
+
+Usage:
+    python benchmarks/bench_engines.py --record data/search.har
+    python benchmarks/bench_engines.py --har data/search.har --engines chromium,firefox,webkit --runs 3
+    python benchmarks/bench_engines.py --har data/search.har --low-memory --shared-process
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from playwright.async_api import async_playwright
+from badminton_booker.booking.browser import ENGINES, LaunchProfile, parse_viewport
+from badminton_booker.booking.courts import (
+    generate_selected_date,
+    get_neighborhoods,
+    launch_browser,
+    open_filtered_search,
+    read_search_results,
+)
+
+
+def metadata_path(har_path):
+    """Sidecar file describing the search recorded in a HAR file."""
+    return Path(str(har_path) + ".json")
+
+
+async def record(har_path):
+    """Run one live search with Chromium and record its traffic."""
+    url = os.getenv("BOOKING_URL", "")
+    if not url:
+        sys.exit("Please set the BOOKING_URL environment variable.")
+    neighborhoods = get_neighborhoods()
+    dates = generate_selected_date()
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        profile = LaunchProfile()
+        context = await browser.new_context(**profile.context_options(), record_har_path=str(har_path))
+        page = await context.new_page()
+        await open_filtered_search(page, url, neighborhoods, dates)
+        reservations = await read_search_results(page)
+        # Closing the context flushes the HAR file
+        await context.close()
+        await browser.close()
+
+    with open(metadata_path(har_path), "w") as f:
+        json.dump({"url": url, "neighborhoods": neighborhoods, "dates": dates, "reservations": len(reservations)}, f)
+    print(f"Recorded a search returning {len(reservations)} reservations to {har_path}")
+
+
+async def replay(har_path, profile):
+    """Replay the recorded search offline with one launch profile and return the reservation count."""
+    with open(metadata_path(har_path)) as f:
+        search = json.load(f)
+
+    async with async_playwright() as p:
+        browser, page = await launch_browser(p, True, profile=profile)
+        try:
+            await page.context.route_from_har(str(har_path), not_found="abort")
+            await open_filtered_search(page, search["url"], search["neighborhoods"], search["dates"])
+            reservations = await read_search_results(page)
+        finally:
+            await browser.close()
+    return len(reservations)
+
+
+def process_tree_rss(pid):
+    """Sum the resident memory in bytes of a process and all its descendants."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces, the parent PID follows it
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        pending += children.get(current, [])
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
+
+
+def measure(command, sample_interval=0.05):
+    """Run a command and return its output, wall seconds, peak tree RSS bytes and CPU seconds."""
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+
+    peak = 0
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, process_tree_rss(process.pid))
+            done.wait(sample_interval)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    output, _ = process.communicate()
+    wall = time.perf_counter() - started
+    done.set()
+    sampler.join()
+
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    if process.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} exited with {process.returncode}")
+    return output, wall, peak, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--record", metavar="HAR", help="Record a live search to this HAR file and exit")
+    parser.add_argument("--har", help="HAR file of the search to replay")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="Comma separated engines to compare")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per engine")
+    parser.add_argument("--viewport", default="", help="Viewport as WIDTHxHEIGHT")
+    parser.add_argument("--low-memory", action="store_true", help="Apply the low-memory launch flags")
+    parser.add_argument("--shared-process", action="store_true", help="Run Chromium in a single process")
+    parser.add_argument("--child", choices=ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(record(args.record))
+        return
+    if not args.har:
+        parser.error("--har is required unless recording")
+
+    if args.child:
+        profile = LaunchProfile(args.child, 0, parse_viewport(args.viewport), args.low_memory, args.shared_process)
+        print(json.dumps({"reservations": asyncio.run(replay(args.har, profile))}))
+        return
+
+    flags = ["--viewport", args.viewport] if args.viewport else []
+    flags += ["--low-memory"] if args.low_memory else []
+    flags += ["--shared-process"] if args.shared_process else []
+
+    print(f"{'engine':<10} {'wall s':>8} {'peak RSS MB':>12} {'CPU s':>8} {'slots':>6}")
+    for engine in [e.strip() for e in args.engines.split(",") if e.strip()]:
+        walls, peaks, cpus = [], [], []
+        reservations = None
+        try:
+            for _ in range(args.runs):
+                command = [sys.executable, __file__, "--har", args.har, "--child", engine] + flags
+                output, wall, peak, cpu = measure(command)
+                reservations = json.loads(output.strip().splitlines()[-1])["reservations"]
+                walls.append(wall)
+                peaks.append(peak)
+                cpus.append(cpu)
+        except (RuntimeError, ValueError, IndexError) as e:
+            print(f"{engine:<10} failed: {e}")
+            continue
+        # Median wall and CPU time, worst case memory
+        print(f"{engine:<10} {statistics.median(walls):>8.2f} {max(peaks) / 2**20:>12.0f} "
+              f"{statistics.median(cpus):>8.2f} {reservations:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Benchmark message rendering and delivery throughput against a local mock Telegram API.
+
+Usage:
+    python benchmarks/bench_notification.py --snapshot docs/badminton_results.json
+    python benchmarks/bench_notification.py --reservations 40 --chats 25 --iterations 200
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from badminton_booker.datastore.snapshot import iter_snapshot_results
+from badminton_booker.notification import telegram
+
+
+class MockTelegramHandler(BaseHTTPRequestHandler):
+    """Accept every Bot API call with a minimal successful response."""
+
+    message_id = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        with MockTelegramHandler.lock:
+            MockTelegramHandler.message_id += 1
+            message_id = MockTelegramHandler.message_id
+        body = json.dumps({"ok": True, "result": {"message_id": message_id}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Silence per-request logging."""
+
+
+def start_mock_telegram():
+    """Start the mock Bot API on a free local port and return the server."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockTelegramHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def synthetic_results(count):
+    """Build result data with ``count`` bookable reservations."""
+    start = datetime.now().astimezone().replace(hour=18, minute=0, second=0, microsecond=0)
+    return {
+        "reservations": [
+            {
+                "name": f"Centre sportif {i}",
+                "startTime": start + timedelta(days=i % 4),
+                "endTime": start + timedelta(days=i % 4, hours=1),
+                "price": "15.00",
+                "canReserve": True,
+            }
+            for i in range(count)
+        ],
+        "url": "https://example.com/booking",
+    }
+
+
+def percentile(values, pct):
+    """Return the ``pct`` percentile of a list of values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snapshot", help="Saved results (JSON or NDJSON) to render instead of synthetic data")
+    parser.add_argument("--reservations", type=int, default=20, help="Bookable reservations per synthetic result")
+    parser.add_argument("--chats", type=int, default=10, help="Number of mock chat IDs to deliver to")
+    parser.add_argument("--iterations", type=int, default=100, help="Number of results rendered and delivered")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        results = list(iter_snapshot_results(args.snapshot))
+    else:
+        results = [synthetic_results(args.reservations)]
+
+    # Rendering
+    messages = []
+    started = time.perf_counter()
+    for i in range(args.iterations):
+        result = results[i % len(results)]
+        bookable = [res for res in result.get("reservations", []) if res.get("canReserve", False)]
+        messages.append(telegram.format_reservations_message(bookable, result.get("url", "")))
+    render_seconds = time.perf_counter() - started
+
+    # Delivery
+    server = start_mock_telegram()
+    telegram.api_url = f"http://127.0.0.1:{server.server_address[1]}"
+    telegram.token = "benchmark"
+    telegram.chat_ids = [str(1000 + i) for i in range(args.chats)]
+
+    send_latencies = []
+    started = time.perf_counter()
+    for message in messages:
+        sent = time.perf_counter()
+        telegram.send_notification(message)
+        send_latencies.append((time.perf_counter() - sent) * 1000)
+    delivery_seconds = time.perf_counter() - started
+    server.shutdown()
+
+    api_calls = len(messages) * args.chats
+    print(f"Rendered {len(messages)} messages in {render_seconds * 1000:.1f} ms "
+          f"({len(messages) / render_seconds:.0f} messages/s, "
+          f"avg {statistics.mean(len(m) for m in messages):.0f} chars)")
+    print(f"Delivered {len(messages)} messages to {args.chats} chats in {delivery_seconds:.2f} s "
+          f"({api_calls / delivery_seconds:.0f} API calls/s)")
+    print(f"Per message fan-out latency: p50 {percentile(send_latencies, 50):.1f} ms, "
+          f"p95 {percentile(send_latencies, 95):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
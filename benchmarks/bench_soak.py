@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""Soak the production scan -> diff -> notify cycle of a resident booker and fail when its resources drift.
+
+With ``--scan browser`` (the default) every cycle runs ``scan_and_notify``
+from main.py, the same code as a scheduled run: the browser walks the search
+steps of a local stand-in of the booking site (booking link, cookie banner,
+sport, boroughs, time window and calendar dates) through the checkpointed navigator, the crawl governor and
+the flight recorder, reads the results, updates the facility index, appends
+the result to a history file and notifies a local mock Bot API through the
+configured notification sinks. The stand-in's availability changes over time
+so the live Telegram messages keep being edited. Everything runs in one
+long-lived process and event loop.
+
+``--scan static`` needs no browser and is the mode CI can run: every cycle
+fetches the same panels as JSON, parses them with ``parse_panel`` and runs the
+rest of the cycle (history file, notification sinks, queued event log) as in
+production.
+
+Per cycle it samples the process tree RSS, open file descriptors, pending
+asyncio tasks, browser processes left behind, the worst event-loop lag and
+the cycle latency. The first and last windows after warm-up are then
+compared, and the run exits with status 1 when any of them drifted past its
+threshold.
+
+Every other setting (``BROWSER_ENGINE``, ``HARVEST_MODE``, ``STAGE_POLICIES``,
+...) is read from the environment as usual; only the state files are moved to
+a temporary directory.
+
+Usage:
+    python benchmarks/bench_soak.py --cycles 5000
+    python benchmarks/bench_soak.py --scan static --cycles 5000
+    python benchmarks/bench_soak.py --stream --cycles 200 --report data/soak.json
+    python benchmarks/bench_soak.py --cycles 300 --plain-telegram --max-rss-growth-mb 20
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_engines import process_tree_rss
+from bench_notification import percentile, start_mock_telegram
+from badminton_booker.booking.courts import parse_panel
+from badminton_booker.config.settings import get_settings
+from badminton_booker.datastore.snapshot import append_snapshot
+from badminton_booker.metrics.event_log import configure_logging, flush_logging
+from badminton_booker.notification import telegram
+from badminton_booker.notification.sinks import build_sinks, notify_sinks
+from main import scan_and_notify
+
+FRENCH_MONTHS = ['janvier', 'février', 'mars', 'avril', 'mai', 'juin', 'juillet', 'août', 'septembre', 'octobre',
+                 'novembre', 'décembre']
+FRENCH_DAYS = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
+
+BOROUGHS = ['Ahuntsic-Cartierville', 'Le Plateau-Mont-Royal', 'Rosemont-La Petite-Patrie', 'Verdun',
+            'Villeray-Saint-Michel-Parc-Extension']
+
+# Landing page linking to the search, as on the real site
+LANDING_PAGE = """<!doctype html><html><body>
+<a href="/search">Reserve a space</a>
+</body></html>"""
+
+# Search page with every control open_filtered_search drives; results are fetched on confirmation
+SEARCH_PAGE = """<!doctype html><html><body>
+<div id="cookies">Témoins <button type="button" onclick="this.parentElement.remove()">Accepter tout</button></div>
+<a href="#" onclick="document.getElementById('filters').hidden = false; return false;">Badminton</a>
+<div id="filters" hidden>
+  <button type="button" onclick="document.getElementById('boroughs').hidden = false">Arrondissement Tous</button>
+  <div id="boroughs" hidden>__BOROUGHS__
+    <button type="button" onclick="confirmBoroughs()">Confirmer</button>
+  </div>
+  <div id="u6510_edFacilityReservationSearchStartTime"><input aria-label="HH"><input aria-label="MM"></div>
+  <div id="u6510_edFacilityReservationSearchEndTime"><input aria-label="HH"><input aria-label="MM"></div>
+  <button type="button" id="u6510_btnFacilityReservationSearchReserveDateCalendar"
+          onclick="const c = document.getElementById('calendar'); c.hidden = !c.hidden">Calendrier</button>
+  <div id="calendar" hidden>__DATES__</div>
+</div>
+<div id="results"></div>
+<script>
+  async function confirmBoroughs() {
+    document.getElementById('boroughs').hidden = true;
+    const response = await fetch('/panels');
+    document.getElementById('results').innerHTML = await response.text();
+  }
+  function pickDate(button) {
+    // Like the real calendar, a click toggles the date and closes the calendar
+    button.classList.toggle('active');
+    document.getElementById('calendar').hidden = true;
+  }
+</script>
+</body></html>"""
+
+
+def stand_in_panels(request_number, courts, churn_every):
+    """Raw panels of the stand-in site; a quarter of them are bookable and the set shifts over time."""
+    day = datetime.now() + timedelta(days=1)
+    date_text = f"{day.day} {FRENCH_MONTHS[day.month - 1]} {day.year}"
+    shift = request_number // churn_every
+    return [
+        {
+            "name": f"Centre sportif {court}",
+            "weekday": FRENCH_DAYS[day.weekday()],
+            "date": date_text,
+            "startTime": f"{18 + court % 4}:00",
+            "endTime": f"{19 + court % 4}:00",
+            "price": "15.00",
+            "canReserve": (court + shift) % 4 == 0,
+            "buttonId": f"reserve-{court}",
+        }
+        for court in range(courts)
+    ]
+
+
+def render_panels(panels):
+    """Render panels with the markup the scraper reads on the real results page."""
+    rendered = []
+    for panel in panels:
+        disabled = "" if panel["canReserve"] else " disabled"
+        rendered.append(
+            '<div class="panel panel-default panel-facilityReservation">'
+            f'<div class="panel-heading"><span class="fake-link">{panel["name"]}</span></div>'
+            '<div class="panel-body">'
+            f'<span class="when">{panel["weekday"]}, {panel["date"]}, {panel["startTime"]}</span>'
+            f'<span class="when">{panel["endTime"]}</span>'
+            f'<span class="ng-binding">${panel["price"]}</span>'
+            f'<button id="{panel["buttonId"]}" ng-click="vm.onReserve()" class="btn btn-primary{disabled}">'
+            "Réserver</button></div></div>"
+        )
+    return "".join(rendered)
+
+
+def render_search_page():
+    """Render the search page with the borough checkboxes and the next two weeks in the calendar."""
+    boroughs = "".join(f'<label><input type="checkbox"> {name}</label>' for name in BOROUGHS)
+    today = datetime.now()
+    dates = "".join(
+        f'<button type="button" class="btn btn-default" onclick="pickDate(this)">'
+        f'<span>{(today + timedelta(days=i)).strftime("%d")}</span></button>'
+        for i in range(14)
+    )
+    return SEARCH_PAGE.replace("__BOROUGHS__", boroughs).replace("__DATES__", dates)
+
+
+class StandInSiteHandler(BaseHTTPRequestHandler):
+    """Serve the landing page, the search page and the results fragment of the stand-in site."""
+
+    courts = 40
+    churn_every = 5
+    requests_served = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        if self.path.startswith("/panels"):
+            # Availability only moves between searches, not between pages of one
+            with StandInSiteHandler.lock:
+                StandInSiteHandler.requests_served += 1
+                request_number = StandInSiteHandler.requests_served
+            panels = stand_in_panels(request_number, self.courts, self.churn_every)
+            if self.path.startswith("/panels.json"):
+                body, content_type = json.dumps(panels), "application/json"
+            else:
+                body, content_type = render_panels(panels), "text/html; charset=utf-8"
+        elif self.path.startswith("/search"):
+            body, content_type = render_search_page(), "text/html; charset=utf-8"
+        else:
+            body, content_type = LANDING_PAGE, "text/html; charset=utf-8"
+        body = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Silence per-request logging."""
+
+
+def start_stand_in_site(courts, churn_every):
+    """Start the stand-in site on a free local port and return the server."""
+    StandInSiteHandler.courts = courts
+    StandInSiteHandler.churn_every = churn_every
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInSiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def open_fds():
+    """Count the file descriptors open in this process."""
+    return len(os.listdir("/proc/self/fd"))
+
+
+def child_processes(pid):
+    """Count the live descendants of a process, such as browsers and drivers that were not shut down."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        # Reaped processes are gone, zombies still count as leaked
+        children.setdefault(int(fields[1]), []).append(int(entry))
+
+    count = 0
+    pending = list(children.get(pid, []))
+    while pending:
+        current = pending.pop()
+        count += 1
+        pending += children.get(current, [])
+    return count
+
+
+async def watch_loop_lag(lags, interval=0.02):
+    """Record how late every short sleep wakes up, the delay any other callback had to wait."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - started - interval))
+
+
+def cycle_args(stream):
+    """Command line arguments of a plain scheduled run, optionally in stream mode."""
+    return argparse.Namespace(
+        headless=True,
+        slow=None,
+        test=False,
+        auto_reserve=False,
+        mute=False,
+        sniper=False,
+        coordinator=False,
+        stream=stream,
+        workers=0,
+    )
+
+
+async def static_scan_and_notify(settings, site_url):
+    """Run one cycle without a browser: read the panels as JSON, then record and notify them as production does."""
+    response = await asyncio.to_thread(requests.get, f"{site_url}panels.json", timeout=10)
+    response.raise_for_status()
+    result = {
+        "reservations": [parse_panel(panel) for panel in response.json()],
+        "url": site_url,
+        "timestamp": datetime.now().isoformat(),
+    }
+    await asyncio.to_thread(append_snapshot, settings.snapshot_history_path, result)
+    await notify_sinks(result, build_sinks(settings.notification_sinks, settings.notification_sink_rates))
+    return result
+
+
+async def soak(settings, args, cycles, static_url=None):
+    """Run the cycles and return one sample per cycle.
+
+    Args:
+        settings: Settings with the state files moved to the work directory.
+        args: Command line arguments of the production cycle.
+        cycles: Number of cycles to run.
+        static_url: Stand-in site to read without a browser, or None to run ``scan_and_notify``.
+    """
+    lags = []
+    watcher = asyncio.create_task(watch_loop_lag(lags))
+    samples = []
+    pid = os.getpid()
+    try:
+        for cycle in range(cycles):
+            lag_mark = len(lags)
+            started = time.perf_counter()
+            if static_url:
+                result = await static_scan_and_notify(settings, static_url)
+            else:
+                result = await scan_and_notify(args, settings, None, settings.shard_queue_path)
+            latency = time.perf_counter() - started
+            reservations = (result or {}).get("reservations", [])
+
+            samples.append({
+                "cycle": cycle,
+                "latencyMs": latency * 1000,
+                "loopLagMs": max(lags[lag_mark:], default=0.0) * 1000,
+                "rssMb": process_tree_rss(pid) / 2**20,
+                "fds": open_fds(),
+                # The lag watcher is the only task expected besides this one
+                "tasks": len(asyncio.all_tasks()) - 2,
+                "processes": child_processes(pid),
+                "slots": len(reservations),
+                "bookable": sum(1 for res in reservations if res.get("canReserve")),
+            })
+            # Keep the watcher's history bounded as well
+            del lags[:lag_mark]
+            if (cycle + 1) % max(1, cycles // 10) == 0:
+                last = samples[-1]
+                print(f"cycle {cycle + 1:>6}: {last['latencyMs']:7.1f} ms, {last['slots']} slots, "
+                      f"RSS {last['rssMb']:6.1f} MB, {last['fds']} fds, loop lag {last['loopLagMs']:.1f} ms")
+    finally:
+        watcher.cancel()
+    return samples
+
+
+def check_drift(samples, warmup, limits):
+    """Compare the first and last windows after warm-up.
+
+    Returns:
+        list: ``(metric, first, last, limit, failed)`` rows.
+    """
+    steady = samples[warmup:]
+    window = max(1, len(steady) // 10)
+    first, last = steady[:window], steady[-window:]
+
+    def median(rows, key):
+        return statistics.median(row[key] for row in rows)
+
+    rss_growth = median(last, "rssMb") - median(first, "rssMb")
+    fd_growth = max(row["fds"] for row in last) - max(row["fds"] for row in first)
+    task_growth = max(row["tasks"] for row in last) - max(row["tasks"] for row in first)
+    processes = max(row["processes"] for row in steady)
+    latency_ratio = median(last, "latencyMs") / max(median(first, "latencyMs"), 1e-6)
+    lag_p99 = percentile([row["loopLagMs"] for row in steady], 99)
+
+    def lag(rows):
+        return percentile([row["loopLagMs"] for row in rows], 99)
+
+    return [
+        ("RSS growth MB", median(first, "rssMb"), median(last, "rssMb"), limits.max_rss_growth_mb,
+         rss_growth > limits.max_rss_growth_mb),
+        ("open fds growth", max(row["fds"] for row in first), max(row["fds"] for row in last), limits.max_fd_growth,
+         fd_growth > limits.max_fd_growth),
+        ("pending tasks growth", max(row["tasks"] for row in first), max(row["tasks"] for row in last),
+         limits.max_task_growth, task_growth > limits.max_task_growth),
+        ("browser processes", max(row["processes"] for row in first), processes, 0, processes > 0),
+        ("latency drift x", median(first, "latencyMs"), median(last, "latencyMs"), limits.max_latency_drift,
+         latency_ratio > limits.max_latency_drift),
+        ("loop lag p99 ms", lag(first), lag(last), limits.max_loop_lag_ms, lag_p99 > limits.max_loop_lag_ms),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=5000, help="Scan, diff and notify cycles to run")
+    parser.add_argument("--scan", choices=["browser", "static"], default="browser",
+                        help="Drive the production browser scan, or read the panels as JSON without a browser")
+    parser.add_argument("--warmup", type=int, default=None, help="Cycles ignored before comparing, 10%% by default")
+    parser.add_argument("--stream", action="store_true", help="Run the cycles in --stream mode")
+    parser.add_argument("--courts", type=int, default=40, help="Panels on the stand-in results page")
+    parser.add_argument("--churn-every", type=int, default=5, help="Searches between availability changes")
+    parser.add_argument("--chats", type=int, default=10, help="Mock chat IDs to notify")
+    parser.add_argument("--plain-telegram", action="store_true",
+                        help="Also send a full message to every chat every cycle")
+    parser.add_argument("--crawl-rate", type=float, default=50,
+                        help="Governor requests per second for the stand-in, high enough not to pace the soak")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=30)
+    parser.add_argument("--max-fd-growth", type=int, default=5)
+    parser.add_argument("--max-task-growth", type=int, default=2)
+    parser.add_argument("--max-latency-drift", type=float, default=1.5, help="Allowed last/first median latency")
+    parser.add_argument("--max-loop-lag-ms", type=float, default=100)
+    parser.add_argument("--report", help="Write every cycle sample to this JSON file")
+    args = parser.parse_args()
+
+    site = start_stand_in_site(args.courts, args.churn_every)
+    site_url = f"http://127.0.0.1:{site.server_address[1]}/"
+    bot = start_mock_telegram()
+    telegram.api_url = f"http://127.0.0.1:{bot.server_address[1]}"
+    telegram.token = "soak"
+    telegram.chat_ids = [str(1000 + i) for i in range(args.chats)]
+    # check_available_courts reads the search from the environment
+    os.environ["BOOKING_URL"] = site_url
+    os.environ["NEIGHBORHOODS"] = ",".join(BOROUGHS[:2])
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_dir = Path(work_dir)
+        settings = get_settings()
+        settings.booking_url = site_url
+        settings.notification_sinks = f"telegram-live:{work_dir / 'telegram_live.json'}"
+        if args.plain_telegram:
+            settings.notification_sinks += ",telegram"
+        settings.notification_sink_rates = ""
+        settings.snapshot_history_path = str(work_dir / "history.ndjson")
+        settings.facility_index_path = work_dir / "facilities.json"
+        settings.crawl_state_path = work_dir / "crawl_governor.json"
+        settings.crawl_rates = ""
+        settings.crawl_default_rate = args.crawl_rate
+        settings.crawl_default_burst = max(settings.crawl_default_burst, int(args.crawl_rate))
+        settings.flight_recorder_dir = work_dir / "flight_recorder"
+        settings.shard_queue_path = work_dir / "scan_queue.sqlite"
+        # The events go through the queued event log as in production, with the console kept for progress
+        configure_logging(work_dir / "events.jsonl", level=settings.log_level, stream=io.StringIO())
+
+        started = time.perf_counter()
+        try:
+            static_url = site_url if args.scan == "static" else None
+            samples = asyncio.run(soak(settings, cycle_args(args.stream), args.cycles, static_url))
+        finally:
+            flush_logging()
+        elapsed = time.perf_counter() - started
+        recordings = len(list(settings.flight_recorder_dir.glob("*"))) if settings.flight_recorder_dir.exists() else 0
+    site.shutdown()
+    bot.shutdown()
+
+    latencies = [row["latencyMs"] for row in samples]
+    print(f"\n{len(samples)} cycles in {elapsed:.1f} s, latency p50 {percentile(latencies, 50):.1f} ms, "
+          f"p95 {percentile(latencies, 95):.1f} ms, p99 {percentile(latencies, 99):.1f} ms")
+    if recordings:
+        # Partial or slow cycles dump a recording, the stand-in should never cause one
+        print(f"{recordings} flight recordings were written, the cycles did not all complete")
+    warmup = args.warmup if args.warmup is not None else len(samples) // 10
+    rows = check_drift(samples, warmup, args)
+    print(f"{'metric':<22} {'first':>10} {'last':>10} {'limit':>8}")
+    for metric, first, last, limit, failed in rows:
+        print(f"{metric:<22} {first:>10.1f} {last:>10.1f} {limit:>8} {'FAIL' if failed else 'ok'}")
+
+    if args.report:
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.report, "w") as f:
+            json.dump({"samples": samples, "drift": [list(row) for row in rows]}, f, indent=2)
+
+    if recordings or any(row[-1] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
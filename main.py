@@ -4,11 +4,182 @@ Badminton Booker - Entry point for the badminton court booking application.
 """
 
 import asyncio
+import logging
+import os
 import sys
+import time
 from badminton_booker.cli.commands import parse_args
-from badminton_booker.booking.courts import check_available_courts
-from badminton_booker.notification.telegram import notify_about_reservations
+from badminton_booker.booking.courts import check_available_courts, generate_selected_date
+from badminton_booker.booking.governor import parse_crawl_rates
+from badminton_booker.booking.horizon import parse_horizon_tiers, run_horizon_scan
+from badminton_booker.booking.panel_filter import parse_panel_filter
+from badminton_booker.booking.reserve import parse_reserve_rules
+from badminton_booker.booking.sniper import run_sniper
+from badminton_booker.booking.watchlists import load_watchlists, plan_searches, split_results
+from badminton_booker.notification.pipeline import run_notification_pipeline
+from badminton_booker.datastore.snapshot import append_snapshot, iter_snapshot_results
+from badminton_booker.notification.sinks import EventBus, build_event, build_sinks, notify_sinks
+from badminton_booker.notification.telegram import format_reservations_message
 from badminton_booker.config.settings import get_settings
+from badminton_booker.metrics.event_log import configure_logging_from_settings, log_event, log_phase
+from badminton_booker.metrics.registry import start_metrics_server, write_textfile
+from badminton_booker.service.query_service import serve
+from badminton_booker.sharding.coordinator import plan_units, run_coordinator
+from badminton_booker.sharding.single_flight import cycle_key, single_flight_from_settings
+from badminton_booker.sharding.work_queue import WorkQueue
+from badminton_booker.sharding.worker import run_worker, spawn_local_workers
+
+logger = logging.getLogger(__name__)
+
+
+async def run_watchlists(args, path):
+    """Run the merged searches of every watchlist and notify each one about its own matches."""
+    watchlists = load_watchlists(path)
+    searches = plan_searches(watchlists)
+    planned = sum(len(search["watchlists"]) for search in searches)
+    log_event(
+        logger,
+        "watchlists_planned",
+        f"Planned {len(searches)} searches for {len(watchlists)} watchlists "
+        f"({planned - len(searches)} searches saved by merging, "
+        f"{len(watchlists) - planned} watchlists without dates in the horizon)",
+        searches=len(searches),
+        watchlists=len(watchlists),
+        saved=planned - len(searches),
+        skipped=len(watchlists) - planned,
+    )
+
+    search_results = []
+    urls = {}
+    for search in searches:
+        result = await check_available_courts(
+            args,
+            neighborhoods=search["neighborhoods"],
+            dates=search["dates"],
+            time_window=(search["start"], search["end"]),
+        )
+        if result:
+            # Each watchlist links to the results page of a search that covered it
+            for name in search["watchlists"]:
+                urls.setdefault(name, result.get("url", ""))
+            search_results.append((search, result.get("reservations", [])))
+
+    split = split_results(search_results, watchlists)
+    settings = get_settings()
+    bus = EventBus(build_sinks(settings.notification_sinks, settings.notification_sink_rates))
+    for watchlist in watchlists:
+        reservations = split[watchlist["name"]]
+        log_event(
+            logger,
+            "watchlist_matched",
+            f"Watchlist {watchlist['name']}: {len(reservations)} matching reservations",
+            watchlist=watchlist["name"],
+            reservations=len(reservations),
+        )
+        event = build_event(
+            {"reservations": reservations, "url": urls.get(watchlist["name"], "")},
+            title=f"{watchlist['name']}: Badminton Reservations Available:",
+            recipients=watchlist.get("chat_ids"),
+            include_empty=True,
+        )
+        if event and not args.mute:
+            bus.publish(event)
+    await bus.close()
+
+
+async def scan_and_notify(args, settings, horizon_tiers, queue_path):
+    """Scan for available courts with the selected mode and notify about the results.
+
+    Returns:
+        dict: Result data of the scan, or None when nothing was found.
+    """
+    # Check for available courts
+    if args.sniper:
+        results = await run_sniper(args)
+    elif args.coordinator:
+        units = plan_units(
+            settings.shard_targets,
+            settings.neighborhoods,
+            generate_selected_date(),
+            settings.shard_group_size,
+        )
+        workers = spawn_local_workers(
+            args.workers,
+            queue_path,
+            args,
+            settings.shard_lease_seconds,
+            settings.shard_idle_exit_seconds,
+        )
+        results = await run_coordinator(WorkQueue(queue_path), units, settings.shard_run_timeout_seconds)
+        for worker in workers:
+            worker.join()
+    elif args.stream:
+        started = time.perf_counter()
+        pipeline_stats = {}
+
+        async def stream_to_notifications(panels, url):
+            reservations, stats = await run_notification_pipeline(
+                panels,
+                url,
+                started,
+                mute=args.mute,
+                sinks=build_sinks(settings.notification_sinks, settings.notification_sink_rates),
+            )
+            pipeline_stats.update(stats)
+            return reservations
+
+        results = await check_available_courts(args, on_panels=stream_to_notifications)
+        if pipeline_stats.get("firstAlertMs") is not None:
+            log_event(
+                logger,
+                "stream_finished",
+                f"Time to first alert: {pipeline_stats['firstAlertMs']} ms, {pipeline_stats['alertsSent']} alerts sent",
+                firstAlertMs=pipeline_stats["firstAlertMs"],
+                alertsSent=pipeline_stats["alertsSent"],
+            )
+        if results and settings.snapshot_history_path:
+            append_snapshot(settings.snapshot_history_path, results)
+        # Alerts were already sent while the panels were being read
+        return results
+    elif horizon_tiers:
+        results = await run_horizon_scan(args, horizon_tiers, settings.horizon_state_path)
+    else:
+        results = await check_available_courts(args)
+
+    if results and settings.snapshot_history_path:
+        append_snapshot(settings.snapshot_history_path, results)
+
+    # if results is empty, exit
+    if not results:
+        log_event(logger, "no_reservations", "No available reservations found.")
+        return results
+
+    # Notify about results if any were found and notifications are not muted
+    if results and not args.mute:
+        log_event(logger, "notification_sending", "Sending notification...")
+        with log_phase("notify"):
+            await notify_sinks(results, build_sinks(settings.notification_sinks, settings.notification_sink_rates))
+    elif results and args.mute:
+        log_event(logger, "notification_muted", "Notifications are muted. Skipping notification.")
+
+    return results
+
+
+async def run_single_flight(settings, key, cycle):
+    """Run a scan and notify cycle unless another instance already is, then return its results."""
+    guard = single_flight_from_settings(settings, key)
+    if guard is None:
+        return await cycle()
+    role, results = await guard.run(cycle)
+    if role == "follower":
+        found = len(results.get("reservations", [])) if results else 0
+        log_event(
+            logger,
+            "cycle_reused",
+            f"Another instance already scanned and notified: {found} reservations.",
+            reservations=found,
+        )
+    return results
 
 
 async def main():
@@ -28,21 +199,105 @@ async def main():
     # Parse command line arguments
     args = parse_args()
 
-    # Check for available courts
-    results = await check_available_courts(args)
+    # Events from the scan and notifications go to the console and the JSONL event log,
+    # one file per worker since several may run on this host
+    configure_logging_from_settings(settings, f"worker-{os.getpid()}" if args.worker else None)
 
-    # if results is empty, exit
-    if not results:
-        print("No available reservations found.")
+    if args.auto_reserve and not settings.auto_reserve_rules:
+        print("Auto-reserve requested but AUTO_RESERVE_RULES is not set.")
+        sys.exit(1)
+
+    if args.auto_reserve:
+        try:
+            parse_reserve_rules(settings.auto_reserve_rules)
+        except ValueError as e:
+            print(f"Invalid AUTO_RESERVE_RULES: {e}")
+            sys.exit(1)
+
+    if args.sniper and not settings.sniper_release_time:
+        print("Sniper mode requested but SNIPER_RELEASE_TIME is not set.")
+        sys.exit(1)
+
+    try:
+        parse_crawl_rates(settings.crawl_rates)
+    except ValueError as e:
+        print(f"Invalid CRAWL_RATES: {e}")
+        sys.exit(1)
+
+    try:
+        parse_panel_filter(settings.panel_filter)
+    except ValueError as e:
+        print(f"Invalid PANEL_FILTER: {e}")
+        sys.exit(1)
+
+    try:
+        horizon_tiers = parse_horizon_tiers(settings.horizon_tiers)
+    except ValueError as e:
+        print(f"Invalid HORIZON_TIERS: {e}")
+        sys.exit(1)
+
+    if args.from_snapshot:
+        replayed = 0
+        sinks = build_sinks(settings.notification_sinks, settings.notification_sink_rates)
+        for snapshot in iter_snapshot_results(args.from_snapshot):
+            replayed += 1
+            if args.mute:
+                bookable = [res for res in snapshot.get("reservations", []) if res.get("canReserve", False)]
+                print(format_reservations_message(bookable, snapshot.get("url", "")))
+            else:
+                await notify_sinks(snapshot, sinks)
+        log_event(logger, "snapshot_replayed", f"Replayed {replayed} saved results.", replayed=replayed)
         return
 
-    # Notify about results if any were found and notifications are not muted
-    if results and not args.mute:
-        print("Sending notification...")
-        notify_about_reservations(results)
-    elif results and args.mute:
-        print("Notifications are muted. Skipping notification.")
+    # WATCHLISTS_PATH only stands in for a plain scan, an explicit mode flag always wins
+    other_mode = args.worker or args.serve or args.sniper or args.coordinator or args.stream
+    watchlists_path = args.watchlists or (None if other_mode else settings.watchlists_path)
+    if watchlists_path:
+        await run_single_flight(
+            settings,
+            cycle_key(settings.booking_url, [watchlists_path], "watchlists", args.mute),
+            lambda: run_watchlists(args, watchlists_path),
+        )
+        return
+
+    queue_path = args.queue or settings.shard_queue_path
+
+    if args.worker:
+        if settings.metrics_port:
+            start_metrics_server(settings.service_host, settings.metrics_port)
+        completed = await run_worker(
+            WorkQueue(queue_path),
+            args,
+            settings.shard_lease_seconds,
+            settings.shard_idle_exit_seconds,
+        )
+        log_event(
+            logger, "worker_finished", f"Worker finished after completing {completed} scan units.", completed=completed
+        )
+        return
+
+    if args.serve:
+        await asyncio.to_thread(
+            serve,
+            args,
+            settings.service_host,
+            args.port or settings.service_port,
+            settings.service_freshness_seconds,
+        )
+        return
+
+    mode = "sniper" if args.sniper else "coordinator" if args.coordinator else "stream" if args.stream else "scan"
+    await run_single_flight(
+        settings,
+        cycle_key(settings.booking_url, settings.neighborhoods, mode, args.mute),
+        lambda: scan_and_notify(args, settings, horizon_tiers, queue_path),
+    )
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    finally:
+        # One-shot runs leave their metrics for a node exporter textfile collector
+        if get_settings().metrics_textfile:
+            write_textfile(get_settings().metrics_textfile)
@@ -0,0 +1,39 @@
+"""Tests for the browser launch profile."""
+
+import unittest
+from types import SimpleNamespace
+
+from badminton_booker.booking.browser import LaunchProfile, parse_viewport, profile_from_settings
+
+
+class TestBrowser(unittest.TestCase):
+    """Test cases for building launch options from a profile."""
+
+    def test_profile_from_settings(self):
+        """Test settings select the engine and options, and -slow overrides the delay."""
+        settings = SimpleNamespace(browser_engine='firefox', browser_slow_mo=0, browser_viewport='1024x768',
+                                   browser_low_memory=True, browser_shared_process=False)
+
+        profile = profile_from_settings(settings, slow_mo=25)
+
+        self.assertEqual(profile.engine, 'firefox')
+        self.assertEqual(profile.launch_options(True)['slow_mo'], 25)
+        self.assertIn('firefox_user_prefs', profile.launch_options(True))
+        self.assertEqual(profile.context_options()['viewport'], {'width': 1024, 'height': 768})
+        self.assertEqual(profile_from_settings(settings).slow_mo, 0)
+
+    def test_chromium_flags(self):
+        """Test low-memory and shared-process flags only apply when enabled."""
+        self.assertEqual(LaunchProfile().launch_options(True), {'headless': True, 'slow_mo': 0})
+
+        args = LaunchProfile(low_memory=True, shared_process=True).launch_options(False)['args']
+
+        self.assertIn('--disable-dev-shm-usage', args)
+        self.assertIn('--single-process', args)
+        self.assertIsNone(parse_viewport(''))
+        with self.assertRaises(ValueError):
+            LaunchProfile('netscape')
+
+
+if __name__ == '__main__':
+    unittest.main()
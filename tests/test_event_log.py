@@ -0,0 +1,167 @@
+"""Tests for the structured JSONL event log."""
+
+import asyncio
+import io
+import json
+import logging
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from badminton_booker.metrics import event_log
+from badminton_booker.metrics.event_log import (
+    RUN_ID,
+    JsonLineFormatter,
+    SamplingFilter,
+    configure_logging,
+    configure_logging_from_settings,
+    current_phase,
+    flush_logging,
+    log_event,
+    log_phase,
+    process_log_path,
+)
+from badminton_booker.notification import telegram
+
+
+def make_record(level=logging.INFO, message='hello', **extra):
+    """Build a log record carrying the given extra attributes."""
+    record = logging.LogRecord('badminton_booker.test', level, __file__, 1, message, None, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestEventLog(unittest.TestCase):
+    """Test cases for the formatter, filters and queue-based configuration."""
+
+    def setUp(self):
+        self.root = logging.getLogger()
+        self.saved_handlers = list(self.root.handlers)
+        self.saved_level = self.root.level
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / 'logs' / 'events.jsonl'
+
+    def tearDown(self):
+        flush_logging()
+        for handler in list(self.root.handlers):
+            self.root.removeHandler(handler)
+        for handler in self.saved_handlers:
+            self.root.addHandler(handler)
+        self.root.setLevel(self.saved_level)
+        self.temp_dir.cleanup()
+
+    def read_events(self):
+        with open(self.path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_formatter_writes_fields_run_id_and_phase(self):
+        record = make_record(event='scan_finished', fields={'slots': 12, 'bookable': 3}, phase='extract',
+                             run_id='abc123')
+
+        event = json.loads(JsonLineFormatter().format(record))
+
+        self.assertEqual(event['event'], 'scan_finished')
+        self.assertEqual(event['runId'], 'abc123')
+        self.assertEqual(event['phase'], 'extract')
+        self.assertEqual(event['level'], 'info')
+        self.assertEqual((event['slots'], event['bookable']), (12, 3))
+        self.assertNotIn('sampleRate', event)
+
+    def test_phase_follows_awaited_coroutines(self):
+        async def inner():
+            return current_phase()
+
+        async def run():
+            with log_phase('navigate'):
+                inside = await inner()
+            return inside, current_phase()
+
+        self.assertEqual(asyncio.run(run()), ('navigate', 'main'))
+
+    def test_sampling_only_drops_debug_records(self):
+        sampler = SamplingFilter(0.0, random.Random(1))
+
+        self.assertTrue(sampler.filter(make_record(logging.INFO)))
+        self.assertFalse(sampler.filter(make_record(logging.DEBUG)))
+        self.assertEqual(sampler.dropped, 1)
+
+    def test_sampling_keeps_a_fraction_and_honours_overrides(self):
+        sampler = SamplingFilter(0.25, random.Random(7))
+
+        kept = sum(sampler.filter(make_record(logging.DEBUG)) for _ in range(1000))
+        self.assertGreater(kept, 180)
+        self.assertLess(kept, 320)
+        # An event asking for every occurrence is always kept
+        self.assertTrue(sampler.filter(make_record(logging.DEBUG, sample_rate=1.0)))
+
+    def test_configure_logging_writes_jsonl_through_the_queue(self):
+        console = io.StringIO()
+        configure_logging(self.path, level='DEBUG', debug_sample_rate=1.0, stream=console)
+        logger = logging.getLogger('badminton_booker.test')
+
+        # The caller only ever talks to the queue handler
+        self.assertEqual([type(h).__name__ for h in self.root.handlers], ['_EventQueueHandler'])
+        with log_phase('notify'):
+            log_event(logger, 'telegram_sent', 'Notification sent successfully!', chatId='42', durationMs=120)
+        log_event(logger, 'panel_read', 'Read panel Court A', logging.DEBUG, sample_rate=0.0)
+        flush_logging()
+
+        events = self.read_events()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['event'], 'telegram_sent')
+        self.assertEqual(events[0]['phase'], 'notify')
+        self.assertEqual(events[0]['runId'], RUN_ID)
+        self.assertEqual(events[0]['chatId'], '42')
+        self.assertEqual(console.getvalue(), 'Notification sent successfully!\n')
+
+    def test_exception_survives_the_queue(self):
+        configure_logging(self.path, console_format='json', stream=io.StringIO())
+        logger = logging.getLogger('badminton_booker.test')
+
+        try:
+            raise RuntimeError('browser crashed')
+        except RuntimeError:
+            log_event(logger, 'scan_failed', 'Scan failed', logging.ERROR, exc_info=True)
+        flush_logging()
+
+        [event] = self.read_events()
+        self.assertIn('RuntimeError: browser crashed', event['exception'])
+
+    def test_worker_processes_get_their_own_file(self):
+        settings = MagicMock(log_path=str(self.path), log_format='text', log_level='INFO',
+                             log_debug_sample_rate=1.0, log_max_bytes=1000)
+        worker_path = process_log_path(self.path, 'worker-42')
+        self.assertEqual(worker_path, self.path.parent / 'events.worker-42.jsonl')
+
+        with patch('sys.stdout', io.StringIO()):
+            configure_logging_from_settings(settings, 'worker-42')
+            log_event(logging.getLogger('badminton_booker.test'), 'unit_started', 'Scanning unit 1', unitId=1)
+            flush_logging()
+
+        self.assertFalse(self.path.exists())
+        with open(worker_path) as f:
+            self.assertEqual(json.loads(f.read())['unitId'], 1)
+
+    def test_unknown_console_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            configure_logging(console_format='xml')
+        self.assertIsNone(event_log._listener)
+
+    @patch('badminton_booker.notification.telegram.requests.post')
+    def test_telegram_send_logs_chat_id_and_duration(self, mock_post):
+        mock_post.return_value = MagicMock(status_code=200)
+
+        with self.assertLogs('badminton_booker.notification.telegram', level='INFO') as logs:
+            self.assertTrue(telegram.send_notification('hi', recipients=['42']))
+
+        [record] = logs.records
+        self.assertEqual(record.event, 'telegram_sent')
+        self.assertEqual(record.fields['chatId'], '42')
+        self.assertIn('durationMs', record.fields)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""Tests for the facility index."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from badminton_booker.datastore.facilities import FacilityIndex, normalize_name
+
+SEED = [
+    {'name': 'Centre sportif Claude-Robillard', 'borough': 'Ahuntsic - Cartierville',
+     'address': '1000, avenue Émile-Journault', 'indoor': True},
+]
+
+
+class TestFacilities(unittest.TestCase):
+    """Test cases for building, refreshing and reading the facility index."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / 'facilities.json'
+        self.seed_path = Path(self.tmp_dir.name) / 'seed.json'
+        with open(self.seed_path, 'w') as f:
+            json.dump(SEED, f)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_enrich_from_seed(self):
+        """Test panels are enriched regardless of case and accents in the scraped name."""
+        index = FacilityIndex(self.path, self.seed_path)
+        panel = index.enrich({'name': 'CENTRE SPORTIF  claude-robillard', 'price': '15.00'})
+
+        self.assertEqual(panel['borough'], 'Ahuntsic - Cartierville')
+        self.assertEqual(panel['address'], '1000, avenue Émile-Journault')
+        self.assertTrue(panel['indoor'])
+        self.assertEqual(normalize_name('Père-Marquette'), 'pere-marquette')
+        self.assertNotIn('borough', index.enrich({'name': 'Unknown'}))
+
+    def test_learn_only_attributes_single_neighborhood_scans(self):
+        """Test unseen names are recorded and get a borough only from single-neighborhood scans."""
+        index = FacilityIndex(self.path)
+
+        self.assertEqual(index.learn(['Aréna A', 'Aréna B'], ['Saint-Laurent', 'Villeray']), 2)
+        self.assertEqual(index.unresolved(), ['Aréna A', 'Aréna B'])
+        self.assertEqual(index.learn(['Aréna A'], ['Saint-Laurent']), 1)
+        self.assertEqual(index.learn(['Aréna A'], ['Villeray']), 0)
+        self.assertEqual(index.unseen(['Aréna A', 'Aréna C']), ['Aréna C'])
+
+        index.save()
+        reloaded = FacilityIndex(self.path)
+        self.assertEqual(reloaded.lookup('arena a')['borough'], 'Saint-Laurent')
+        self.assertEqual(reloaded.unresolved(), ['Aréna B'])
+
+
+if __name__ == '__main__':
+    unittest.main()
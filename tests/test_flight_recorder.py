@@ -0,0 +1,80 @@
+"""Tests for the flight recorder module."""
+
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+from badminton_booker.booking.flight_recorder import FlightRecorder
+
+
+class TestFlightRecorder(unittest.TestCase):
+    """Test cases for the flight recorder."""
+
+    def test_event_count_cap(self):
+        """Test the oldest events are evicted once the count cap is reached."""
+        recorder = FlightRecorder(max_events=3)
+
+        for i in range(5):
+            recorder.record('request', url=f'https://example.com/{i}')
+
+        urls = [event['url'] for event in recorder.snapshot()]
+        self.assertEqual(urls, ['https://example.com/2', 'https://example.com/3', 'https://example.com/4'])
+        self.assertEqual(recorder.dropped, 2)
+
+    def test_byte_cap(self):
+        """Test the approximate buffer size never exceeds the byte cap."""
+        recorder = FlightRecorder(max_events=1000, max_bytes=500)
+
+        for i in range(50):
+            recorder.record('console', type='log', text='x' * 100)
+
+        self.assertLessEqual(recorder.size, 500)
+        self.assertGreater(len(recorder.snapshot()), 0)
+
+    def test_attach_records_page_events(self):
+        """Test page event handlers feed the buffer."""
+        recorder = FlightRecorder()
+        page = MagicMock()
+        handlers = {}
+        page.on.side_effect = lambda event, handler: handlers.setdefault(event, handler)
+
+        recorder.attach(page)
+        handlers['request'](MagicMock(method='GET', url='https://example.com/search'))
+        handlers['console'](MagicMock(type='error', text='boom'))
+        handlers['framenavigated'](page.main_frame)
+
+        kinds = [event['kind'] for event in recorder.snapshot()]
+        self.assertEqual(kinds, ['request', 'console', 'navigation'])
+
+    def test_screenshots_only_when_enabled(self):
+        """Test step screenshots are skipped unless enabled."""
+        page = MagicMock()
+        page.screenshot = AsyncMock(return_value=b'jpeg')
+
+        asyncio.run(FlightRecorder().capture_screenshot(page, 'badminton'))
+        page.screenshot.assert_not_called()
+
+        recorder = FlightRecorder(screenshots=True)
+        asyncio.run(recorder.capture_screenshot(page, 'badminton'))
+        self.assertEqual(recorder.snapshot()[0]['stage'], 'badminton')
+
+    def test_dump(self):
+        """Test dumping writes the buffered events with the reason."""
+        recorder = FlightRecorder()
+        recorder.record_step('badminton', 'failed', 12.5, Exception("Timeout"))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = recorder.dump(Path(tmp_dir), 'run failed')
+            with open(path) as f:
+                data = json.load(f)
+
+        self.assertEqual(data['reason'], 'run failed')
+        self.assertEqual(data['events'][0]['stage'], 'badminton')
+        self.assertEqual(data['events'][0]['error'], 'Timeout')
+
+
+if __name__ == '__main__':
+    unittest.main()
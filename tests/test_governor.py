@@ -0,0 +1,108 @@
+"""Tests for the crawl governor."""
+
+import asyncio
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from badminton_booker.booking.governor import CrawlGovernor, looks_like_captcha, parse_crawl_rates
+
+URL = 'https://loisirs.example.com/IC3/#/U6510/search'
+
+
+class TestGovernor(unittest.TestCase):
+    """Test cases for the shared token bucket and its backoff."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_path = Path(self.tmp_dir.name) / 'crawl_governor.json'
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def governor(self, **kwargs):
+        return CrawlGovernor(self.state_path, {'loisirs.example.com': (2.0, 2)}, **kwargs)
+
+    def test_bucket_shared_between_processes(self):
+        """Test two governors on the same state file draw from one bucket."""
+        first, second = self.governor(), self.governor()
+
+        self.assertEqual(first.try_acquire(URL, now=100.0), 0)
+        self.assertEqual(second.try_acquire(URL, now=100.0), 0)
+        self.assertAlmostEqual(first.try_acquire(URL, now=100.0), 0.5)
+        # Half a second later one token has been refilled at 2 per second
+        self.assertEqual(second.try_acquire(URL, now=100.5), 0)
+        # Other hosts use the default rate and burst
+        self.assertEqual(first.try_acquire('https://other.example.com/', now=100.5), 0)
+
+    def test_backoff_grows_and_decays(self):
+        """Test pushback blocks the host for a doubling period that successes shrink again."""
+        governor = self.governor(base_backoff_seconds=5, max_backoff_seconds=15)
+
+        governor.report(URL, 429, now=100.0)
+        self.assertAlmostEqual(governor.try_acquire(URL, now=101.0), 4.0)
+        # Responses to requests already in flight do not extend the block
+        governor.report(URL, 503, now=102.0)
+        self.assertAlmostEqual(governor.try_acquire(URL, now=102.0), 3.0)
+
+        governor.report(URL, 503, now=110.0)
+        self.assertAlmostEqual(governor.try_acquire(URL, now=110.0), 10.0)
+        governor.report(URL, 200, captcha=True, now=130.0)
+        self.assertAlmostEqual(governor.try_acquire(URL, now=130.0), 15.0)
+
+        for _ in range(3):
+            governor.report(URL, 200, now=150.0)
+        governor.report(URL, 429, now=150.0)
+        self.assertAlmostEqual(governor.try_acquire(URL, now=150.0), 5.0)
+
+    def test_retry_after_and_helpers(self):
+        """Test Retry-After extends the block and the spec and CAPTCHA helpers."""
+        governor = self.governor()
+        governor.report(URL, 429, retry_after=60, now=100.0)
+
+        self.assertAlmostEqual(governor.try_acquire(URL, now=100.0), 60.0)
+        self.assertEqual(parse_crawl_rates('a.example.com=1:5, b.example.com=0.2'),
+                         {'a.example.com': (1.0, 5), 'b.example.com': (0.2, 1)})
+        self.assertTrue(looks_like_captcha('https://example.com/cdn-cgi/challenge-platform/h/b'))
+        self.assertTrue(looks_like_captcha(URL, {'cf-mitigated': 'challenge'}))
+        self.assertFalse(looks_like_captcha(URL, {}))
+
+    def test_rates_must_be_positive(self):
+        """Test a zero rate or burst is rejected instead of dividing by zero later."""
+        for spec in ('a.example.com=0', 'a.example.com=-1:5', 'a.example.com=1:0'):
+            with self.assertRaises(ValueError):
+                parse_crawl_rates(spec)
+
+    def test_attached_reports_run_off_the_event_loop(self):
+        """Test pushback seen by the response handler is reported from a worker thread."""
+        governor = self.governor()
+        report_threads = []
+        report = governor.report
+        governor.report = lambda *args, **kwargs: (report_threads.append(threading.current_thread()),
+                                                   report(*args, **kwargs))
+        page = MagicMock()
+        governor.attach(page, ['loisirs.example.com'])
+        on_response = page.on.call_args[0][1]
+
+        def response(status):
+            response = MagicMock(url=URL, status=status, headers={})
+            response.request.resource_type = 'document'
+            return response
+
+        async def run():
+            on_response(response(200))
+            on_response(response(429))
+            await asyncio.gather(*governor._reports)
+
+        asyncio.run(run())
+
+        # Successes before any backoff do not even reach the state file
+        self.assertEqual(len(report_threads), 1)
+        self.assertIsNot(report_threads[0], threading.main_thread())
+        self.assertGreater(governor.try_acquire(URL), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
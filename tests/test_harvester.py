@@ -0,0 +1,190 @@
+"""Tests for the incremental panel harvester."""
+
+import asyncio
+import unittest
+
+from badminton_booker.booking.harvester import (
+    ACTIVE_PAGE_SELECTOR,
+    DRAIN_HARVESTER_JS,
+    INSTALL_HARVESTER_JS,
+    PANEL_SELECTOR,
+    SNAPSHOT_PANELS_JS,
+    harvest_panels,
+    snapshot_panels,
+)
+from badminton_booker.booking.panel_filter import build_panel_filter, panel_matches_filter
+
+
+def make_panel(name, can_reserve=True):
+    """Build raw panel fields as extracted in the page."""
+    return {'name': name, 'date': '15 mai', 'startTime': '18:00', 'endTime': '19:00',
+            'price': '15.00', 'canReserve': can_reserve, 'buttonId': None}
+
+
+class FakeLocator:
+    """Locator over a fake page, present only when ``visible`` is true."""
+
+    def __init__(self, visible, text='', on_click=None):
+        self.visible = visible
+        self.text = text
+        self.on_click = on_click
+        self.first = self
+
+    async def count(self):
+        return 1 if self.visible else 0
+
+    async def is_visible(self):
+        return self.visible
+
+    async def click(self):
+        self.on_click()
+
+    async def text_content(self):
+        return self.text
+
+
+class FakePage:
+    """Result page rendering ``pages`` of panel batches, paginated or revealed by scrolling."""
+
+    def __init__(self, pages, paginated, wrap_around=False):
+        self.pages = pages
+        self.paginated = paginated
+        self.wrap_around = wrap_around
+        self.current = 0
+        self.pending = list(pages[0])
+        self.seen = 0
+        self.panel_filter = None
+
+    def _show(self, index):
+        self.current = index
+        self.pending += self.pages[index]
+
+    def _next(self):
+        if self.current + 1 < len(self.pages):
+            self._show(self.current + 1)
+        else:
+            # Some paginations wrap back to the first page, which was already read
+            self.current = 0
+
+    async def evaluate(self, script, arg=None):
+        if script == INSTALL_HARVESTER_JS:
+            self.panel_filter = arg[1]
+            return 0
+        if script == DRAIN_HARVESTER_JS:
+            # Render one panel per drain to mimic a list filling in over time
+            if not self.pending:
+                return {'panels': [], 'seen': self.seen, 'names': []}
+            self.seen += 1
+            panel = self.pending.pop(0)
+            return {'panels': [panel] if panel_matches_filter(panel, self.panel_filter) else [], 'seen': self.seen,
+                    'names': [panel['name']]}
+        # Scrolling to the bottom
+        if self.current + 1 < len(self.pages):
+            self._show(self.current + 1)
+            return True
+        return False
+
+    def locator(self, selector):
+        if not self.paginated:
+            return FakeLocator(False)
+        if selector == ACTIVE_PAGE_SELECTOR:
+            return FakeLocator(True, str(self.current + 1))
+        has_next = self.wrap_around or self.current + 1 < len(self.pages)
+        return FakeLocator('aria-label="Next"' in selector and has_next, on_click=self._next)
+
+
+async def collect(page):
+    """Harvest every panel of a fake page with short idle periods."""
+    return [panel['name'] async for panel in harvest_panels(page, idle_ms=20, poll_ms=1)]
+
+
+class TestHarvester(unittest.TestCase):
+    """Test cases for the incremental panel harvester."""
+
+    def test_pagination_read_once(self):
+        """Test every page is read and a page seen before stops the harvest."""
+        page = FakePage([[make_panel('A'), make_panel('B')], [make_panel('C')]], paginated=True, wrap_around=True)
+
+        names = asyncio.run(collect(page))
+
+        self.assertEqual(names, ['A', 'B', 'C'])
+        self.assertEqual(page.current, 0)
+
+    def test_scroll_until_exhausted(self):
+        """Test lazily rendered batches are harvested until scrolling reveals nothing."""
+        page = FakePage([[make_panel('A')], [make_panel('B'), make_panel('C')], []], paginated=False)
+
+        names = asyncio.run(collect(page))
+
+        self.assertEqual(names, ['A', 'B', 'C'])
+
+    def test_filtered_panels_still_count_as_progress(self):
+        """Test panels rejected in the page are not returned but keep the harvest going."""
+        page = FakePage([[make_panel('A', False), make_panel('B')], [make_panel('C', False)], [make_panel('D')], []],
+                        paginated=False)
+
+        names = set()
+
+        async def run():
+            panel_filter = build_panel_filter(bookable_only=True)
+            return [p['name'] async for p in harvest_panels(page, idle_ms=20, poll_ms=1, panel_filter=panel_filter,
+                                                            names=names)]
+
+        self.assertEqual(asyncio.run(run()), ['B', 'D'])
+        # The facility names of rejected panels are still reported
+        self.assertEqual(names, {'A', 'B', 'C', 'D'})
+
+    def test_stops_after_max_advances(self):
+        """Test an endless list is cut off after the configured number of advances."""
+        page = FakePage([[make_panel(str(i))] for i in range(10)], paginated=False)
+
+        async def run():
+            return [p async for p in harvest_panels(page, idle_ms=20, poll_ms=1, max_advances=2)]
+
+        self.assertEqual(len(asyncio.run(run())), 3)
+
+    def test_reload_reinstalls_without_repeating_panels(self):
+        """Test a page reloaded mid-harvest, e.g. by an auto-reserve attempt, is read on without duplicates."""
+        page = FakePage([[make_panel('A'), make_panel('B'), make_panel('C')]], paginated=False)
+        page_evaluate = page.evaluate
+        drains = []
+
+        async def evaluate(script, arg=None):
+            if script == DRAIN_HARVESTER_JS:
+                drains.append(1)
+                if len(drains) == 3:
+                    # The reload renders every panel again and drops the installed harvester
+                    page.pending = list(page.pages[0])
+                    page.seen = 0
+                    return None
+            return await page_evaluate(script, arg)
+
+        page.evaluate = evaluate
+
+        self.assertEqual(asyncio.run(collect(page)), ['A', 'B', 'C'])
+
+    def test_snapshot_filters_in_one_page_call(self):
+        """Test snapshot mode sends the filter to the page and reads every panel in one call."""
+        calls = []
+
+        class SnapshotPage:
+            async def eval_on_selector_all(self, selector, script, arg):
+                calls.append((selector, script, arg))
+                panels = [make_panel('A'), make_panel('B', False)]
+                return {'panels': [p for p in panels if panel_matches_filter(p, arg)], 'total': len(panels),
+                        'names': [p['name'] for p in panels]}
+
+        names = set()
+
+        async def run():
+            panel_filter = build_panel_filter(bookable_only=True)
+            return [p['name'] async for p in snapshot_panels(SnapshotPage(), panel_filter, names=names)]
+
+        self.assertEqual(asyncio.run(run()), ['A'])
+        self.assertEqual(names, {'A', 'B'})
+        [(selector, script, arg)] = calls
+        self.assertEqual((selector, script, arg['bookableOnly']), (PANEL_SELECTOR, SNAPSHOT_PANELS_JS, True))
+
+
+if __name__ == '__main__':
+    unittest.main()
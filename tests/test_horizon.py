@@ -0,0 +1,95 @@
+"""Tests for the tiered refresh horizon."""
+
+import asyncio
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from badminton_booker.booking.horizon import (
+    due_tiers,
+    load_horizon_state,
+    merge_scan,
+    parse_horizon_tiers,
+    run_horizon_scan,
+    save_horizon_state,
+)
+
+TODAY = datetime(2025, 5, 15, 9, 0)
+
+
+def slot(name, days_ahead):
+    """Build a bookable reservation starting at 18:00 some days after TODAY."""
+    start = TODAY.replace(hour=18) + timedelta(days=days_ahead)
+    return {'name': name, 'startTime': start, 'endTime': start + timedelta(hours=1), 'price': '15.00',
+            'canReserve': True}
+
+
+class TestHorizon(unittest.TestCase):
+    """Test cases for planning and merging tiered scans."""
+
+    def test_parse_and_due(self):
+        """Test tiers are parsed in order and only stale ones are due."""
+        tiers = parse_horizon_tiers('5-13=21600, 0=300, 1-4=1800')
+        self.assertEqual([tier.key for tier in tiers], ['0-0', '1-4', '5-13'])
+        with self.assertRaises(ValueError):
+            parse_horizon_tiers('0-3=300,2-5=600')
+
+        state = {'dates': {
+            (TODAY + timedelta(days=i)).date().isoformat(): {'scannedAt': 1000, 'reservations': []} for i in range(14)
+        }}
+        self.assertEqual([tier.key for tier in due_tiers(tiers, state, TODAY, now=1400)], ['0-0'])
+
+        # After midnight the last day of each tier has never been scanned as part of it
+        tomorrow = TODAY + timedelta(days=1)
+        self.assertEqual([tier.key for tier in due_tiers(tiers, state, tomorrow, now=1400)], ['0-0', '5-13'])
+
+    def test_merge_with_cache(self):
+        """Test cached dates are merged back and a partially covered tier stays due."""
+        tiers = parse_horizon_tiers('0-1=300,2-3=3600')
+        state = {'dates': {'2025-05-01': {'scannedAt': 0, 'reservations': []}}}
+
+        merge_scan(state, tiers, tiers, [slot('A', 0), slot('B', 2), slot('C', 3)], ['15', '16', '17', '18'],
+                   TODAY, now=1000)
+        self.assertNotIn('2025-05-01', state['dates'])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / 'horizon_state.json'
+            save_horizon_state(path, state)
+            state = load_horizon_state(path)
+
+        # Only the near tier is rescanned, and day 16 could not be selected
+        horizon = merge_scan(state, tiers, tiers[:1], [slot('D', 0)], ['15'], TODAY, now=1200)
+
+        self.assertEqual(sorted(res['name'] for res in horizon['reservations']), ['B', 'C', 'D'])
+        self.assertIsInstance(horizon['reservations'][-1]['startTime'], datetime)
+        self.assertEqual(horizon['scanned'], ['2025-05-15'])
+        self.assertEqual(horizon['cached'], {'2025-05-16': 200, '2025-05-17': 200, '2025-05-18': 200})
+        self.assertEqual({res['name']: res.get('cacheAgeSeconds') for res in horizon['reservations']},
+                         {'B': 200, 'C': 200, 'D': None})
+        # Day 16 keeps its older scan time, so the near tier is due once that one is stale
+        self.assertEqual(due_tiers(tiers, state, TODAY, now=1200), [])
+        self.assertEqual([tier.key for tier in due_tiers(tiers, state, TODAY, now=1300)], ['0-1'])
+
+    def test_run_skips_browser_when_nothing_is_due(self):
+        """Test a run with no due tier answers from cache without scanning."""
+        tiers = parse_horizon_tiers('0-1=3600')
+        scan = AsyncMock(return_value={
+            'reservations': [slot('A', 0)], 'url': 'https://example.com', 'timestamp': '', 'timezone': '',
+            'coverage': {'dates': {'covered': ['15', '16']}},
+        })
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                patch('badminton_booker.booking.horizon.check_available_courts', scan):
+            path = Path(tmp_dir) / 'horizon_state.json'
+            first = asyncio.run(run_horizon_scan(MagicMock(), tiers, path, today=TODAY))
+            second = asyncio.run(run_horizon_scan(MagicMock(), tiers, path, today=TODAY))
+
+        self.assertEqual(scan.await_count, 1)
+        self.assertEqual([res['name'] for res in first['reservations']], ['A'])
+        self.assertEqual([res['name'] for res in second['reservations']], ['A'])
+        self.assertEqual(second['horizon']['scanned'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
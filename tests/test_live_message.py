@@ -0,0 +1,149 @@
+"""Tests for live Telegram messages edited in place."""
+
+import asyncio
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from badminton_booker.notification.live_message import LiveMessageStore, LiveMessenger, slot_key
+from badminton_booker.notification.sinks import LiveTelegramSink, build_sinks, notify_sinks
+
+
+def slot(name, hour):
+    return {
+        'name': name,
+        'startTime': datetime(2025, 5, 1, hour, 0),
+        'endTime': datetime(2025, 5, 1, hour + 1, 0),
+        'price': 10,
+    }
+
+
+class FakeBot:
+    """Record Bot API calls and answer like Telegram."""
+
+    def __init__(self):
+        self.calls = []
+        self.next_id = 100
+        self.edit_error = None
+
+    def post(self, url, params, timeout=None):
+        method = url.rsplit('/', 1)[1]
+        self.calls.append((method, params))
+        response = MagicMock()
+        if method == 'editMessageText' and self.edit_error:
+            response.json.return_value = {'ok': False, 'description': self.edit_error}
+        elif method == 'sendMessage':
+            self.next_id += 1
+            response.json.return_value = {'ok': True, 'result': {'message_id': self.next_id}}
+        else:
+            response.json.return_value = {'ok': True, 'result': True}
+        return response
+
+    def methods(self):
+        return [method for method, _ in self.calls]
+
+
+class TestLiveMessage(unittest.TestCase):
+    """Test cases for the live message state machine and its sink."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / 'live.json'
+        self.bot = FakeBot()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def update(self, slots, recipients=('1', '2')):
+        """Run one notification round, reloading the state like a new process would."""
+        self.bot.calls = []
+        messenger = LiveMessenger(LiveMessageStore(self.path), post=self.bot.post)
+        return messenger.update(slots, 'https://example.com/results', 'Available:', list(recipients))
+
+    def test_slot_key_is_stable_across_runs(self):
+        self.assertEqual(slot_key(slot('Jarry', 19)), 'Jarry|2025-05-01T19:00:00|2025-05-01T20:00:00')
+
+    def test_first_run_sends_one_live_message_per_chat(self):
+        totals = self.update([slot('Jarry', 19)])
+
+        self.assertEqual(totals, {'sent': 2, 'edited': 0, 'failed': 0})
+        self.assertEqual(self.bot.methods(), ['sendMessage', 'sendMessage'])
+        store = LiveMessageStore(self.path)
+        self.assertEqual(store.get('1', 'Available:')['messageId'], 101)
+
+    def test_unchanged_slots_cost_no_api_call(self):
+        self.update([slot('Jarry', 19)])
+
+        totals = self.update([slot('Jarry', 19)])
+
+        self.assertEqual(totals, {'sent': 0, 'edited': 0, 'failed': 0})
+        self.assertEqual(self.bot.calls, [])
+
+    def test_removed_slot_edits_the_live_message_silently(self):
+        self.update([slot('Jarry', 19), slot('Ahuntsic', 20)])
+
+        totals = self.update([slot('Jarry', 19)])
+
+        self.assertEqual(totals, {'sent': 0, 'edited': 2, 'failed': 0})
+        method, params = self.bot.calls[0]
+        self.assertEqual((method, params['message_id']), ('editMessageText', 101))
+        self.assertNotIn('Ahuntsic', params['text'])
+
+    def test_new_slot_edits_and_alerts_with_only_the_new_slot(self):
+        self.update([slot('Jarry', 19)], recipients=['1'])
+
+        totals = self.update([slot('Jarry', 19), slot('Ahuntsic', 20)], recipients=['1'])
+
+        self.assertEqual(totals, {'sent': 1, 'edited': 1, 'failed': 0})
+        self.assertEqual(self.bot.methods(), ['editMessageText', 'sendMessage'])
+        alert = self.bot.calls[1][1]['text']
+        self.assertIn('Ahuntsic', alert)
+        self.assertNotIn('Jarry', alert)
+
+    def test_lost_message_is_replaced(self):
+        self.update([slot('Jarry', 19)], recipients=['1'])
+        self.bot.edit_error = 'Bad Request: message to edit not found'
+
+        totals = self.update([slot('Ahuntsic', 20)], recipients=['1'])
+
+        self.assertEqual(totals, {'sent': 1, 'edited': 0, 'failed': 0})
+        self.assertEqual(LiveMessageStore(self.path).get('1', 'Available:')['messageId'], 102)
+
+    def test_failed_edit_is_retried_next_run(self):
+        self.update([slot('Jarry', 19)], recipients=['1'])
+        self.bot.edit_error = 'Too Many Requests: retry after 5'
+
+        self.assertEqual(self.update([slot('Ahuntsic', 20)], recipients=['1'])['failed'], 1)
+        self.bot.edit_error = None
+        self.assertEqual(self.update([slot('Ahuntsic', 20)], recipients=['1'])['edited'], 1)
+
+    def test_no_slots_and_no_live_message_sends_nothing(self):
+        self.assertEqual(self.update([]), {'sent': 0, 'edited': 0, 'failed': 0})
+        self.assertEqual(self.bot.calls, [])
+
+    def test_build_sinks_reads_the_state_path(self):
+        [sink] = build_sinks('telegram-live:data/live.json')
+
+        self.assertIsInstance(sink, LiveTelegramSink)
+        self.assertEqual(sink.state_path, 'data/live.json')
+
+    def test_live_sink_hears_about_vanished_slots(self):
+        sink = LiveTelegramSink(self.path)
+        data = {'reservations': [{**slot('Jarry', 19), 'canReserve': False}], 'url': ''}
+
+        with patch('badminton_booker.notification.live_message.requests.post', self.bot.post), \
+                patch('badminton_booker.notification.telegram.get_chat_ids', return_value=['1']):
+            store = LiveMessageStore(self.path)
+            store.set('1', 'Badminton Reservations Available:', 7, [slot_key(slot('Jarry', 19))])
+            store.save()
+            self.assertTrue(asyncio.run(notify_sinks(data, [sink])))
+
+        method, params = self.bot.calls[0]
+        self.assertEqual((method, params['message_id']), ('editMessageText', 7))
+        self.assertIn('No bookable', params['text'])
+
+
+if __name__ == '__main__':
+    unittest.main()
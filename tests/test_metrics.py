@@ -0,0 +1,59 @@
+"""Tests for the metrics registry."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from badminton_booker.metrics.registry import MetricsRegistry, write_textfile
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for the metrics registry and its text exposition."""
+
+    def test_counter_and_histogram_rendering(self):
+        """Test counters and histograms render cumulative Prometheus samples."""
+        registry = MetricsRegistry()
+        sends = registry.counter('telegram_sends', 'Sends by outcome.', ['outcome'])
+        duration = registry.histogram('scan_duration_seconds', 'Scan time.', buckets=(1, 10))
+        sends.inc(outcome='sent')
+        sends.inc(2, outcome='sent')
+        sends.inc(outcome='rejected')
+        duration.observe(0.5)
+        duration.observe(5)
+
+        text = registry.render()
+
+        self.assertIn('# TYPE telegram_sends counter', text)
+        self.assertIn('telegram_sends_total{outcome="sent"} 3', text)
+        self.assertIn('telegram_sends_total{outcome="rejected"} 1', text)
+        self.assertIn('scan_duration_seconds_bucket{le="1"} 1', text)
+        self.assertIn('scan_duration_seconds_bucket{le="10"} 2', text)
+        self.assertIn('scan_duration_seconds_bucket{le="+Inf"} 2', text)
+        self.assertIn('scan_duration_seconds_sum 5.5', text)
+        self.assertIn('scan_duration_seconds_count 2', text)
+
+    def test_registration_is_shared_and_checked(self):
+        """Test modules get the same metric back and conflicting definitions are rejected."""
+        registry = MetricsRegistry()
+        counter = registry.counter('scans', 'Scans.', ['outcome'])
+
+        self.assertIs(registry.counter('scans', 'Scans.', ['outcome']), counter)
+        with self.assertRaises(ValueError):
+            registry.histogram('scans', 'Scans.')
+        with self.assertRaises(ValueError):
+            counter.inc(stage='badminton')
+
+    def test_write_textfile(self):
+        """Test the textfile is written in full without leftover temporary files."""
+        registry = MetricsRegistry()
+        registry.counter('scans', 'Scans.').inc()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / 'metrics' / 'badminton.prom'
+            write_textfile(path, registry)
+
+            self.assertEqual(path.read_text(), registry.render())
+            self.assertEqual([p.name for p in path.parent.iterdir()], ['badminton.prom'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,11 @@
 import unittest
 from unittest.mock import patch, MagicMock, call
 from datetime import datetime, timezone
-from badminton_booker.notification.telegram import send_notification, notify_about_reservations
+from badminton_booker.notification.telegram import (
+    format_reservations_message,
+    notify_about_reservations,
+    send_notification,
+)
 
 
 class TestNotification(unittest.TestCase):
@@ -32,11 +36,13 @@ class TestNotification(unittest.TestCase):
         expected_calls = [
             call(
                 expected_url, 
-                params={"chat_id": "123456", "text": "Test message", "parse_mode": "HTML"}
+                params={"chat_id": "123456", "text": "Test message", "parse_mode": "HTML"},
+                timeout=10
             ),
             call(
                 expected_url, 
-                params={"chat_id": "789012", "text": "Test message", "parse_mode": "HTML"}
+                params={"chat_id": "789012", "text": "Test message", "parse_mode": "HTML"},
+                timeout=10
             )
         ]
         mock_post.assert_has_calls(expected_calls, any_order=True)
@@ -83,6 +89,17 @@ class TestNotification(unittest.TestCase):
         self.assertTrue(result)  # Function should succeed even if no messages are sent
         mock_post.assert_not_called()
 
+    def test_format_reservations_message_shows_cache_age(self):
+        """Test slots answered from the horizon cache say when they were last checked."""
+        start = datetime(2025, 5, 5, 18, 0)
+        fresh = {"name": "Court A", "startTime": start, "endTime": start, "price": "15"}
+        cached = {**fresh, "name": "Court B", "cacheAgeSeconds": 1500}
+
+        message = format_reservations_message([fresh, cached])
+
+        self.assertEqual(message.count("Last checked"), 1)
+        self.assertIn("Last checked 25 min ago", message)
+
     @patch('badminton_booker.notification.telegram.send_notification')
     def test_notify_about_reservations_with_bookable_courts(self, mock_send):
         """Test notification with bookable reservations."""
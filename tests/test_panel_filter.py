@@ -0,0 +1,49 @@
+"""Tests for the panel filter spec."""
+
+import unittest
+
+from badminton_booker.booking.panel_filter import panel_matches_filter, parse_panel_filter
+
+
+def make_panel(name, start_time='18:30', price='15.00', can_reserve=True):
+    """Build raw panel fields as extracted in the page."""
+    return {'name': name, 'date': '15 mai', 'startTime': start_time, 'endTime': '', 'price': price,
+            'canReserve': can_reserve, 'buttonId': None}
+
+
+class TestPanelFilter(unittest.TestCase):
+    """Test cases for parsing and applying panel filters."""
+
+    def test_parse_spec(self):
+        """Test every option of the spec is parsed and an empty spec keeps everything."""
+        panel_filter = parse_panel_filter('bookable; court=Jarry|Ahuntsic; max_price=20; time=18:00-21:00')
+
+        self.assertEqual(panel_filter, {
+            'bookableOnly': True,
+            'namePatterns': ['Jarry', 'Ahuntsic'],
+            'maxPrice': 20.0,
+            'startMinutes': 18 * 60,
+            'endMinutes': 21 * 60,
+        })
+        self.assertIsNone(parse_panel_filter(''))
+        with self.assertRaises(ValueError):
+            parse_panel_filter('colour=red')
+        with self.assertRaises(ValueError):
+            parse_panel_filter('court=(unclosed')
+
+    def test_matches(self):
+        """Test each criterion rejects the panels outside it."""
+        panel_filter = parse_panel_filter('bookable;court=jarry|ahuntsic;max_price=20;time=18:00-21:00')
+
+        self.assertTrue(panel_matches_filter(make_panel('Centre Jarry'), panel_filter))
+        self.assertFalse(panel_matches_filter(make_panel('Centre Jarry', can_reserve=False), panel_filter))
+        self.assertFalse(panel_matches_filter(make_panel('Saint-Laurent'), panel_filter))
+        self.assertFalse(panel_matches_filter(make_panel('Ahuntsic', price='25,00'), panel_filter))
+        self.assertTrue(panel_matches_filter(make_panel('Ahuntsic', price=''), panel_filter))
+        self.assertFalse(panel_matches_filter(make_panel('Ahuntsic', start_time='21:00'), panel_filter))
+        self.assertFalse(panel_matches_filter(make_panel('Ahuntsic', start_time=''), panel_filter))
+        self.assertTrue(panel_matches_filter(make_panel('Anything', can_reserve=False), None))
+
+
+if __name__ == '__main__':
+    unittest.main()
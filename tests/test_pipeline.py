@@ -0,0 +1,108 @@
+"""Tests for the streaming notification pipeline."""
+
+import asyncio
+import unittest
+
+from badminton_booker.notification.pipeline import run_notification_pipeline
+from badminton_booker.notification.sinks import Sink
+
+
+def make_panel(name, can_reserve=True):
+    """Build raw panel fields as read by the booking module."""
+    return {
+        'name': name,
+        'date': '15 mai',
+        'startTime': '18:00',
+        'endTime': '19:00',
+        'price': '15.00',
+        'canReserve': can_reserve,
+        'buttonId': None,
+    }
+
+
+class RecordingSink(Sink):
+    """Sink keeping the events it receives."""
+
+    kind = 'recording'
+
+    def __init__(self, wants_empty=False, on_deliver=None):
+        super().__init__()
+        self.wants_empty = wants_empty
+        self.on_deliver = on_deliver
+        self.events = []
+
+    async def deliver(self, event):
+        self.events.append(event)
+        if self.on_deliver:
+            self.on_deliver(event)
+        return True
+
+
+class TestPipeline(unittest.TestCase):
+    """Test cases for the streaming notification pipeline."""
+
+    def test_first_alert_sent_before_stream_ends(self):
+        """Test the first bookable slot is alerted while later panels are still being read."""
+        events = []
+
+        async def panels():
+            for panel in [make_panel('Court A', False), make_panel('Court B'), make_panel('Court C'), make_panel('Court D')]:
+                events.append(f"read {panel['name']}")
+                yield panel
+                # Simulate the time the browser needs for the next panel
+                await asyncio.sleep(0.05)
+
+        sink = RecordingSink(on_deliver=lambda event: events.append(f"send {len(event['slots'])} slots"))
+
+        reservations, stats = asyncio.run(run_notification_pipeline(panels(), 'https://example.com', sinks=[sink]))
+
+        self.assertEqual(len(reservations), 4)
+        self.assertLess(events.index("send 1 slots"), events.index("read Court D"))
+        self.assertEqual(events[-1], "send 2 slots")
+        self.assertEqual(stats['alertsSent'], 2)
+        self.assertIsNotNone(stats['firstAlertMs'])
+
+    def test_no_bookable_slots(self):
+        """Test nothing is sent when no panel can be reserved."""
+        sink = RecordingSink()
+
+        async def panels():
+            yield make_panel('Court A', False)
+
+        reservations, stats = asyncio.run(run_notification_pipeline(panels(), '', sinks=[sink]))
+
+        self.assertEqual(len(reservations), 1)
+        self.assertIsNone(stats['firstAlertMs'])
+        self.assertEqual(sink.events, [])
+
+    def test_live_sinks_get_the_whole_list_once(self):
+        """Test sinks showing current availability skip the early alert and get every slot at the end."""
+        alerts, live = RecordingSink(), RecordingSink(wants_empty=True)
+
+        async def panels():
+            for name in ['Court A', 'Court B', 'Court C']:
+                yield make_panel(name)
+
+        asyncio.run(run_notification_pipeline(panels(), '', sinks=[alerts, live]))
+
+        self.assertEqual([len(event['slots']) for event in alerts.events], [1, 2])
+        self.assertEqual([len(event['slots']) for event in live.events], [3])
+
+    def test_muted_pipeline_and_unparseable_panel(self):
+        """Test muted runs still return parsed reservations and skip bad panels."""
+        sink = RecordingSink()
+        broken = make_panel('Broken')
+        broken['date'] = 'not a date'
+
+        async def panels():
+            yield broken
+            yield make_panel('Court A')
+
+        reservations, stats = asyncio.run(run_notification_pipeline(panels(), '', mute=True, sinks=[sink]))
+
+        self.assertEqual([r['name'] for r in reservations], ['Court A'])
+        self.assertEqual(sink.events, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
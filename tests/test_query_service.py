@@ -0,0 +1,105 @@
+"""Tests for the local availability query service."""
+
+import json
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from datetime import datetime
+from http.server import ThreadingHTTPServer
+
+from badminton_booker.service.query_service import ResultCache, filter_reservations, make_handler
+
+RESULT_DATA = {
+    'reservations': [
+        {'name': 'Aréna Saint-Laurent', 'startTime': datetime(2025, 5, 15, 18, 0), 'endTime': datetime(2025, 5, 15, 19, 0), 'canReserve': True},
+        {'name': 'Centre Ahuntsic', 'startTime': datetime(2025, 5, 15, 20, 0), 'endTime': datetime(2025, 5, 15, 21, 0), 'canReserve': False},
+        {'name': 'Centre Ahuntsic', 'startTime': datetime(2025, 5, 16, 18, 0), 'endTime': datetime(2025, 5, 16, 19, 0), 'canReserve': True},
+    ],
+    'url': 'https://example.com/booking',
+    'timestamp': '2025-05-15T12:00:00',
+}
+
+
+class TestQueryService(unittest.TestCase):
+    """Test cases for the availability query service."""
+
+    def test_concurrent_requests_share_one_scrape(self):
+        """Test stale cache hits from many threads trigger a single scrape."""
+        calls = []
+
+        def scrape():
+            calls.append(1)
+            time.sleep(0.2)
+            return RESULT_DATA
+
+        cache = ResultCache(scrape, freshness_seconds=60)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [RESULT_DATA] * 5)
+
+    def test_stale_cache_refreshes(self):
+        """Test a result older than the freshness period is scraped again."""
+        cache = ResultCache(lambda: RESULT_DATA, freshness_seconds=0)
+
+        cache.get()
+        cache.get()
+
+        self.assertEqual(cache.scrapes, 2)
+
+    def test_failed_scrape_keeps_previous_result(self):
+        """Test a failing scrape serves the last good result."""
+        responses = [RESULT_DATA, Exception("Browser crashed")]
+
+        def scrape():
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        cache = ResultCache(scrape, freshness_seconds=0)
+
+        self.assertEqual(cache.get(), RESULT_DATA)
+        self.assertEqual(cache.get(), RESULT_DATA)
+
+    def test_filter_reservations(self):
+        """Test filtering by court, date, time range and bookability."""
+        reservations = RESULT_DATA['reservations']
+
+        self.assertEqual(len(filter_reservations(reservations, court='ahuntsic')), 2)
+        self.assertEqual(len(filter_reservations(reservations, date='2025-05-15')), 2)
+        self.assertEqual(len(filter_reservations(reservations, start='19:00', end='21:00')), 1)
+        self.assertEqual(len(filter_reservations(reservations, court='ahuntsic', bookable_only=True)), 1)
+
+    def test_http_etag(self):
+        """Test responses carry an ETag and a matching If-None-Match returns 304."""
+        cache = ResultCache(lambda: RESULT_DATA, freshness_seconds=60)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(cache))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base = f'http://127.0.0.1:{server.server_address[1]}'
+        try:
+            with urllib.request.urlopen(f'{base}/availability?court=laurent') as response:
+                etag = response.headers['ETag']
+                body = json.loads(response.read())
+            self.assertEqual([r['name'] for r in body['reservations']], ['Aréna Saint-Laurent'])
+
+            request = urllib.request.Request(f'{base}/availability?court=laurent', headers={'If-None-Match': etag})
+            with self.assertRaises(urllib.error.HTTPError) as context:
+                urllib.request.urlopen(request)
+            self.assertEqual(context.exception.code, 304)
+            self.assertEqual(cache.scrapes, 1)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,211 @@
+"""Tests for the auto-reserve module."""
+
+import asyncio
+import tempfile
+import time
+import unittest
+from datetime import datetime, time as dt_time
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+from badminton_booker.booking.courts import reserve_as_read
+from badminton_booker.booking.reserve import (
+    AutoReserver,
+    auto_reserve,
+    load_reserve_history,
+    parse_reserve_rules,
+    select_reservation_candidates,
+)
+
+
+def make_reservation(name, hour, can_reserve=True, button_id=None, day=15):
+    """Build a reservation dict as produced by the booking module."""
+    return {
+        'name': name,
+        'date': f'{day} May',
+        'startTime': datetime(2025, 5, day, hour, 0),
+        'endTime': datetime(2025, 5, day, hour + 1, 0),
+        'price': '15.00',
+        'canReserve': can_reserve,
+        'buttonId': button_id,
+    }
+
+
+class TestReserve(unittest.TestCase):
+    """Test cases for the auto-reserve module."""
+
+    def test_parse_reserve_rules(self):
+        """Test parsing rules with and without time windows."""
+        rules = parse_reserve_rules("Saint-Laurent@18:00-20:00; *@19:00-22:00;Ahuntsic")
+
+        self.assertEqual(len(rules), 3)
+        self.assertEqual(rules[0]['court'], 'Saint-Laurent')
+        self.assertEqual(rules[0]['start'], dt_time(18, 0))
+        self.assertEqual(rules[0]['end'], dt_time(20, 0))
+        self.assertEqual(rules[1]['court'], '*')
+        self.assertIsNone(rules[2]['start'])
+        self.assertIsNone(rules[2]['end'])
+
+    def test_select_reservation_candidates_priority(self):
+        """Test candidates follow rule priority and skip disabled slots."""
+        reservations = [
+            make_reservation('Centre Ahuntsic', 18),
+            make_reservation('Aréna Saint-Laurent', 19),
+            make_reservation('Aréna Saint-Laurent', 18, can_reserve=False),
+        ]
+        rules = parse_reserve_rules("saint-laurent;*@18:00-19:00")
+
+        candidates = select_reservation_candidates(reservations, rules)
+
+        self.assertEqual([index for index, _ in candidates], [1, 0])
+
+    def test_auto_reserve_respects_daily_cap(self):
+        """Test only one slot per day is reserved with a cap of one."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            history_path = Path(tmp_dir) / 'history.json'
+            page = MagicMock()
+            page.url = 'https://example.com/results'
+            page.wait_for_url = AsyncMock()
+            button = MagicMock()
+            button.click = AsyncMock()
+            button.count = AsyncMock(return_value=1)
+            page.locator.return_value = button
+
+            reservations = [
+                make_reservation('Court 1', 18, button_id='btn-1'),
+                make_reservation('Court 2', 19, button_id='btn-2'),
+                make_reservation('Court 3', 19, button_id='btn-3', day=16),
+            ]
+
+            attempts = asyncio.run(auto_reserve(
+                page, reservations, parse_reserve_rules('*'), 1, time.perf_counter(), history_path
+            ))
+
+            self.assertEqual([a['name'] for a in attempts], ['Court 1', 'Court 3'])
+            self.assertTrue(all(a['success'] for a in attempts))
+            self.assertTrue(all(a['latencyMs'] >= 0 for a in attempts))
+            self.assertEqual(load_reserve_history(history_path), {'2025-05-15': 1, '2025-05-16': 1})
+            page.locator.assert_any_call('[id="btn-1"]')
+
+    def test_auto_reserve_records_failure(self):
+        """Test a failing click is reported without raising."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            page = MagicMock()
+            page.url = 'https://example.com/results'
+            button = MagicMock()
+            button.count = AsyncMock(return_value=1)
+            button.click = AsyncMock(side_effect=Exception("Button detached"))
+            page.locator.return_value = button
+
+            attempts = asyncio.run(auto_reserve(
+                page, [make_reservation('Court 1', 18, button_id='btn-1')], parse_reserve_rules('*'), 1,
+                time.perf_counter(), Path(tmp_dir) / 'history.json'
+            ))
+
+            self.assertEqual(len(attempts), 1)
+            self.assertFalse(attempts[0]['success'])
+            self.assertIn("Button detached", attempts[0]['error'])
+
+    def test_auto_reserve_finds_panels_by_content_not_position(self):
+        """Test a slot without a button ID is matched by court, date and time, and skipped when ambiguous."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            page = MagicMock()
+            page.url = 'https://example.com/results'
+            page.wait_for_url = AsyncMock()
+            panels = page.locator.return_value.filter.return_value.filter.return_value.filter.return_value
+            panels.count = AsyncMock(return_value=1)
+            panels.locator.return_value.click = AsyncMock()
+
+            attempts = asyncio.run(auto_reserve(
+                page, [make_reservation('Court 1', 18)], parse_reserve_rules('*'), 1,
+                time.perf_counter(), Path(tmp_dir) / 'history.json'
+            ))
+
+            self.assertTrue(attempts[0]['success'])
+            page.locator.return_value.filter.assert_called_with(has_text='Court 1')
+            page.locator.return_value.filter.return_value.filter.return_value.filter.assert_called_with(
+                has_text='18:00'
+            )
+            page.locator.return_value.nth.assert_not_called()
+
+            panels.count = AsyncMock(return_value=2)
+            attempts = asyncio.run(auto_reserve(
+                page, [make_reservation('Court 1', 18, day=16)], parse_reserve_rules('*'), 1,
+                time.perf_counter(), Path(tmp_dir) / 'history.json'
+            ))
+
+            self.assertFalse(attempts[0]['success'])
+            self.assertIn('not found', attempts[0]['error'])
+
+    def test_auto_reserve_requires_a_confirmation(self):
+        """Test a click that never leaves the results page is not counted as a reservation."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            history_path = Path(tmp_dir) / 'history.json'
+            page = MagicMock()
+            page.url = 'https://example.com/results'
+            page.wait_for_url = AsyncMock(side_effect=TimeoutError('Timeout 10000ms exceeded'))
+            button = MagicMock()
+            button.count = AsyncMock(return_value=1)
+            button.click = AsyncMock()
+            page.locator.return_value = button
+
+            attempts = asyncio.run(auto_reserve(
+                page, [make_reservation('Court 1', 18, button_id='btn-1')], parse_reserve_rules('*'), 1,
+                time.perf_counter(), history_path
+            ))
+
+            self.assertFalse(attempts[0]['success'])
+            self.assertIsNotNone(attempts[0]['latencyMs'])
+            self.assertEqual(load_reserve_history(history_path), {})
+
+    def test_first_rule_matches_are_reserved_as_they_are_read(self):
+        """Test a top priority slot is clicked on offer while lower priority ones wait for the end."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            page = MagicMock()
+            page.url = 'https://example.com/results'
+            page.wait_for_url = AsyncMock()
+            clicked = []
+            page.locator.side_effect = lambda selector: MagicMock(
+                count=AsyncMock(return_value=1), click=AsyncMock(side_effect=lambda: clicked.append(selector))
+            )
+            reserver = AutoReserver(page, parse_reserve_rules('Jarry;*'), 2, Path(tmp_dir) / 'history.json')
+
+            async def run():
+                await reserver.offer(make_reservation('Ahuntsic', 18, button_id='ahuntsic'), time.perf_counter())
+                await reserver.offer(make_reservation('Verdun', 18, can_reserve=False, button_id='verdun'),
+                                     time.perf_counter())
+                await reserver.offer(make_reservation('Jarry', 19, button_id='jarry'), time.perf_counter())
+                self.assertEqual(clicked, ['[id="jarry"]'])
+                return await reserver.finish()
+
+            attempts = asyncio.run(run())
+
+            self.assertEqual(clicked, ['[id="jarry"]', '[id="ahuntsic"]'])
+            self.assertEqual([a['name'] for a in attempts], ['Jarry', 'Ahuntsic'])
+
+    def test_panels_are_offered_before_being_passed_on(self):
+        """Test the scan offers each panel to the reserver before anything else sees it."""
+        events = []
+
+        class RecordingReserver:
+            async def offer(self, reservation, detected_at):
+                events.append(('offer', reservation['name']))
+
+            async def finish(self):
+                events.append(('finish', None))
+
+        async def panels():
+            for name in ('A', 'B'):
+                yield {'name': name, 'date': '', 'startTime': '', 'endTime': ''}
+
+        async def run():
+            async for panel in reserve_as_read(panels(), RecordingReserver()):
+                events.append(('read', panel['name']))
+
+        asyncio.run(run())
+
+        self.assertEqual(events, [('offer', 'A'), ('read', 'A'), ('offer', 'B'), ('read', 'B'), ('finish', None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
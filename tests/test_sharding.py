@@ -0,0 +1,151 @@
+"""Tests for the sharded scan queue, coordinator and worker."""
+
+import asyncio
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from badminton_booker.sharding.coordinator import merge_unit_results, plan_units, run_coordinator
+from badminton_booker.sharding.work_queue import WorkQueue
+from badminton_booker.sharding.worker import run_worker
+
+
+class TestSharding(unittest.TestCase):
+    """Test cases for the sharding package."""
+
+    def setUp(self):
+        """Create a fresh queue database for each test."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.queue = WorkQueue(Path(self.tmp_dir.name) / 'queue.sqlite', max_attempts=2)
+
+    def tearDown(self):
+        """Remove the queue database."""
+        self.tmp_dir.cleanup()
+
+    def test_plan_units(self):
+        """Test units cover every target, neighborhood group and date."""
+        units = plan_units(['https://a', 'https://b'], ['N1', 'N2', 'N3'], ['15', '16'], 2)
+
+        self.assertEqual(len(units), 2 * 2 * 2)
+        self.assertEqual(units[0], {'target': 'https://a', 'neighborhoods': ['N1', 'N2'], 'date': '15'})
+        self.assertIn({'target': 'https://b', 'neighborhoods': ['N3'], 'date': '16'}, units)
+
+    def test_lease_and_complete(self):
+        """Test a leased unit is not handed out twice and completes once."""
+        self.queue.enqueue('run-1', [{'date': '15'}])
+
+        unit_id, run_id, payload = self.queue.lease('worker-a', 60)
+        self.assertEqual((run_id, payload), ('run-1', {'date': '15'}))
+        self.assertIsNone(self.queue.lease('worker-b', 60))
+
+        self.assertTrue(self.queue.complete(unit_id, 'worker-a', {'reservations': []}))
+        self.assertEqual(self.queue.progress('run-1'), {'done': 1})
+
+    def test_expired_lease_is_released(self):
+        """Test a unit is leased again after its lease times out."""
+        self.queue.enqueue('run-1', [{'date': '15'}])
+        unit_id, _, _ = self.queue.lease('worker-a', -1)
+
+        leased = self.queue.lease('worker-b', 60)
+
+        self.assertEqual(leased[0], unit_id)
+        # The first worker lost its lease and cannot complete the unit anymore
+        self.assertFalse(self.queue.complete(unit_id, 'worker-a', {}))
+
+    def test_expired_lease_gives_up_after_max_attempts(self):
+        """Test a unit whose leases keep expiring is failed once its attempts are used up."""
+        self.queue.enqueue('run-1', [{'date': '15'}])
+        self.queue.lease('worker-a', -1)
+        self.queue.lease('worker-b', -1)
+
+        self.assertIsNone(self.queue.lease('worker-c', 60))
+        self.assertEqual(self.queue.progress('run-1'), {'failed': 1})
+        self.assertEqual(self.queue.units('run-1')[0]['error'], 'lease expired')
+
+    def test_fail_retries_then_gives_up(self):
+        """Test failed units are retried up to the maximum number of attempts."""
+        self.queue.enqueue('run-1', [{'date': '15'}])
+
+        unit_id, _, _ = self.queue.lease('worker-a', 60)
+        self.queue.fail(unit_id, 'worker-a', 'boom')
+        self.assertEqual(self.queue.progress('run-1'), {'pending': 1})
+
+        unit_id, _, _ = self.queue.lease('worker-a', 60)
+        self.queue.fail(unit_id, 'worker-a', 'boom')
+        self.assertEqual(self.queue.progress('run-1'), {'failed': 1})
+
+    def test_merge_unit_results(self):
+        """Test merged results deduplicate reservations and restore datetimes."""
+        reservation = {'name': 'Court 1', 'startTime': '2025-05-15 18:00:00-04:00', 'endTime': '2025-05-15 19:00:00-04:00'}
+        units = [
+            {'payload': {'date': '15'}, 'status': 'done', 'result': {'reservations': [reservation], 'url': 'https://a'}},
+            {'payload': {'date': '15'}, 'status': 'done', 'result': {'reservations': [reservation], 'url': 'https://a'}},
+            {'payload': {'date': '16'}, 'status': 'failed', 'result': None},
+            {'payload': {'date': '17'}, 'status': 'done', 'result': {'reservations': [], 'coverage': {'complete': False}}},
+        ]
+
+        merged = merge_unit_results(units)
+
+        self.assertEqual(len(merged['reservations']), 1)
+        self.assertIsInstance(merged['reservations'][0]['startTime'], datetime)
+        self.assertEqual(merged['url'], 'https://a')
+        self.assertFalse(merged['coverage']['complete'])
+        self.assertEqual(merged['coverage']['units']['missing'], [{'date': '16'}])
+        self.assertEqual(merged['coverage']['units']['partial'], [{'date': '17'}])
+
+    @patch('badminton_booker.sharding.worker.check_available_courts', new_callable=AsyncMock)
+    def test_worker_and_coordinator(self, mock_check):
+        """Test a worker drains the units queued by the coordinator."""
+        mock_check.side_effect = lambda args, url, neighborhoods, dates: {
+            'reservations': [{'name': f'Court {dates[0]}', 'startTime': None, 'endTime': None}],
+            'url': url,
+        }
+        units = plan_units(['https://a'], ['N1'], ['15', '16'], 1)
+
+        async def run():
+            coordinator = asyncio.create_task(run_coordinator(self.queue, units, 5, poll_interval=0.05))
+            await asyncio.sleep(0.05)
+            completed = await run_worker(self.queue, MagicMock(), 60, 0.2, poll_interval=0.05)
+            return completed, await coordinator
+
+        completed, merged = asyncio.run(run())
+
+        self.assertEqual(completed, 2)
+        self.assertEqual(sorted(r['name'] for r in merged['reservations']), ['Court 15', 'Court 16'])
+        self.assertTrue(merged['coverage']['complete'])
+
+
+    @patch('badminton_booker.sharding.worker.check_available_courts', new_callable=AsyncMock)
+    def test_worker_renews_lease_during_long_scan(self, mock_check):
+        """Test a scan longer than the lease keeps the unit from being leased by another worker."""
+        self.queue.enqueue('run-1', [{'target': 'https://a', 'neighborhoods': ['N1'], 'date': '15'}])
+        leased_by_other = []
+
+        async def slow_scan(args, url, neighborhoods, dates):
+            for _ in range(3):
+                await asyncio.sleep(0.2)
+                leased_by_other.append(self.queue.lease('worker-b', 60))
+            return {'reservations': [], 'url': url}
+
+        mock_check.side_effect = slow_scan
+
+        completed = asyncio.run(run_worker(self.queue, MagicMock(), 0.3, 0.1, poll_interval=0.05))
+
+        self.assertEqual(leased_by_other, [None, None, None])
+        self.assertEqual(completed, 1)
+        self.assertEqual(self.queue.progress('run-1'), {'done': 1})
+
+    def test_renew_only_by_lease_holder(self):
+        """Test only the worker holding a lease can renew it."""
+        self.queue.enqueue('run-1', [{'date': '15'}])
+        unit_id, _, _ = self.queue.lease('worker-a', 60)
+
+        self.assertTrue(self.queue.renew(unit_id, 'worker-a', 60))
+        self.assertFalse(self.queue.renew(unit_id, 'worker-b', 60))
+        self.queue.complete(unit_id, 'worker-a', {})
+        self.assertFalse(self.queue.renew(unit_id, 'worker-a', 60))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,301 @@
+"""Tests for the single-flight guard around a scan and notify cycle."""
+
+import asyncio
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from badminton_booker.sharding import single_flight
+from badminton_booker.sharding.single_flight import FileLease, FirestoreLease, SingleFlight, cycle_key
+
+RESULT = {
+    'reservations': [{'name': 'Court A', 'startTime': datetime(2025, 5, 1, 19, 0), 'canReserve': True}],
+    'url': 'https://example.com/results',
+}
+
+
+class FakeSnapshot:
+    def __init__(self, data):
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocument:
+    def __init__(self):
+        self.data = None
+
+    def get(self, transaction=None):
+        return FakeSnapshot(self.data)
+
+    def set(self, data, merge=False):
+        self.data = {**(self.data or {}), **data} if merge else dict(data)
+
+
+class FakeTransaction:
+    def set(self, document, data, merge=False):
+        document.set(data, merge=merge)
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.documents = {}
+
+    def collection(self, name):
+        return self
+
+    def document(self, key):
+        return self.documents.setdefault(key, FakeDocument())
+
+    def transaction(self):
+        return FakeTransaction()
+
+
+class RacingLease(FileLease):
+    """File lease whose leader publishes and releases just after the first result check."""
+
+    def __init__(self, directory, key):
+        super().__init__(directory, key)
+        self.checks = 0
+
+    def last_result(self):
+        self.checks += 1
+        if self.checks == 1:
+            FileLease(self.directory, 'scan').publish('leader', RESULT)
+            return None
+        return super().last_result()
+
+
+class StolenLease(FileLease):
+    """File lease taken over by another host at the first renewal."""
+
+    def __init__(self, directory, key):
+        super().__init__(directory, key)
+        self.stolen = False
+
+    def renew(self, holder):
+        self.stolen = True
+        return False
+
+    def try_acquire(self, holder):
+        return not self.stolen and super().try_acquire(holder)
+
+    def holder(self):
+        return 'other-host' if self.stolen else super().holder()
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for the file and Firestore leases and the guard running on them."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def guard(self, mode='wait', holder='second', **kwargs):
+        return SingleFlight(FileLease(self.directory, 'scan'), mode, poll_interval=0.01, holder=holder, **kwargs)
+
+    def test_cycle_key_separates_searches_and_muted_runs(self):
+        key = cycle_key('https://example.com', ['Verdun', 'Ahuntsic'])
+
+        self.assertEqual(key, cycle_key('https://example.com', ['Ahuntsic', 'Verdun']))
+        self.assertNotEqual(key, cycle_key('https://example.com', ['Verdun']))
+        self.assertNotEqual(key, cycle_key('https://example.com', ['Verdun', 'Ahuntsic'], muted=True))
+        self.assertTrue(cycle_key('https://example.com', [], 'sniper').startswith('sniper-'))
+
+    def test_file_lease_is_exclusive_until_released(self):
+        first = FileLease(self.directory, 'scan')
+        second = FileLease(self.directory, 'scan')
+
+        self.assertTrue(first.try_acquire('host-1'))
+        self.assertFalse(second.try_acquire('host-2'))
+        self.assertEqual(second.holder(), 'host-1')
+
+        first.release('host-1')
+        self.assertIsNone(second.holder())
+        self.assertTrue(second.try_acquire('host-2'))
+        second.release('host-2')
+
+    def test_leader_runs_the_cycle_and_publishes_its_result(self):
+        calls = []
+
+        async def cycle():
+            calls.append(1)
+            return RESULT
+
+        role, result = asyncio.run(self.guard(holder='leader').run(cycle))
+
+        self.assertEqual((role, result, len(calls)), ('leader', RESULT, 1))
+        published = FileLease(self.directory, 'scan').last_result()
+        self.assertEqual(published['holder'], 'leader')
+        self.assertEqual(published['result']['reservations'][0]['name'], 'Court A')
+        # The lease is free again
+        self.assertTrue(FileLease(self.directory, 'scan').try_acquire('next'))
+
+    def test_waiting_instance_reuses_the_running_cycle(self):
+        leader = FileLease(self.directory, 'scan')
+        leader.try_acquire('leader')
+
+        async def finish_leader():
+            await asyncio.sleep(0.05)
+            leader.publish('leader', RESULT)
+            leader.release('leader')
+
+        async def cycle():
+            raise AssertionError('the follower must not scan')
+
+        async def run():
+            finishing = asyncio.create_task(finish_leader())
+            outcome = await self.guard().run(cycle)
+            await finishing
+            return outcome
+
+        role, result = asyncio.run(run())
+
+        self.assertEqual(role, 'follower')
+        # Datetimes are restored from the published JSON
+        self.assertEqual(result['reservations'][0]['startTime'].hour, 19)
+
+    def test_result_published_while_acquiring_is_reused(self):
+        async def cycle():
+            raise AssertionError('the cycle already ran')
+
+        guard = SingleFlight(RacingLease(self.directory, 'scan'), poll_interval=0.01, holder='second')
+        role, result = asyncio.run(guard.run(cycle))
+
+        self.assertEqual(role, 'follower')
+        self.assertEqual(result['url'], RESULT['url'])
+        # The lease taken while checking is given back
+        self.assertTrue(FileLease(self.directory, 'scan').try_acquire('next'))
+
+    def test_lost_lease_cancels_the_cycle_without_publishing(self):
+        finished = []
+
+        async def cycle():
+            await asyncio.sleep(1)
+            finished.append(1)
+            return RESULT
+
+        guard = SingleFlight(StolenLease(self.directory, 'scan'), 'skip', poll_interval=0.01, renew_interval=0.01,
+                             holder='leader')
+        with self.assertLogs('badminton_booker.sharding.single_flight', level='INFO') as logs:
+            outcome = asyncio.run(guard.run(cycle))
+
+        self.assertEqual(outcome, ('skipped', None))
+        self.assertEqual(finished, [])
+        self.assertIsNone(FileLease(self.directory, 'scan').last_result())
+        self.assertEqual([record.event for record in logs.records],
+                         ['single_flight_lease_lost', 'single_flight_skipped'])
+        self.assertEqual(logs.records[1].fields, {'holder': 'other-host', 'role': 'skipped'})
+
+    def test_skip_mode_returns_without_waiting(self):
+        leader = FileLease(self.directory, 'scan')
+        leader.try_acquire('leader')
+
+        async def cycle():
+            raise AssertionError('a skipped instance must not scan')
+
+        self.assertEqual(asyncio.run(self.guard('skip').run(cycle)), ('skipped', None))
+        leader.release('leader')
+
+    def test_waiter_takes_over_when_the_leader_fails(self):
+        leader = FileLease(self.directory, 'scan')
+        leader.try_acquire('leader')
+
+        async def crash_leader():
+            await asyncio.sleep(0.05)
+            leader.release('leader')
+
+        async def cycle():
+            return RESULT
+
+        async def run():
+            crashing = asyncio.create_task(crash_leader())
+            outcome = await self.guard().run(cycle)
+            await crashing
+            return outcome
+
+        self.assertEqual(asyncio.run(run()), ('leader', RESULT))
+
+    def test_failed_cycle_releases_without_publishing(self):
+        async def cycle():
+            raise RuntimeError('browser crashed')
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(self.guard(holder='leader').run(cycle))
+
+        lease = FileLease(self.directory, 'scan')
+        self.assertIsNone(lease.last_result())
+        self.assertTrue(lease.try_acquire('next'))
+
+    def test_old_results_are_only_reused_within_the_reuse_window(self):
+        FileLease(self.directory, 'scan').publish('earlier', RESULT)
+
+        async def cycle():
+            return {'reservations': [], 'url': ''}
+
+        self.assertEqual(asyncio.run(self.guard(reuse_seconds=60).run(cycle))[0], 'follower')
+        time.sleep(0.01)
+        self.assertEqual(asyncio.run(self.guard(reuse_seconds=0).run(cycle))[0], 'leader')
+
+    @patch.object(single_flight.firestore, 'transactional', lambda function: function)
+    def test_firestore_lease_expires_and_is_taken_over(self):
+        db = FakeFirestore()
+        first = FirestoreLease('scan', lease_seconds=60, db=db)
+        second = FirestoreLease('scan', lease_seconds=60, db=db)
+
+        self.assertTrue(first.try_acquire('host-1'))
+        self.assertFalse(second.try_acquire('host-2'))
+        self.assertEqual(second.holder(), 'host-1')
+        self.assertTrue(first.renew('host-1'))
+
+        # The first host stopped renewing
+        db.document('scan').data['expiresAt'] = time.time() - 1
+        self.assertTrue(second.try_acquire('host-2'))
+        self.assertFalse(first.renew('host-1'))
+
+        second.publish('host-2', RESULT)
+        second.release('host-2')
+        self.assertIsNone(first.holder())
+        self.assertEqual(first.last_result()['result']['url'], RESULT['url'])
+
+
+    @patch.object(single_flight.firestore, 'transactional', lambda function: function)
+    def test_oversized_result_is_not_published_and_waiters_run_the_cycle(self):
+        db = FakeFirestore()
+        big = {'reservations': [{'name': 'Court ' + 'x' * 1000}] * 1000, 'url': RESULT['url']}
+        first = FirestoreLease('scan', lease_seconds=60, db=db)
+        second = FirestoreLease('scan', lease_seconds=60, db=db)
+        first.try_acquire('host-1')
+
+        with self.assertRaises(ValueError):
+            first.publish('host-1', big)
+        self.assertIsNone(first.last_result())
+
+        async def leader_cycle():
+            await asyncio.sleep(0.05)
+            return big
+
+        async def waiter_cycle():
+            return RESULT
+
+        async def run():
+            first.release('host-1')
+            leader = asyncio.create_task(SingleFlight(first, holder='host-1').run(leader_cycle))
+            await asyncio.sleep(0.01)
+            waiter = SingleFlight(second, poll_interval=0.01, holder='host-2').run(waiter_cycle)
+            return await leader, await waiter
+
+        leader_outcome, waiter_outcome = asyncio.run(run())
+
+        self.assertEqual(leader_outcome, ('leader', big))
+        self.assertEqual(waiter_outcome, ('leader', RESULT))
+
+if __name__ == '__main__':
+    unittest.main()
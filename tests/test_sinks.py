@@ -0,0 +1,126 @@
+"""Tests for the notification event bus and its sinks."""
+
+import asyncio
+import json
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from badminton_booker.notification.sinks import EventBus, FileSink, Sink, build_event, build_sinks
+
+RESULT_DATA = {
+    'reservations': [
+        {'name': 'Court A', 'startTime': datetime(2025, 5, 15, 18, 0), 'endTime': datetime(2025, 5, 15, 19, 0),
+         'price': '15.00', 'canReserve': True, 'buttonId': 'reserve-1'},
+        {'name': 'Court B', 'startTime': None, 'endTime': None, 'price': '', 'canReserve': False},
+    ],
+    'url': 'https://example.com/booking',
+}
+
+
+class RecordingSink(Sink):
+    """Sink recording when each event was delivered, after an optional delay."""
+
+    def __init__(self, kind, delay=0.0, rate_per_second=0.0, queue_size=100):
+        super().__init__(rate_per_second, queue_size)
+        self.kind = kind
+        self.delay = delay
+        self.delivered = []
+
+    async def deliver(self, event):
+        await asyncio.sleep(self.delay)
+        self.delivered.append((event['title'], time.perf_counter()))
+        return True
+
+
+class TestSinks(unittest.TestCase):
+    """Test cases for the notification event bus."""
+
+    def test_build_event_keeps_only_bookable_slots(self):
+        """Test the neutral event lists bookable slots and renders plain text once."""
+        event = build_event(RESULT_DATA)
+
+        self.assertEqual([slot['name'] for slot in event['slots']], ['Court A'])
+        self.assertNotIn('buttonId', event['slots'][0])
+        self.assertIn('1. Court A, Thursday 15 May 18:00 - 19:00, $15.00', event['text'])
+        self.assertIsNone(build_event({'reservations': [RESULT_DATA['reservations'][1]]}))
+
+    def test_slow_sink_does_not_delay_others(self):
+        """Test a fast sink delivers every event while a slow one is still busy."""
+        fast, slow = RecordingSink('fast'), RecordingSink('slow', delay=0.1)
+
+        async def run():
+            bus = EventBus([fast, slow])
+            started = time.perf_counter()
+            for i in range(3):
+                bus.publish({'title': str(i)})
+            await asyncio.sleep(0.05)
+            fast_done = [t - started for _, t in fast.delivered]
+            return fast_done, await bus.close()
+
+        fast_done, stats = asyncio.run(run())
+
+        self.assertEqual(len(fast_done), 3)
+        self.assertEqual(len(slow.delivered), 3)
+        self.assertEqual(stats['slow'], {'delivered': 3, 'failed': 0, 'dropped': 0})
+
+    def test_rate_limit_and_full_queue(self):
+        """Test deliveries are spaced by the rate limit and a full queue drops the oldest events."""
+        sink = RecordingSink('limited', rate_per_second=20, queue_size=2)
+
+        async def run():
+            bus = EventBus([sink])
+            for i in range(4):
+                bus.publish({'title': str(i)})
+            # Once the queue has room again, publishing keeps every event
+            await asyncio.sleep(0.15)
+            bus.publish({'title': '4'})
+            return await bus.close()
+
+        stats = asyncio.run(run())
+
+        titles = [title for title, _ in sink.delivered]
+        self.assertEqual(stats['limited']['dropped'], 2)
+        self.assertEqual(titles, ['2', '3', '4'])
+        gaps = [b - a for (_, a), (_, b) in zip(sink.delivered, sink.delivered[1:])]
+        self.assertTrue(all(gap >= 0.04 for gap in gaps))
+
+    def test_close_times_out_on_stuck_sink_with_full_queue(self):
+        """Test closing does not wait for a free slot in the queue of a sink that never returns."""
+        stuck = RecordingSink('stuck', delay=60, queue_size=1)
+
+        async def run():
+            bus = EventBus([stuck])
+            bus.publish({'title': '0'})
+            await asyncio.sleep(0.01)
+            # The worker is stuck on the first event and the second one fills the queue
+            bus.publish({'title': '1'})
+            started = time.perf_counter()
+            stats = await bus.close(timeout=0.1)
+            return time.perf_counter() - started, stats
+
+        elapsed, stats = asyncio.run(run())
+
+        self.assertLess(elapsed, 1)
+        self.assertEqual(stats['stuck'], {'delivered': 0, 'failed': 0, 'dropped': 1})
+
+    def test_build_sinks_and_file_sink(self):
+        """Test sinks are built from the spec and the file sink appends NDJSON events."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / 'events.ndjson'
+            sinks = build_sinks(f'stdout,file:{path}', 'stdout=2')
+            self.assertEqual([s.kind for s in sinks], ['stdout', 'file'])
+            self.assertEqual(sinks[0].rate_per_second, 2)
+
+            asyncio.run(FileSink(path).deliver(build_event(RESULT_DATA)))
+            event = json.loads(path.read_text())
+
+        self.assertEqual(event['slots'][0]['startTime'], '2025-05-15 18:00:00')
+        with self.assertRaises(ValueError):
+            build_sinks('pigeon')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Tests for the snapshot replay module."""
+
+import json
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+from badminton_booker.datastore.snapshot import append_snapshot, iter_snapshot_results
+
+RESULT_DATA = {
+    'reservations': [
+        {
+            'name': 'Court A',
+            'startTime': datetime(2025, 5, 15, 18, 0, tzinfo=timezone.utc),
+            'endTime': datetime(2025, 5, 15, 19, 0, tzinfo=timezone.utc),
+            'price': '15.00',
+            'canReserve': True,
+        },
+        {'name': 'Court B', 'startTime': None, 'endTime': None, 'price': '', 'canReserve': False},
+    ],
+    'url': 'https://example.com/booking',
+}
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test cases for reading and writing saved results."""
+
+    def test_read_test_mode_dump(self):
+        """Test the indented JSON written by --test is read back with datetimes."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / 'badminton_results.json'
+            with open(path, 'w') as f:
+                json.dump(RESULT_DATA, f, indent=2, default=str)
+
+            results = list(iter_snapshot_results(path))
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['reservations'][0]['startTime'], RESULT_DATA['reservations'][0]['startTime'])
+        self.assertIsNone(results[0]['reservations'][1]['startTime'])
+
+    def test_ndjson_history_round_trip(self):
+        """Test appended results are streamed back line by line, skipping bad lines."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / 'history.ndjson'
+            append_snapshot(path, RESULT_DATA)
+            with open(path, 'a') as f:
+                f.write('{not json\n\n')
+            append_snapshot(path, RESULT_DATA)
+
+            results = iter_snapshot_results(path)
+            first = next(results)
+            remaining = list(results)
+
+        self.assertIsInstance(first['reservations'][0]['endTime'], datetime)
+        self.assertEqual(len(remaining), 1)
+        self.assertEqual(remaining[0]['url'], 'https://example.com/booking')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Tests for the sniper mode module."""
+
+import asyncio
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+from zoneinfo import ZoneInfo
+
+from badminton_booker.booking.sniper import next_release_instant, poll_results, slot_key
+
+
+class TestSniper(unittest.TestCase):
+    """Test cases for the sniper mode module."""
+
+    def test_next_release_instant_later_today(self):
+        """Test a release time later today stays on the same day."""
+        now = datetime(2025, 5, 15, 6, 30, tzinfo=ZoneInfo("America/New_York"))
+
+        release_at = next_release_instant("07:00", now)
+
+        self.assertEqual(release_at, datetime(2025, 5, 15, 7, 0, tzinfo=ZoneInfo("America/New_York")))
+
+    def test_next_release_instant_rolls_over(self):
+        """Test a release time well in the past moves to the next day."""
+        now = datetime(2025, 5, 15, 9, 0, tzinfo=ZoneInfo("America/New_York"))
+
+        release_at = next_release_instant("07:00:30", now)
+
+        self.assertEqual(release_at, datetime(2025, 5, 16, 7, 0, 30, tzinfo=ZoneInfo("America/New_York")))
+
+    @patch('badminton_booker.booking.sniper.read_search_results')
+    def test_poll_results_reports_new_slots_once(self, mock_read):
+        """Test only slots that become bookable during polling are reported."""
+        existing = {'name': 'Court 1', 'startTime': '18:00', 'endTime': '19:00', 'canReserve': True}
+        released = {'name': 'Court 2', 'startTime': '19:00', 'endTime': '20:00', 'canReserve': True}
+        mock_read.side_effect = [[existing], [existing, released]] + [[existing, released]] * 20
+
+        page = AsyncMock()
+        release_at = datetime.now(ZoneInfo("America/New_York"))
+
+        reservations, detections, refreshes = asyncio.run(
+            poll_results(page, release_at, 0.6, 100, {slot_key(existing)})
+        )
+
+        self.assertGreaterEqual(refreshes, 2)
+        # The refresh rate is bounded by the minimum interval
+        self.assertLessEqual(refreshes, 4)
+        self.assertEqual(len(detections), 1)
+        self.assertEqual(detections[0]['name'], 'Court 2')
+        self.assertGreaterEqual(detections[0]['visibleToDetectedMaxMs'], 0)
+        self.assertEqual(len(reservations), 2)
+
+    @patch('badminton_booker.booking.sniper.read_search_results', AsyncMock(return_value=[]))
+    def test_poll_results_takes_a_token_before_each_refresh(self):
+        """Test every reload goes through the crawl governor."""
+        calls = []
+        page = AsyncMock()
+        page.reload.side_effect = lambda: calls.append('reload')
+
+        async def throttle():
+            calls.append('token')
+
+        release_at = datetime.now(ZoneInfo("America/New_York"))
+        _, _, refreshes = asyncio.run(poll_results(page, release_at, 0.3, 100, set(), throttle))
+
+        self.assertEqual(calls, ['token', 'reload'] * refreshes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+"""Tests for the checkpointed navigation stages."""
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from badminton_booker.booking.courts import select_date_on_page
+from badminton_booker.booking.stages import (
+    CheckpointedNavigator,
+    RetryPolicy,
+    StageFailed,
+    parse_stage_policies,
+)
+
+FAST_POLICIES = {
+    'step': RetryPolicy(attempts=3, timeout_ms=200, backoff_ms=0),
+    'neighborhood': RetryPolicy(attempts=2, timeout_ms=200, backoff_ms=0),
+}
+
+
+class FakeDateButton:
+    """Calendar date button whose clicks toggle the selection."""
+
+    def __init__(self, fail_clicks=0):
+        self.selected = False
+        self.fail_clicks = fail_clicks
+
+    async def click(self):
+        if self.fail_clicks:
+            self.fail_clicks -= 1
+            raise Exception("calendar closed")
+        self.selected = not self.selected
+
+    async def get_attribute(self, name):
+        if name == 'class':
+            return 'btn btn-default active' if self.selected else 'btn btn-default'
+        return None
+
+
+class TestStages(unittest.TestCase):
+    """Test cases for the checkpointed navigator."""
+
+    def make_page(self, url='https://example.com/search'):
+        """Create a mock page with a URL and async goto."""
+        page = MagicMock()
+        page.url = url
+        page.goto = AsyncMock()
+        return page
+
+    def test_parse_stage_policies_overrides(self):
+        """Test overrides replace defaults and keep the other stages."""
+        policies = parse_stage_policies("badminton=5:20000:100, date=1:3000")
+
+        self.assertEqual(policies['badminton'].attempts, 5)
+        self.assertEqual(policies['badminton'].backoff_ms, 100)
+        self.assertEqual(policies['date'].timeout_ms, 3000)
+        self.assertIn('open_booking_site', policies)
+
+    def test_retry_restores_checkpoint(self):
+        """Test a failed attempt returns to the last checkpoint and retries."""
+        page = self.make_page()
+        navigator = CheckpointedNavigator(page, FAST_POLICIES)
+        action = AsyncMock(side_effect=[None, Exception("flaky"), None])
+
+        async def run():
+            await navigator.run('step', action)
+            page.url = 'https://example.com/error'
+            await navigator.run('step', action)
+
+        with self.assertLogs('badminton_booker.booking.stages', level='WARNING') as logs:
+            asyncio.run(run())
+
+        page.goto.assert_called_once_with('https://example.com/search')
+        self.assertEqual(action.call_count, 3)
+        self.assertEqual(navigator.completed, ['step', 'step'])
+        [record] = logs.records
+        self.assertEqual(record.event, 'stage_attempt_failed')
+        self.assertEqual((record.fields['stage'], record.fields['attempt']), ('step', 1))
+
+    def test_only_request_stages_are_throttled(self):
+        """Test clicks on the loaded page skip the crawl governor, page loads and checkpoint restores do not."""
+        page = self.make_page()
+        throttled = []
+
+        async def throttle():
+            throttled.append(page.url)
+
+        navigator = CheckpointedNavigator(page, FAST_POLICIES, throttle=throttle)
+
+        async def run():
+            await navigator.run('open_booking_site', AsyncMock())
+            await navigator.run('neighborhood:A', AsyncMock())
+            await navigator.run('date:15', AsyncMock())
+            page.url = 'https://example.com/error'
+            await navigator.run('step', AsyncMock(side_effect=[Exception('flaky'), None]))
+
+        asyncio.run(run())
+
+        # The page load, then the return to the checkpoint before retrying 'step'
+        self.assertEqual(len(throttled), 2)
+
+    def test_timeout_counts_as_failure(self):
+        """Test a hanging stage is timed out and raises once attempts run out."""
+        navigator = CheckpointedNavigator(self.make_page(), FAST_POLICIES)
+
+        async def hang():
+            await asyncio.sleep(5)
+
+        with self.assertRaises(StageFailed) as context:
+            asyncio.run(navigator.run('step', hang))
+
+        self.assertEqual(context.exception.stage, 'step')
+        self.assertEqual(navigator.failed, ['step'])
+
+    def test_optional_failures_reported_in_coverage(self):
+        """Test optional neighborhood failures leave partial coverage."""
+        navigator = CheckpointedNavigator(self.make_page(), FAST_POLICIES)
+
+        async def run():
+            await navigator.run('neighborhood:A', AsyncMock())
+            return await navigator.run('neighborhood:B', AsyncMock(side_effect=Exception("missing")), required=False)
+
+        self.assertFalse(asyncio.run(run()))
+
+        coverage = navigator.coverage(['A', 'B'], [])
+        self.assertFalse(coverage['complete'])
+        self.assertEqual(coverage['neighborhoods'], {'covered': ['A'], 'missing': ['B']})
+        self.assertEqual(coverage['failedStages'], ['neighborhood:B'])
+
+    def test_retried_date_stage_keeps_selected_dates(self):
+        """Test a retried date stage does not deselect the dates selected by the failed attempt."""
+        buttons = [FakeDateButton(), FakeDateButton(fail_clicks=1)]
+        calendar, dates = MagicMock(), MagicMock()
+        calendar.nth.return_value.click = AsyncMock()
+        dates.count = AsyncMock(return_value=len(buttons))
+        dates.nth.side_effect = lambda i: buttons[i]
+        page = self.make_page()
+        page.locator.side_effect = lambda selector: calendar if selector.startswith('#') else dates
+        navigator = CheckpointedNavigator(page, {'date': RetryPolicy(attempts=2, timeout_ms=200, backoff_ms=0)})
+
+        self.assertTrue(asyncio.run(navigator.run('date:15', lambda: select_date_on_page(page, '15'))))
+
+        self.assertEqual([button.selected for button in buttons], [True, True])
+
+    def test_date_without_button_is_missing(self):
+        """Test a day the calendar does not show fails its stage instead of counting as covered."""
+        calendar, dates = MagicMock(), MagicMock()
+        calendar.nth.return_value.click = AsyncMock()
+        dates.count = AsyncMock(return_value=0)
+        page = self.make_page()
+        page.locator.side_effect = lambda selector: calendar if selector.startswith('#') else dates
+        navigator = CheckpointedNavigator(page, {'date': RetryPolicy(attempts=1, timeout_ms=200, backoff_ms=0)})
+
+        self.assertFalse(asyncio.run(navigator.run('date:02', lambda: select_date_on_page(page, '02'),
+                                                   required=False)))
+
+        self.assertEqual(navigator.coverage([], ['02'])['dates'], {'covered': [], 'missing': ['02']})
+        # The calendar is closed again
+        self.assertEqual(calendar.nth.return_value.click.await_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
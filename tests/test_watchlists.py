@@ -0,0 +1,88 @@
+"""Tests for the watchlist planner."""
+
+import json
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from badminton_booker.booking.watchlists import load_watchlists, plan_searches, split_results
+
+# Thursday 15 May 2025, so the horizon covers Thursday to Sunday
+TODAY = datetime(2025, 5, 15, 9, 0)
+
+WATCHLISTS = [
+    {'name': 'early', 'boroughs': ['Ahuntsic'], 'days': ['thu', 'fri'], 'start': '18:00', 'end': '20:00', 'max_price': 20},
+    {'name': 'late', 'boroughs': ['Ahuntsic'], 'days': [], 'start': '19:00', 'end': '22:00'},
+    {'name': 'weekend', 'boroughs': ['Villeray'], 'days': ['sat'], 'start': '08:00', 'end': '12:00'},
+]
+
+
+def load(watchlists):
+    """Write watchlists to a file and load them back with their defaults."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'watchlists.json'
+        with open(path, 'w') as f:
+            json.dump(watchlists, f)
+        return load_watchlists(path)
+
+
+class TestWatchlists(unittest.TestCase):
+    """Test cases for the watchlist planner."""
+
+    def test_load_rejects_unknown_days(self):
+        """Test an invalid day name is reported."""
+        with self.assertRaises(ValueError):
+            load([{'name': 'bad', 'days': ['funday']}])
+
+    def test_overlapping_windows_merge(self):
+        """Test overlapping windows share one search and disjoint ones do not."""
+        searches = plan_searches(load(WATCHLISTS), today=TODAY)
+
+        self.assertEqual(len(searches), 2)
+        weekend, evening = searches
+        self.assertEqual(weekend['watchlists'], ['weekend'])
+        self.assertEqual(weekend['dates'], ['17'])
+        self.assertEqual(evening['watchlists'], ['early', 'late'])
+        self.assertEqual((evening['start'], evening['end']), ('18:00', '22:00'))
+        self.assertEqual(evening['neighborhoods'], ['Ahuntsic'])
+        self.assertEqual(evening['dates'], ['15', '16', '17', '18'])
+
+    def test_different_boroughs_are_not_merged(self):
+        """Test watchlists over other boroughs, or every borough, keep their own search."""
+        watchlists = load([
+            {'name': 'anywhere', 'start': '18:00', 'end': '22:00'},
+            {'name': 'ahuntsic', 'boroughs': ['Ahuntsic'], 'start': '19:00', 'end': '21:00'},
+            {'name': 'verdun', 'boroughs': ['Verdun'], 'start': '20:00', 'end': '22:00'},
+            {'name': 'ahuntsic-late', 'boroughs': ['Ahuntsic'], 'start': '21:00', 'end': '22:00'},
+        ])
+
+        searches = plan_searches(watchlists, today=TODAY)
+
+        self.assertEqual(
+            [(s['neighborhoods'], s['watchlists']) for s in searches],
+            [([], ['anywhere']), (['Ahuntsic'], ['ahuntsic', 'ahuntsic-late']), (['Verdun'], ['verdun'])],
+        )
+
+    def test_split_results(self):
+        """Test merged results go back only to the watchlists they match."""
+        watchlists = load(WATCHLISTS)
+        searches = plan_searches(watchlists, today=TODAY)
+        evening = searches[1]
+        reservations = [
+            {'name': 'Court A', 'startTime': datetime(2025, 5, 15, 18, 0), 'price': '15.00'},
+            {'name': 'Court B', 'startTime': datetime(2025, 5, 15, 20, 0), 'price': '15.00'},
+            {'name': 'Court C', 'startTime': datetime(2025, 5, 16, 19, 0), 'price': '25.00'},
+            {'name': 'Court D', 'startTime': datetime(2025, 5, 16, 19, 0), 'price': '10.00', 'borough': 'Ahuntsic'},
+            {'name': 'Court E', 'startTime': datetime(2025, 5, 16, 19, 0), 'price': '10.00', 'borough': 'Verdun'},
+        ]
+
+        split = split_results([(evening, reservations)], watchlists)
+
+        self.assertEqual([r['name'] for r in split['early']], ['Court A', 'Court D'])
+        self.assertEqual([r['name'] for r in split['late']], ['Court B', 'Court C', 'Court D'])
+        self.assertEqual(split['weekend'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()